@@ -0,0 +1,46 @@
+"""
+테마 히트맵 일괄 생성
+
+KRX 시세를 한 번만 조회하여 설정 파일의 모든 변형 히트맵을 병렬로 생성합니다.
+"""
+import sys
+import os
+import json
+import argparse
+import dataclasses
+
+# 프로젝트 루트를 경로에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from application.batch import HeatmapVariant, run_batch
+from application.heatmap_service import DEFAULT_NAME_INDEX_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 변형의 테마 히트맵을 한 번에 생성합니다.")
+    parser.add_argument('config', help="변형 설정 JSON 파일 (변형 설정 객체의 리스트)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수")
+    parser.add_argument('--asset-dir', help="plotly.js를 한 번만 저장하고 각 HTML이 참조할 디렉터리 (변형 설정의 asset_dir 기본값)")
+    args = parser.parse_args()
+    
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            variants = [HeatmapVariant.from_dict(item) for item in json.load(f)]
+        if args.asset_dir:
+            variants = [v if v.asset_dir else dataclasses.replace(v, asset_dir=args.asset_dir) for v in variants]
+        
+        results = run_batch(variants, max_workers=args.workers, name_index_path=DEFAULT_NAME_INDEX_PATH)
+        
+        for result in results:
+            if result.error:
+                print(f"[실패] {result.name}: {result.error}")
+            else:
+                print(f"[완료] {result.name}: {result.stock_count}개 종목, {result.elapsed:.2f}초 -> {result.output_file}")
+        
+    except Exception as e:
+        print(f"오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
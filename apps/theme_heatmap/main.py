@@ -1,18 +1,52 @@
+"""
+테마 히트맵 애플리케이션
+
+KRX 테마별 종목 데이터를 시각화하는 히트맵을 생성합니다.
+"""
 import sys
 import os
+import argparse
 
 # 프로젝트 루트를 경로에 추가
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from application.heatmap_service import HeatmapService
-from application.view_model_builder import HeatmapViewModelBuilder
-from presentation.visualizer import HeatmapVisualizer
+from application.instrumentation import PipelineMetrics
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="테마 히트맵을 생성합니다.")
+    parser.add_argument('--metrics-json', help="단계별 계측 결과를 JSON으로 저장할 경로")
+    parser.add_argument('--metrics-prom', help="단계별 계측 결과를 Prometheus 텍스트로 저장할 경로")
+    parser.add_argument('--track-memory', action='store_true', help="단계별 최대 메모리 측정 (느려짐)")
+    parser.add_argument('--daemon', action='store_true', help="상주하며 주기적으로 시세를 갱신하여 HTML을 교체")
+    parser.add_argument('--interval', type=float, default=60.0, help="--daemon 갱신 주기(초, 기본 60)")
+    parser.add_argument('--timeline', help="--daemon 주기별 시점을 시간 슬라이더로 넘겨 보는 HTML 경로")
+    parser.add_argument('--timeline-frames', type=int, help="타임라인에 보관할 최대 시점 수 (기본: 제한 없음)")
+    parser.add_argument('--top-per-theme', type=int, help="테마별 시가총액 상위 N개 종목만 표시 (나머지는 '기타')")
+    parser.add_argument('--renderer', choices=['plotly', 'svg'], default='plotly',
+                        help="plotly: 상호작용 차트, svg: 레이아웃을 미리 계산한 정적 SVG 페이지 (plotly.js 불필요)")
+    parser.add_argument('--asset-dir', help="plotly.js를 한 번만 저장하고 HTML이 참조할 디렉터리 (기본: HTML마다 포함)")
+    parser.add_argument('--max-leaves', type=int, help="전체 종목 노드 수 제한 (테마별 시가총액 비중으로 배분)")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    metrics = PipelineMetrics(track_memory=args.track_memory)
+    
     try:
+        output_file = os.path.join(os.path.dirname(__file__), 'theme_heatmap.html')
+        budget = node_budget(args)
+        if args.daemon:
+            run_daemon(output_file, args.interval, metrics, budget, args.asset_dir, args.timeline, args.timeline_frames)
+            return
+        
+        # pandas 등 무거운 모듈은 인자 처리 후 필요한 단계에서 불러옴
+        from application.heatmap_service import HeatmapService, DEFAULT_NAME_INDEX_PATH
+        from application.view_model_builder import HeatmapViewModelBuilder
+        from presentation.visualizer import HeatmapVisualizer
+        
         # 1. 서비스 초기화 및 데이터 로드
-        service = HeatmapService()
+        service = HeatmapService(name_index_path=DEFAULT_NAME_INDEX_PATH, metrics=metrics)
         
         # Domain Model 사용 (새로운 방식)
         themes = service.get_themes()
@@ -23,22 +57,62 @@ def main():
             
         print(f"히트맵 생성 대상 종목 수: {sum(theme.stock_count for theme in themes)}")
         
-        # 2. 그룹 통계 계산
-        group_stats = service.get_group_stats_models(themes)
+        # 2. 그룹 통계 및 테마/그룹 집계 지표 계산
+        group_stats = service.get_group_metrics(themes)
         
         # 3. ViewModel 생성
-        view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+        view_model = HeatmapViewModelBuilder.build(themes, group_stats, metrics, budget)
         
         # 4. 시각화 생성 (현재 디렉토리에 저장)
-        output_file = os.path.join(os.path.dirname(__file__), 'theme_heatmap.html')
-        visualizer = HeatmapVisualizer()
-        visualizer.create_treemap_from_viewmodel(view_model, output_file)
+        visualizer = HeatmapVisualizer(metrics, asset_dir=args.asset_dir)
+        if args.renderer == 'svg':
+            visualizer.create_static_treemap(view_model, output_file)
+        else:
+            visualizer.create_treemap_from_viewmodel(view_model, output_file)
         
     except Exception as e:
         print(f"오류 발생: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # 5. 계측 결과 저장
+        if args.metrics_json:
+            with open(args.metrics_json, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_json())
+        if args.metrics_prom:
+            with open(args.metrics_prom, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_prometheus())
+
+def node_budget(args):
+    """종목 노드 수 제한 인자 (지정하지 않으면 None)"""
+    if args.top_per_theme is None and args.max_leaves is None:
+        return None
+    from application.view_model_builder import NodeBudget
+    return NodeBudget(per_theme=args.top_per_theme, total=args.max_leaves)
+
+def run_daemon(output_file, interval, metrics, budget=None, asset_dir=None, timeline_file=None, max_frames=None):
+    """Ctrl+C 또는 SIGTERM을 받을 때까지 주기적으로 히트맵을 갱신합니다."""
+    import signal
+    import threading
+    from application.daemon import HeatmapDaemon
+    from application.heatmap_service import HeatmapService, DEFAULT_NAME_INDEX_PATH
+    from presentation.visualizer import HeatmapVisualizer
+    
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    
+    print(f"상주 모드 시작: {interval:g}초마다 {output_file} 갱신 (종료: Ctrl+C)")
+    try:
+        visualizer = HeatmapVisualizer(metrics, asset_dir=asset_dir)
+        service = HeatmapService(listing_ttl=None, name_index_path=DEFAULT_NAME_INDEX_PATH, metrics=metrics)
+        daemon = HeatmapDaemon(
+            output_file, interval, service=service, visualizer=visualizer, metrics=metrics, budget=budget,
+            timeline_file=timeline_file, max_frames=max_frames
+        )
+        daemon.run(stop_event)
+    except KeyboardInterrupt:
+        pass
+    print("상주 모드 종료")
 
 if __name__ == "__main__":
     main()
-
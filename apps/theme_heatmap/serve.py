@@ -0,0 +1,48 @@
+"""
+테마 히트맵 서버
+
+히트맵 페이지(/), 트리맵 노드 JSON(/api/nodes), 변경분 JSON(/api/diff?since=<지문>)을 제공합니다.
+데이터 지문이 바뀔 때만 응답을 다시 만들며, ETag/If-None-Match와 gzip 압축을 지원합니다.
+"""
+import sys
+import os
+import argparse
+
+# 프로젝트 루트를 경로에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+def main():
+    parser = argparse.ArgumentParser(description="테마 히트맵을 로컬 HTTP 서버로 제공합니다.")
+    parser.add_argument('--host', default='127.0.0.1', help="바인딩 주소 (팀 공유 시 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=8000, help="포트 (기본 8000)")
+    parser.add_argument('--listing-ttl', type=float, default=60.0, help="KRX 시세 재조회 주기(초, 기본 60)")
+    parser.add_argument('--poll', type=float, default=None,
+                        help="페이지 자동 갱신 주기(초, 지정 시 변경된 값/색상만 받아 차트를 갱신)")
+    parser.add_argument('--top-per-theme', type=int, help="테마별 시가총액 상위 N개 종목만 표시 (나머지는 '기타')")
+    parser.add_argument('--max-leaves', type=int, help="전체 종목 노드 수 제한 (테마별 시가총액 비중으로 배분)")
+    args = parser.parse_args()
+    
+    from application.heatmap_service import HeatmapService, DEFAULT_NAME_INDEX_PATH
+    from application.publisher import HeatmapPublisher
+    from application.view_model_builder import NodeBudget
+    from presentation.server import HeatmapHttpServer
+    
+    budget = None
+    if args.top_per_theme is not None or args.max_leaves is not None:
+        budget = NodeBudget(per_theme=args.top_per_theme, total=args.max_leaves)
+    publisher = HeatmapPublisher(
+        HeatmapService(listing_ttl=args.listing_ttl, name_index_path=DEFAULT_NAME_INDEX_PATH), budget=budget
+    )
+    server = HeatmapHttpServer((args.host, args.port), publisher.snapshot, poll_interval=args.poll)
+    print(f"히트맵 서버 시작: http://{args.host}:{args.port}/ (노드 JSON: /api/nodes, 변경분: /api/diff, 종료: Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print("히트맵 서버 종료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+HeatmapService._dataframe_to_themes 벤치마크
+
+변경 전 iterrows 기반 변환과 컬럼 단위(벡터화) 변환의 소요 시간을 비교하고,
+두 결과가 같은 테마/종목 구성을 갖는지 확인합니다.
+
+사용법:
+    uv run python benchmarks/bench_dataframe_to_themes.py [행 수]
+"""
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from application.heatmap_service import HeatmapService
+from domain.models import StockRegistry, Theme
+from infrastructure.name_index import StockNameIndex
+from domain.theme_config import THEME_HIERARCHY
+from domain.value_objects import MarketCap, ChangeRatio
+
+
+def make_merged_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """병합 완료된 (테마, 종목) DataFrame 생성"""
+    rng = np.random.default_rng(seed)
+    n_stocks = max(1, n_rows // 5)
+    n_themes = max(1, n_rows // 50)
+    stock_ids = rng.integers(0, n_stocks, n_rows)
+    changes = rng.normal(0, 3, n_stocks)
+    changes[rng.random(n_stocks) < 0.001] = 150.0  # 범위 초과 값
+    return pd.DataFrame({
+        '테마': [f"테마{t}" for t in rng.integers(0, n_themes, n_rows)],
+        '종목명': [f"종목{s}" for s in stock_ids],
+        'Code': [f"{s:06d}" for s in stock_ids],
+        'Name': [f"종목{s}" for s in stock_ids],
+        'Marcap': rng.lognormal(25, 2, n_stocks)[stock_ids],
+        'ChagesRatio': changes[stock_ids],
+        'Amount': rng.lognormal(20, 2, n_stocks)[stock_ids],
+    })
+
+
+def legacy_dataframe_to_themes(df: pd.DataFrame) -> List[Theme]:
+    """변경 전 iterrows 기반 구현 (비교 기준)"""
+    themes_dict: Dict[str, Theme] = {}
+    registry = StockRegistry()
+
+    for _, row in df.iterrows():
+        theme_name = str(row.get('테마', ''))
+        stock_name = str(row.get('종목명', row.get('Name', '')))
+        code = str(row.get('Code', ''))
+
+        # MarketCap Value Object 생성
+        marcap_value = float(row.get('Marcap', 0))
+        market_cap = MarketCap(marcap_value) if marcap_value > 0 else MarketCap.zero()
+
+        # ChangeRatio Value Object 생성
+        change_value = float(row.get('ChagesRatio', 0))
+        try:
+            change_ratio = ChangeRatio(change_value)
+        except ValueError:
+            # 범위 초과 시 0으로 처리
+            change_ratio = ChangeRatio.zero()
+
+        # 거래대금 (없거나 비정상이면 0)
+        amount_value = float(row.get('Amount', 0))
+        traded_value = amount_value if amount_value > 0 else 0.0
+
+        # Stock 엔티티 생성 (종목 코드당 하나의 인스턴스를 여러 테마가 공유)
+        try:
+            stock = registry.get_or_create(
+                code=code,
+                name=stock_name,
+                market_cap=market_cap,
+                change_ratio=change_ratio,
+                traded_value=traded_value
+            )
+        except ValueError:
+            # 유효하지 않은 데이터는 스킵
+            continue
+
+        # Theme 엔티티에 Stock 추가
+        if theme_name not in themes_dict:
+            theme = Theme(
+                name=theme_name,
+                parent_group=THEME_HIERARCHY.get(theme_name)
+            )
+            themes_dict[theme_name] = theme
+
+        themes_dict[theme_name].add_stock(stock)
+
+    return list(themes_dict.values())
+
+
+def _signature(themes: List[Theme]):
+    return [(t.name, [(s.code, s.market_cap, s.change_ratio) for s in t.stocks]) for t in themes]
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_merged_frame(n_rows)
+    service = HeatmapService(name_index=StockNameIndex())
+
+    start = time.perf_counter()
+    legacy = legacy_dataframe_to_themes(df)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = service._dataframe_to_themes(df)
+    vectorized_time = time.perf_counter() - start
+
+    assert _signature(legacy) == _signature(vectorized), "변환 결과가 다릅니다"
+    print(f"행 수: {n_rows:,} / 테마 수: {len(vectorized):,}")
+    print(f"iterrows: {legacy_time:.3f}s")
+    print(f"벡터화:   {vectorized_time:.3f}s ({legacy_time / vectorized_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
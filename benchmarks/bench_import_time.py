@@ -0,0 +1,78 @@
+"""
+진입점 import 시간 벤치마크
+
+새 인터프리터에서 `python -X importtime`으로 진입점과 주요 모듈을 불러와
+전체 import 시간과 비용이 큰 모듈을 출력합니다.
+무거운 모듈(FinanceDataReader, plotly)이 시작 시점에 불러와지면 종료 코드 1을 반환합니다.
+
+사용법:
+    uv run python benchmarks/bench_import_time.py [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+src_dir = os.path.join(project_root, 'src')
+
+# 이름 -> 실행할 코드
+TARGETS = {
+    'entry (main.py --help)': f"import runpy, sys; sys.argv = ['main.py', '--help']; "
+                              f"runpy.run_path({os.path.join(project_root, 'apps', 'theme_heatmap', 'main.py')!r}, run_name='__main__')",
+    'application.heatmap_service': "import application.heatmap_service",
+    'presentation.visualizer': "import presentation.visualizer",
+    'infrastructure.krx_repository': "import infrastructure.krx_repository",
+}
+
+# 시작 시점에 불러오면 안 되는 모듈 (해당 단계에서만 필요)
+HEAVY_MODULES = ('FinanceDataReader', 'plotly')
+
+_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(code: str) -> Tuple[float, Dict[str, float], Set[str]]:
+    """새 인터프리터에서 코드를 실행하고 (전체 초, 최상위 모듈별 누적 초, 불러온 모든 모듈)을 반환합니다."""
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import sys; sys.path.insert(0, {src_dir!r}); {code}"],
+        capture_output=True, text=True, env=env
+    )
+    modules: Dict[str, float] = {}
+    loaded: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        loaded.add(name)
+        if indent <= 1:  # 최상위 import만 합산
+            modules[name] = modules.get(name, 0.0) + cumulative / 1e6
+    return sum(modules.values()), modules, loaded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="진입점 import 시간 벤치마크")
+    parser.add_argument('--repeat', type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument('--top', type=int, default=8, help="출력할 상위 모듈 수")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for name, code in TARGETS.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        total, modules, loaded = min(runs, key=lambda run: run[0])
+        print(f"[{name}] {total * 1000:.1f} ms")
+        for module, seconds in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {module:<40} {seconds * 1000:8.1f} ms")
+
+        heavy = sorted({m for m in loaded if m.split('.')[0] in HEAVY_MODULES})
+        if heavy:
+            print(f"  ! 시작 시점에 무거운 모듈을 불러옴: {', '.join(heavy)}")
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
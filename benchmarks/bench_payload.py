@@ -0,0 +1,117 @@
+"""
+히트맵 HTML 용량 벤치마크
+
+합성 유니버스로 ViewModel을 만들어 그림 데이터(plotly.js 제외)의 크기, gzip 크기, 직렬화 시간을
+숫자 배열 기록 방식별로 비교합니다.
+    - json: 기존 방식 (숫자 배열을 JSON 목록 텍스트로 기록, 비율의 기준)
+    - float64 / float32: base64 typed array
+
+사용법:
+    uv run python benchmarks/bench_payload.py [--sizes medium large] [--repeat 3]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_universe
+from run_benchmarks import SIZES, SyntheticThemeRepository
+from application.heatmap_service import HeatmapService
+from application.stage_cache import StageCache
+from application.view_model_builder import HeatmapViewModelBuilder
+from domain.hierarchy import ThemeHierarchy
+from domain.services import ThemeStatisticsService
+from infrastructure.krx_repository import SnapshotKrxRepository
+from infrastructure.name_index import StockNameIndex
+from presentation.view_models import HeatmapViewModel
+from presentation.visualizer import HeatmapVisualizer
+
+NUMERIC_KEYS = ('values', 'customdata')
+ENCODINGS = ('json', 'float64', 'float32')
+
+
+def build_view_model(n_stocks: int, n_themes: int, seed: int) -> HeatmapViewModel:
+    """합성 유니버스의 히트맵 ViewModel"""
+    listing, catalog, mapping = make_universe(n_stocks, n_themes, seed)
+    service = HeatmapService(
+        stage_cache=StageCache(),
+        listing_ttl=None,
+        name_index=StockNameIndex(),
+        krx_repo=SnapshotKrxRepository(listing),
+        file_repo=SyntheticThemeRepository(catalog)
+    )
+    themes = service.get_themes()
+    for theme in themes:
+        theme.parent_group = mapping.get(theme.name)
+    group_stats = ThemeStatisticsService.aggregate_metrics(themes, hierarchy=ThemeHierarchy.compile(mapping))
+    return HeatmapViewModelBuilder.build(themes, group_stats)
+
+
+def build_figure(view_model: HeatmapViewModel, encoding: str) -> Dict:
+    """기록 방식별 그림 딕셔너리
+    
+    plotly는 그림 객체에 넘긴 숫자 목록도 numpy 배열로 바꾸어 typed array로 기록하므로,
+    json 방식은 딕셔너리의 숫자 배열을 파이썬 목록으로 바꾼 뒤 검증 없이 직렬화합니다.
+    """
+    fig = HeatmapVisualizer(float32=encoding == 'float32').build_figure(view_model)
+    figure = fig.to_dict()
+    if encoding == 'json':
+        trace = figure['data'][0]
+        trace['values'] = view_model.values.tolist()
+        trace['customdata'] = view_model.custom_data.tolist()
+        trace['marker']['colors'] = view_model.colors.tolist()
+    return figure
+
+
+def measure(view_model: HeatmapViewModel, encoding: str, repeat: int) -> Dict[str, float]:
+    """그림 HTML 크기(바이트), gzip 크기, 숫자 배열 크기, 직렬화 최소 시간(초)"""
+    import plotly.io as pio
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        figure = build_figure(view_model, encoding)
+        html = pio.to_html(figure, include_plotlyjs=False, validate=False).encode('utf-8')
+        best = min(best, time.perf_counter() - start)
+
+    trace = json.loads(pio.to_json(figure, validate=False))['data'][0]
+    numeric = [trace[key] for key in NUMERIC_KEYS] + [trace['marker']['colors']]
+    return {
+        'html': len(html),
+        'gzip': len(gzip.compress(html, compresslevel=6)),
+        'numeric': sum(len(json.dumps(column)) for column in numeric),
+        'seconds': best,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="히트맵 HTML 용량 벤치마크 (JSON 목록 vs float64/float32 typed array)")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium', 'large'])
+    parser.add_argument('--repeat', type=int, default=3, help="직렬화 반복 횟수 (최솟값 사용)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        n_stocks, n_themes = SIZES[size]
+        view_model = build_view_model(n_stocks, n_themes, args.seed)
+        print(f"[{size}] 종목 {n_stocks:,}개, 테마 {n_themes:,}개, 노드 {len(view_model):,}개")
+        results = {encoding: measure(view_model, encoding, args.repeat) for encoding in ENCODINGS}
+        base = results['json']
+        for label, result in results.items():
+            print(
+                f"  {label:>7}: HTML {result['html'] / 1e6:7.3f} MB ({result['html'] / base['html']:.0%})"
+                f"  gzip {result['gzip'] / 1e6:7.3f} MB  숫자 배열 {result['numeric'] / 1e6:7.3f} MB"
+                f"  직렬화 {result['seconds'] * 1000:8.1f} ms"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+파이프라인 단계별 합성 벤치마크
+
+합성 유니버스(종목 100개 ~ 10만 개, 테마 최대 1만 개)에서 HeatmapService,
+ThemeStatisticsService, HeatmapViewModelBuilder, HeatmapVisualizer의 각 단계를 따로 측정합니다.
+결과를 기준(baseline) 파일로 저장하고, 이후 실행에서 기준 대비 임계치를 넘게 느려진 단계를 표시합니다.
+
+사용법:
+    uv run python benchmarks/run_benchmarks.py                       # 측정만
+    uv run python benchmarks/run_benchmarks.py --save-baseline       # 기준 저장
+    uv run python benchmarks/run_benchmarks.py --compare --threshold 0.2
+    uv run python benchmarks/run_benchmarks.py --sizes small medium --repeat 5
+
+기준 시간은 측정한 장비에 따라 다르므로 같은 장비에서 저장한 기준과만 비교하세요.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_universe
+from application.heatmap_service import HeatmapService
+from application.instrumentation import PipelineMetrics
+from application.stage_cache import StageCache
+from application.view_model_builder import HeatmapViewModelBuilder
+from domain.hierarchy import ThemeHierarchy
+from domain.services import ThemeStatisticsService
+from infrastructure.krx_repository import SnapshotKrxRepository
+from infrastructure.name_index import StockNameIndex
+from presentation.visualizer import HeatmapVisualizer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 크기 이름 -> (종목 수, 테마 수)
+SIZES = {
+    'tiny': (100, 20),
+    'small': (1_000, 100),
+    'medium': (10_000, 1_000),
+    'large': (100_000, 10_000),
+}
+
+
+class SyntheticThemeRepository:
+    """합성 테마 카탈로그를 반환하는 테마 저장소 (파일 지문이 없어 매번 다시 로드됨)"""
+
+    file_path = None
+
+    def __init__(self, catalog: pd.DataFrame):
+        self.catalog = catalog
+
+    def load_themes(self) -> pd.DataFrame:
+        return self.catalog.copy()
+
+
+def run_once(listing: pd.DataFrame, catalog: pd.DataFrame, mapping: Dict[str, str], html: bool) -> Dict[str, float]:
+    """빈 캐시에서 파이프라인을 한 번 실행하고 단계별 소요 시간(초)을 반환합니다."""
+    metrics = PipelineMetrics()
+
+    # HeatmapService: fetch, theme_load, merge, model_build
+    service = HeatmapService(
+        stage_cache=StageCache(),
+        listing_ttl=None,
+        name_index=StockNameIndex(),
+        krx_repo=SnapshotKrxRepository(listing),
+        file_repo=SyntheticThemeRepository(catalog),
+        metrics=metrics
+    )
+    with metrics.stage('service.total'):
+        themes = service.get_themes()
+    for theme in themes:
+        theme.parent_group = mapping.get(theme.name)
+
+    # ThemeStatisticsService
+    hierarchy = ThemeHierarchy.compile(mapping)
+    with metrics.stage('stats.group_stats'):
+        ThemeStatisticsService.calculate_group_stats(themes, hierarchy)
+    with metrics.stage('stats.aggregate_metrics'):
+        group_stats = ThemeStatisticsService.aggregate_metrics(themes, hierarchy=hierarchy)
+    with metrics.stage('stats.top_stocks'):
+        ThemeStatisticsService.get_top_stocks_by_market_cap_batch(themes, 5)
+
+    # HeatmapViewModelBuilder: view_model_build
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats, metrics=metrics)
+
+    # HeatmapVisualizer: html_write
+    if html:
+        with tempfile.TemporaryDirectory() as tmp:
+            visualizer = HeatmapVisualizer(metrics=metrics)
+            visualizer.write_html(view_model, os.path.join(tmp, 'bench.html'))
+
+    return {stage: stats['seconds'] for stage, stats in metrics.summary().items()}
+
+
+def run_size(name: str, repeat: int, html: bool, seed: int) -> Dict[str, float]:
+    """크기 하나를 repeat회 측정하여 단계별 최솟값을 반환합니다."""
+    n_stocks, n_themes = SIZES[name]
+    listing, catalog, mapping = make_universe(n_stocks, n_themes, seed)
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        for stage, seconds in run_once(listing, catalog, mapping, html).items():
+            best[stage] = min(best.get(stage, float('inf')), seconds)
+    return best
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_seconds: float = 0.005
+) -> List[str]:
+    """기준 대비 threshold(비율)를 넘게 느려진 단계 목록
+
+    min_seconds보다 짧은 단계는 측정 잡음이 커서 비교하지 않습니다.
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, seconds in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if base is None or max(base, seconds) < min_seconds:
+                continue
+            if seconds > base * (1 + threshold):
+                regressions.append(f"{size}/{stage}: {base:.4f}s -> {seconds:.4f}s (+{seconds / base - 1:.0%})")
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict[str, float]]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results')
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    data = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="합성 유니버스 파이프라인 벤치마크")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['tiny', 'small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=3, help="크기별 반복 횟수 (단계별 최솟값 사용)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-html', action='store_true', help="HTML 저장 단계 생략")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="기준 파일 경로")
+    parser.add_argument('--save-baseline', action='store_true', help="결과를 기준 파일로 저장")
+    parser.add_argument('--compare', action='store_true', help="기준 파일과 비교하여 성능 저하 시 종료 코드 1")
+    parser.add_argument('--threshold', type=float, default=0.2, help="성능 저하 판정 비율 (기본 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for size in args.sizes:
+        n_stocks, n_themes = SIZES[size]
+        print(f"[{size}] 종목 {n_stocks:,}개, 테마 {n_themes:,}개")
+        results[size] = run_size(size, args.repeat, not args.no_html, args.seed)
+        for stage, seconds in sorted(results[size].items()):
+            print(f"  {stage:<26} {seconds * 1000:10.2f} ms")
+
+    status = 0
+    if args.compare:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            print(f"기준 파일이 없습니다: {args.baseline}")
+            status = 1
+        else:
+            regressions = find_regressions(results, baseline, args.threshold)
+            if regressions:
+                print(f"\n성능 저하 ({len(regressions)}건, 임계치 {args.threshold:.0%}):")
+                for line in regressions:
+                    print(f"  {line}")
+                status = 1
+            else:
+                print(f"\n기준 대비 성능 저하 없음 (임계치 {args.threshold:.0%})")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"기준 저장: {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+합성 데이터 생성기
+
+벤치마크용 KRX 종목 목록과 테마 카탈로그, 테마 계층 구조를 결정적으로(seed 고정) 생성합니다.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+MARKETS = np.array(['KOSPI', 'KOSDAQ', 'KOSDAQ GLOBAL', 'KONEX'])
+
+
+def make_listing(n_stocks: int, seed: int = 0) -> pd.DataFrame:
+    """fdr.StockListing('KRX')와 같은 컬럼 구성의 종목 목록"""
+    rng = np.random.default_rng(seed)
+    codes = np.char.zfill(np.arange(n_stocks).astype(str), 6)
+    changes = np.clip(rng.normal(0, 3, n_stocks), -30, 30).round(2)
+    return pd.DataFrame({
+        'Code': codes,
+        'Name': [f"종목{i:06d}" for i in range(n_stocks)],
+        'Market': MARKETS[rng.choice(len(MARKETS), n_stocks, p=[0.35, 0.55, 0.05, 0.05])],
+        'Close': rng.lognormal(9, 1.2, n_stocks).round(),
+        'ChagesRatio': changes,
+        'Volume': rng.lognormal(12, 2, n_stocks).round(),
+        'Amount': rng.lognormal(22, 2, n_stocks).round(),
+        'Marcap': rng.lognormal(26, 1.8, n_stocks).round(),
+    })
+
+
+def make_theme_catalog(listing: pd.DataFrame, n_themes: int, seed: int = 0) -> pd.DataFrame:
+    """(테마, 종목명) 형태의 테마 카탈로그
+
+    종목마다 1~3개 테마에 속하며, 테마 크기는 치우친 분포를 따릅니다.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_stocks = len(listing)
+    memberships = rng.integers(1, 4, n_stocks)
+    stock_rows = np.repeat(np.arange(n_stocks), memberships)
+    weights = rng.zipf(1.5, n_themes).astype(np.float64)
+    weights /= weights.sum()
+    theme_ids = rng.choice(n_themes, len(stock_rows), p=weights)
+    catalog = pd.DataFrame({
+        '테마': [f"테마{t:05d}" for t in theme_ids],
+        '종목명': listing['Name'].to_numpy()[stock_rows],
+    })
+    return catalog.drop_duplicates().reset_index(drop=True)
+
+
+def make_hierarchy(n_themes: int, fanout: int = 8, depth: int = 3) -> Dict[str, str]:
+    """테마 → 산업 → 섹터 형태의 자식 → 부모 매핑"""
+    mapping: Dict[str, str] = {}
+    children = [f"테마{t:05d}" for t in range(n_themes)]
+    for level in range(1, depth):
+        n_parents = max(1, len(children) // fanout)
+        parents = [f"그룹L{level}_{p:04d}" for p in range(n_parents)]
+        for i, child in enumerate(children):
+            mapping[child] = parents[i % n_parents]
+        children = parents
+    return mapping
+
+
+def make_universe(n_stocks: int, n_themes: int, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, str]]:
+    """종목 목록, 테마 카탈로그, 계층 구조"""
+    listing = make_listing(n_stocks, seed)
+    return listing, make_theme_catalog(listing, n_themes, seed), make_hierarchy(n_themes)
@@ -0,0 +1,162 @@
+"""
+Application Layer - 다중 히트맵 일괄 생성
+
+같은 시점의 KRX 시세로 여러 변형(테마 파일, KOSPI/KOSDAQ 구분, 시가총액 상위 N개 등)의
+히트맵을 만듭니다. 시세는 한 번만 조회하여 프로세스 풀의 초기화 인자로 워커마다 한 번 전달하고,
+각 워커는 그 스냅샷으로 여러 변형을 생성합니다.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from application.heatmap_service import HeatmapService
+from application.view_model_builder import HeatmapViewModelBuilder
+from infrastructure.file_repository import ThemeFileRepository
+from infrastructure.krx_repository import KrxRepository, SnapshotKrxRepository
+from infrastructure.name_index import StockNameIndex
+from presentation.visualizer import HeatmapVisualizer
+
+DEFAULT_THEME_FILE = ThemeFileRepository().file_path
+
+
+@dataclass(frozen=True)
+class HeatmapVariant:
+    """히트맵 변형 설정
+
+    listing_filter로 HeatmapService에 전달되므로 해시 가능한 불변 객체입니다.
+    """
+    name: str
+    output_file: str
+    theme_file: str = DEFAULT_THEME_FILE
+    markets: Tuple[str, ...] = ()  # 예: ('KOSPI',), 비어 있으면 전체 시장
+    top_n: Optional[int] = None  # 시가총액 상위 N개 종목만 사용
+    title: Optional[str] = None
+    asset_dir: Optional[str] = None  # plotly.js 공유 디렉터리 (None이면 HTML마다 포함)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HeatmapVariant':
+        """설정 딕셔너리로부터 생성합니다."""
+        if not data.get('name') or not data.get('output_file'):
+            raise ValueError("변형 설정에는 name과 output_file이 필요합니다")
+        return cls(
+            name=data['name'],
+            output_file=data['output_file'],
+            theme_file=data.get('theme_file', DEFAULT_THEME_FILE),
+            markets=tuple(data.get('markets', ())),
+            top_n=data.get('top_n'),
+            title=data.get('title'),
+            asset_dir=data.get('asset_dir')
+        )
+
+    def __call__(self, listing: pd.DataFrame) -> pd.DataFrame:
+        """시세 목록에 시장 구분과 상위 N개 조건을 적용합니다."""
+        if self.markets and 'Market' in listing.columns:
+            market = listing['Market'].astype(str)
+            listing = listing[market.str.startswith(self.markets)]
+        if self.top_n is not None and 'Marcap' in listing.columns:
+            listing = listing.nlargest(self.top_n, 'Marcap')
+        return listing
+
+
+@dataclass
+class BatchResult:
+    """변형별 생성 결과"""
+    name: str
+    output_file: str
+    stock_count: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ListingSnapshot:
+    """워커가 공유하는 시세 스냅샷"""
+    listing: pd.DataFrame
+    name_index: StockNameIndex
+
+
+def run_batch(
+    variants: List[HeatmapVariant],
+    max_workers: Optional[int] = None,
+    krx_repo: Optional[KrxRepository] = None,
+    name_index_path: Optional[str] = None
+) -> List[BatchResult]:
+    """여러 변형의 히트맵을 병렬로 생성합니다.
+
+    Args:
+        variants: 변형 설정 목록
+        max_workers: 프로세스 수 (None이면 CPU 수와 변형 수 중 작은 값)
+        krx_repo: KRX 시세 저장소 (None이면 KrxRepository)
+        name_index_path: 종목명 해석 인덱스 파일 (None이면 저장하지 않고 매번 새로 생성)
+
+    Returns:
+        변형 순서대로의 생성 결과
+    """
+    if not variants:
+        return []
+
+    # 1. 시세 한 번 조회 및 종목명 인덱스 갱신
+    listing = (krx_repo or KrxRepository()).fetch_listing()
+    if listing.empty:
+        return [BatchResult(v.name, v.output_file, error="KRX 데이터 로드 실패") for v in variants]
+
+    name_index = StockNameIndex.load(name_index_path) if name_index_path else StockNameIndex()
+    name_index.update(listing)
+    name_index.save()
+    name_index.path = None  # 워커는 인덱스를 저장하지 않음
+
+    # 2. 워커마다 스냅샷을 한 번 전달 (변형마다 다시 보내지 않음)
+    # KRX 종목 목록은 수천 행이라 직렬화 비용이 작으므로 공유 메모리를 쓰지 않고 초기화 인자로 넘김
+    workers = max_workers or min(len(variants), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(ListingSnapshot(listing, name_index),)
+    ) as pool:
+        return list(pool.map(_render_variant, variants))
+
+
+# === Worker ===
+
+_snapshot: Optional[ListingSnapshot] = None
+
+
+def _init_worker(snapshot: ListingSnapshot) -> None:
+    """전달받은 스냅샷을 워커 전역에 보관합니다."""
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _render_variant(variant: HeatmapVariant) -> BatchResult:
+    """변형 하나의 히트맵을 생성합니다."""
+    start = time.perf_counter()
+    try:
+        service = HeatmapService(
+            listing_ttl=None,
+            name_index=_snapshot.name_index,
+            krx_repo=SnapshotKrxRepository(_snapshot.listing),
+            file_repo=ThemeFileRepository(variant.theme_file),
+            listing_filter=variant
+        )
+        themes = service.get_themes()
+        if not themes:
+            return BatchResult(variant.name, variant.output_file, error="히트맵 데이터 없음")
+
+        group_stats = service.get_group_metrics(themes)
+        view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+        if variant.title:
+            view_model.title = variant.title
+        HeatmapVisualizer(asset_dir=variant.asset_dir).write_html(view_model, variant.output_file)
+
+        return BatchResult(
+            variant.name,
+            variant.output_file,
+            stock_count=sum(theme.stock_count for theme in themes),
+            elapsed=time.perf_counter() - start
+        )
+    except Exception as e:
+        return BatchResult(variant.name, variant.output_file, elapsed=time.perf_counter() - start, error=str(e))
@@ -0,0 +1,118 @@
+"""
+Application Layer - 상주(daemon) 히트맵 갱신
+
+프로세스를 띄워 둔 채 테마 소속, 종목명 해석 인덱스, ViewModel 구조를 메모리에 유지하고,
+주기마다 KRX 시세만 다시 조회하여 히트맵 HTML을 원자적으로 교체합니다.
+타임라인 파일을 지정하면 주기별 값을 쌓아 시간 슬라이더로 넘겨 볼 수 있는 HTML도 함께 교체합니다.
+"""
+import threading
+import time
+from typing import Optional
+
+from application.heatmap_service import HeatmapService
+from application.instrumentation import PipelineMetrics
+from application.view_model_builder import HeatmapViewModelBuilder, NodeBudget
+from presentation.view_models import HeatmapTimeline, HeatmapViewModel
+from presentation.visualizer import HeatmapVisualizer
+
+
+class HeatmapDaemon:
+    """주기적 히트맵 갱신기
+
+    첫 주기에는 전체 파이프라인을 실행하고, 이후 주기에는 HeatmapService.refresh_quotes로
+    기존 Domain Model의 시세만 갱신한 뒤 ViewModel 값만 바꿔 다시 저장합니다.
+    테마 파일이나 종목 구성이 바뀐 주기에는 자동으로 전체를 다시 생성합니다.
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        interval: float = 60.0,
+        service: Optional[HeatmapService] = None,
+        visualizer: Optional[HeatmapVisualizer] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        budget: Optional[NodeBudget] = None,
+        timeline_file: Optional[str] = None,
+        max_frames: Optional[int] = None
+    ):
+        """
+        Args:
+            output_file: 히트맵 HTML 경로 (매 주기 교체)
+            interval: 갱신 주기(초)
+            service: 히트맵 서비스 (None이면 생성)
+            visualizer: 시각화기 (None이면 생성)
+            metrics: 단계별 계측기 (None이면 기록하지 않음)
+            budget: 종목 노드 수 제한 (None이면 모든 종목 표시)
+            timeline_file: 주기별 시점을 담은 타임라인 HTML 경로 (None이면 만들지 않음)
+            max_frames: 타임라인에 보관할 최대 시점 수 (None이면 제한 없음)
+        """
+        if interval <= 0:
+            raise ValueError("갱신 주기는 0보다 커야 합니다")
+        self.output_file = output_file
+        self.interval = interval
+        self.metrics = metrics
+        self.budget = budget
+        self.timeline_file = timeline_file
+        self.timeline = HeatmapTimeline(max_frames)
+        self.service = service if service is not None else HeatmapService(listing_ttl=None, metrics=metrics)
+        self.visualizer = visualizer if visualizer is not None else HeatmapVisualizer(metrics)
+        self.cycles = 0
+        self._themes = None  # 마지막 ViewModel을 만든 테마 목록
+        self._view_model: Optional[HeatmapViewModel] = None
+
+    def refresh(self) -> bool:
+        """한 주기 갱신 (시세 반영 후 HTML 교체)
+
+        Returns:
+            히트맵을 저장했으면 True
+        """
+        if self._view_model is not None:
+            self.service.refresh_quotes()
+
+        themes = self.service.get_themes()
+        if not themes:
+            print("히트맵 데이터를 가져오지 못했습니다.")
+            return False
+
+        group_stats = self.service.get_group_metrics(themes)
+        if self._view_model is not None and themes is self._themes:
+            view_model = HeatmapViewModelBuilder.refresh(
+                self._view_model, themes, group_stats, self.metrics, self.budget
+            )
+        else:
+            view_model = HeatmapViewModelBuilder.build(themes, group_stats, self.metrics, self.budget)
+        self._themes, self._view_model = themes, view_model
+
+        self.visualizer.write_html(view_model, self.output_file)
+        if self.timeline_file is not None:
+            self._update_timeline(view_model)
+        self.cycles += 1
+        return True
+
+    def _update_timeline(self, view_model: HeatmapViewModel) -> None:
+        """이번 주기를 타임라인 시점으로 추가하고 타임라인 HTML을 교체합니다.
+
+        종목 구성 등 구조가 바뀌면 이전 시점과 함께 보여 줄 수 없으므로 새 타임라인을 시작합니다.
+        """
+        if not self.timeline.accepts(view_model):
+            self.timeline.clear()
+        self.timeline.add(time.strftime('%H:%M:%S'), view_model)
+        self.visualizer.write_timeline_html(self.timeline, self.timeline_file)
+
+    def run(self, stop_event: Optional[threading.Event] = None, max_cycles: Optional[int] = None) -> None:
+        """stop_event가 설정되거나 max_cycles에 도달할 때까지 주기적으로 갱신합니다.
+
+        주기 중 오류는 출력하고 다음 주기에 다시 시도합니다.
+        """
+        stop_event = stop_event or threading.Event()
+        done = 0
+        while not stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"히트맵 갱신 실패: {e}")
+            done += 1
+            if max_cycles is not None and done >= max_cycles:
+                break
+            stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
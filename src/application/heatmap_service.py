@@ -1,11 +1,20 @@
+import threading
+import time
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Hashable, Iterable, List, Optional, Tuple
 from domain.models import Stock, Theme, ThemeGroup
-from domain.value_objects import MarketCap, ChangeRatio
-from domain.services import ThemeStatisticsService
-from domain.theme_config import THEME_HIERARCHY, PRIORITY_THEMES, THEME_RENAME
+from domain.services import MarketCapRankIndex, ThemeStatisticsService, ALL_METRICS
+from domain.theme_config import THEME_HIERARCHY, PRIORITY_THEMES, THEME_RENAME, STOCK_NAME_ALIASES
 from infrastructure.krx_repository import KrxRepository
 from infrastructure.file_repository import ThemeFileRepository
+from infrastructure.name_index import StockNameIndex
+from application.theme_universe import ThemeUniverse
+from application.stage_cache import StageCache, fingerprint_file, fingerprint_frame, fingerprint_mapping
+from application.instrumentation import PipelineMetrics, NULL_METRICS
+from application.single_flight import SingleFlight
+
+DEFAULT_NAME_INDEX_PATH = 'data/cache/stock_name_index.json'
+
 
 class HeatmapService:
     """히트맵 데이터 처리 서비스
@@ -14,135 +23,337 @@ class HeatmapService:
     - Repository로부터 데이터 로드
     - Domain Model로 변환
     - Domain Service 활용
+    
+    병합된 데이터는 ThemeUniverse(정규 인메모리 표현) 하나로 보관하고,
+    DataFrame/Domain Model은 그 뷰로 제공하여 API 간 중복 변환을 피합니다.
+    
+    각 단계(listing, membership, merged, themes, group_stats) 결과는 입력 지문을 키로
+    StageCache에 보관되어, 같은 입력의 반복 요청은 캐시된 단계를 재사용합니다.
+    
+    서버/스케줄러에서 동시에 들어온 요청은 SingleFlight로 병합되어 진행 중인 조회/생성 하나를 공유합니다.
     """
     
-    def __init__(self):
-        self.krx_repo = KrxRepository()
-        self.file_repo = ThemeFileRepository()
+    def __init__(
+        self,
+        stage_cache: Optional[StageCache] = None,
+        listing_ttl: Optional[float] = 60.0,
+        name_index: Optional[StockNameIndex] = None,
+        name_index_path: Optional[str] = None,
+        krx_repo: Optional[KrxRepository] = None,
+        file_repo: Optional[ThemeFileRepository] = None,
+        listing_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        metrics: Optional[PipelineMetrics] = None
+    ):
+        """
+        Args:
+            stage_cache: 단계 결과 캐시 (None이면 새로 생성)
+            listing_ttl: KRX 시세 재사용 시간(초). None이면 invalidate 전까지 재사용
+            name_index: 종목명 해석 인덱스 (None이면 name_index_path에서 로드)
+            name_index_path: name_index가 None일 때 인덱스를 불러오고 저장할 경로
+                (None이면 파일 없이 메모리에만 유지, 앱은 DEFAULT_NAME_INDEX_PATH 사용)
+            krx_repo: KRX 시세 저장소 (None이면 KrxRepository)
+            file_repo: 테마 파일 저장소 (None이면 ThemeFileRepository)
+            listing_filter: 병합 전 시세 목록에 적용할 필터 (예: 시장 구분, 시가총액 상위 N개).
+                캐시 키에 포함되므로 해시 가능해야 합니다.
+            metrics: 단계별 계측기 (None이면 기록하지 않음)
+        """
+        self.krx_repo = krx_repo if krx_repo is not None else KrxRepository()
+        self.file_repo = file_repo if file_repo is not None else ThemeFileRepository()
+        self.listing_filter = listing_filter
+        self.metrics = metrics if metrics is not None else NULL_METRICS
         self.theme_stats_service = ThemeStatisticsService()
+        self.rank_index = MarketCapRankIndex()  # 렌더링 간 재사용하는 테마별 시가총액 순위
+        if name_index is None:
+            name_index = StockNameIndex.load(name_index_path) if name_index_path else StockNameIndex()
+        self.name_index = name_index
+        self.name_index.add_aliases(STOCK_NAME_ALIASES)
+        self.stage_cache = stage_cache if stage_cache is not None else StageCache()
+        self.listing_ttl = listing_ttl
+        self._universe: Optional[ThemeUniverse] = None  # 마지막으로 생성한 유니버스
+        self._universe_key: Optional[Hashable] = None  # 마지막 유니버스의 입력 지문
+        self._flights = SingleFlight()  # 동시 요청 병합
+        self._universe_lock = threading.RLock()
 
     def get_heatmap_data(self) -> pd.DataFrame:
         """히트맵 생성을 위한 최종 데이터를 반환합니다.
         
-        하위 호환성을 위해 DataFrame을 반환하지만,
-        내부적으로는 Domain Model을 사용합니다.
+        하위 호환성을 위해 DataFrame을 반환하며, 유니버스의 DataFrame 뷰를 그대로 사용합니다.
         """
-        # 1. 도메인 모델로 변환
-        themes = self._build_theme_models()
+        universe = self._build_universe()
         
-        if not themes:
+        if universe.membership_count == 0:
             print("데이터 로드 실패")
             return pd.DataFrame()
         
-        # 2. Domain Model -> DataFrame 변환 (하위 호환)
-        return self._convert_themes_to_dataframe(themes)
+        return universe.dataframe
 
     def get_themes(self) -> List[Theme]:
         """도메인 모델로 테마 목록을 반환합니다."""
-        return self._build_theme_models()
+        universe = self._build_universe()
+        if universe.is_materialized('themes'):
+            return universe.themes
+        
+        def build_view():
+            with self.metrics.stage('model_build') as record:
+                record.rows = universe.membership_count
+                return universe.themes
+        
+        return self._flights.do(('themes', id(universe)), build_view)
+    
+    async def get_themes_async(self) -> List[Theme]:
+        """get_themes의 asyncio 버전 (동시 요청은 하나의 계산을 공유)"""
+        return await self._flights.do_async('get_themes', self.get_themes)
 
     def calculate_group_stats(self, df_final: pd.DataFrame) -> Dict[str, Dict[str, float]]:
         """테마 그룹별 통계를 계산합니다. (기존 API 유지)"""
-        # DataFrame -> Domain Model 변환
-        themes = self._dataframe_to_themes(df_final)
+        # get_heatmap_data가 반환한 DataFrame이면 이미 만들어 둔 Domain Model 뷰 재사용
+        if self._universe is not None and self._universe.owns(df_final):
+            themes = self._universe.themes
+        else:
+            themes = self._dataframe_to_themes(df_final)
         
         # Domain Service 사용
-        group_stats_models = self.theme_stats_service.calculate_group_stats(themes)
+        group_stats_models = self.get_group_stats_models(themes)
         
         # Domain Model -> Dict 변환 (하위 호환)
         result = {}
         for group_name, group in group_stats_models.items():
             result[group_name] = {
                 'cap': group.market_cap.in_trillion,
-                'change_sum': group.change_sum
+                'change_sum': group.change_sum,
+                'parent_group': group.parent_group
             }
         
         return result
     
     def get_group_stats_models(self, themes: List[Theme]) -> Dict[str, ThemeGroup]:
         """도메인 모델로 그룹 통계를 반환합니다."""
-        return self.theme_stats_service.calculate_group_stats(themes)
+        def compute():
+            with self.metrics.stage('group_stats') as record:
+                record.rows = sum(theme.stock_count for theme in themes)
+                return self.theme_stats_service.calculate_group_stats(themes)
+        
+        return self._cached_group_stage(themes, 'stats', compute)
+    
+    def get_group_metrics(self, themes: List[Theme], metrics: Iterable[str] = ALL_METRICS) -> Dict[str, ThemeGroup]:
+        """테마/그룹 집계 지표를 계산합니다.
+        
+        테마 지표는 theme.metrics에 저장되고, 지표가 포함된 그룹 통계를 반환합니다.
+        """
+        metrics = frozenset(metrics)
+        
+        def compute():
+            with self.metrics.stage('group_stats') as record:
+                record.rows = sum(theme.stock_count for theme in themes)
+                return self.theme_stats_service.aggregate_metrics(themes, metrics)
+        
+        return self._cached_group_stage(themes, ('metrics', metrics), compute)
+    
+    def get_top_stocks(self, themes: List[Theme], top_n: int) -> Dict[str, List[Stock]]:
+        """테마별 시가총액 상위 N개 종목
+        
+        현재 유니버스의 테마 목록이면 data_fingerprint를 버전으로 순위를 보관하여,
+        시세나 테마 구성이 바뀔 때까지 다음 렌더링에서 다시 계산하지 않습니다.
+        """
+        universe = self._universe
+        version = None
+        if universe is not None and universe.is_materialized('themes') and universe.themes is themes:
+            version = self.data_fingerprint()
+        return self.theme_stats_service.get_top_stocks_by_market_cap_batch(
+            themes, top_n, rank_index=self.rank_index, version=version
+        )
+    
+    def data_fingerprint(self) -> Optional[Hashable]:
+        """마지막으로 생성한 유니버스와 그룹 계층 구조의 입력 지문 (없으면 None)
+        
+        시세, 테마 파일, 종목명 해석, 계층 구조 중 하나라도 바뀌면 달라집니다.
+        """
+        if self._universe_key is None:
+            return None
+        return (self._universe_key, fingerprint_mapping(THEME_HIERARCHY))
+    
+    def refresh_quotes(self) -> bool:
+        """KRX 시세를 다시 조회하여 현재 유니버스에 반영합니다.
+        
+        테마 소속, 종목명 해석, 시세 필터가 그대로이면 병합/모델 생성 없이
+        기존 유니버스와 Domain Model(Stock)의 시세만 그 자리에서 갱신합니다.
+        구성이 바뀌었으면 아무것도 갱신하지 않으며, 다음 조회에서 전체를 다시 생성합니다.
+        동시에 요청된 갱신은 한 번의 조회를 공유합니다.
+        
+        Returns:
+            기존 유니버스의 시세를 갱신했으면 True
+        """
+        return self._flights.do('refresh_quotes', self._refresh_quotes)
+    
+    async def refresh_quotes_async(self) -> bool:
+        """refresh_quotes의 asyncio 버전"""
+        return await self._flights.do_async('refresh_quotes', self._refresh_quotes)
+    
+    def _refresh_quotes(self) -> bool:
+        with self._universe_lock:
+            return self._refresh_universe_quotes()
+    
+    def _refresh_universe_quotes(self) -> bool:
+        previous, previous_key = self._universe, self._universe_key
+        self.stage_cache.invalidate('listing')
+        df_krx, listing_fp = self._load_listing()
+        # 시세 필터(시장 구분, 상위 N개 등)는 시세에 따라 종목 구성이 달라질 수 있음
+        if previous is None or previous_key is None or df_krx.empty or self.listing_filter is not None:
+            return False
+        
+        self.name_index.update(df_krx)
+        self.name_index.save()
+        _, membership_fp = self._load_membership()
+        key = self._merged_key(listing_fp, membership_fp)
+        if key[1:] != previous_key[1:]:
+            return False
+        
+        with self.metrics.stage('quote_update') as record:
+            record.rows = previous.stock_count
+            if not previous.update_quotes(df_krx):
+                return False
+        
+        # 갱신된 유니버스를 새 지문으로 등록 (이전 시세의 병합 결과는 더 이상 유효하지 않음)
+        self.stage_cache.discard('themes', previous_key)
+        self.stage_cache.invalidate('merged')
+        self.stage_cache.put('themes', key, previous)
+        self._universe_key = key
+        return True
+    
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """캐시된 단계 결과를 무효화합니다.
+        
+        Args:
+            stage: 'listing', 'membership', 'merged', 'themes', 'group_stats' 중 하나 (None이면 전체)
+        """
+        self.stage_cache.invalidate(stage)
 
     # === Private Methods ===
     
-    def _build_theme_models(self) -> List[Theme]:
-        """Repository로부터 데이터를 로드하여 Domain Model로 변환합니다."""
+    def _build_universe(self) -> ThemeUniverse:
+        """Repository로부터 데이터를 로드하여 ThemeUniverse로 정규화합니다.
+        
+        여러 스레드가 동시에 요청하면 한 번만 조회/생성하고 결과를 공유합니다.
+        """
+        return self._flights.do('universe', self._load_universe)
+    
+    def _load_universe(self) -> ThemeUniverse:
+        # 시세 갱신(refresh_quotes)과 유니버스 교체가 겹치지 않도록 직렬화
+        with self._universe_lock:
+            return self._load_universe_unlocked()
+    
+    def _load_universe_unlocked(self) -> ThemeUniverse:
         # 1. 데이터 로드
-        df_krx = self.krx_repo.fetch_listing()
-        df_theme = self.file_repo.load_themes()
+        df_krx, listing_fp = self._load_listing()
+        df_theme, membership_fp = self._load_membership()
         
         if df_krx.empty or df_theme.empty:
-            return []
+            self._universe = ThemeUniverse.empty()
+            self._universe_key = None
+            return self._universe
         
-        # 2. 데이터 병합
-        merged_df = pd.merge(df_theme, df_krx, left_on='종목명', right_on='Name', how='left')
-        df_final = merged_df.dropna(subset=['Code']).copy()
+        # 2. 종목명 해석 인덱스 갱신 (시세 목록이 바뀐 경우에만)
+        self.name_index.update(df_krx)
+        self.name_index.save()
         
-        # 3. 테마명 변경 적용
-        df_final['테마'] = df_final['테마'].replace(THEME_RENAME)
+        # 3. 데이터 병합 및 테마명 변경 (필터는 전체 목록으로 인덱스를 갱신한 뒤 적용)
+        merged_key = self._merged_key(listing_fp, membership_fp)
+        
+        def merge():
+            with self.metrics.stage('merge') as record:
+                listing = self.listing_filter(df_krx) if self.listing_filter else df_krx
+                df = self._merge(listing, df_theme)
+                record.rows = len(df)
+                return df
+        
+        # 4. 정규 표현으로 변환 (Domain Model/DataFrame 뷰는 필요할 때 생성)
+        def build():
+            df_final = self.stage_cache.get_or_compute('merged', merged_key, merge)
+            with self.metrics.stage('model_build') as record:
+                record.rows = len(df_final)
+                return ThemeUniverse.from_dataframe(df_final)
         
-        # 4. Domain Model로 변환
-        return self._dataframe_to_themes(df_final)
+        self._universe = self.stage_cache.get_or_compute('themes', merged_key, build)
+        self._universe_key = merged_key
+        return self._universe
+    
+    def _merged_key(self, listing_fp: Optional[int], membership_fp: Optional[int]) -> Hashable:
+        """병합/모델 생성 단계의 입력 지문"""
+        return (
+            listing_fp,
+            membership_fp,
+            fingerprint_mapping(THEME_RENAME),
+            self.name_index.version,
+            self.listing_filter
+        )
+    
+    def _load_listing(self) -> Tuple[pd.DataFrame, Optional[int]]:
+        """KRX 시세 (listing_ttl 동안 재사용)와 그 지문"""
+        key = int(time.time() // self.listing_ttl) if self.listing_ttl else None
+        
+        def fetch():
+            with self.metrics.stage('fetch') as record:
+                df = self.krx_repo.fetch_listing()
+                record.rows = len(df)
+            return df, fingerprint_frame(df)
+        
+        df, fp = self.stage_cache.get_or_compute('listing', key, fetch)
+        if df.empty:
+            # 로딩 실패는 캐시하지 않음
+            self.stage_cache.discard('listing', key)
+        return df, fp
+    
+    def _load_membership(self) -> Tuple[pd.DataFrame, Optional[int]]:
+        """테마 소속 데이터 (파일이 바뀌지 않으면 재사용)와 그 지문"""
+        key = fingerprint_file(getattr(self.file_repo, 'file_path', None))
+        
+        def load():
+            with self.metrics.stage('theme_load') as record:
+                df = self.file_repo.load_themes()
+                record.rows = len(df)
+            return df, fingerprint_frame(df)
+        
+        df, fp = self.stage_cache.get_or_compute('membership', key, load)
+        if df.empty or key is None:
+            self.stage_cache.discard('membership', key)
+        return df, fp
+    
+    def _merge(self, df_krx: pd.DataFrame, df_theme: pd.DataFrame) -> pd.DataFrame:
+        """테마 데이터와 KRX 시세를 종목 코드로 병합합니다.
+        
+        종목명은 인덱스로 종목 코드를 찾아 연결하므로 공백/괄호 차이나 별칭, 종목명 변경에도 해석되며,
+        해석된 종목의 종목명은 현재 KRX 종목명으로 표시합니다.
+        """
+        # 종목 코드 -> 시세 행 조회 (해시 인덱스)
+        listing = df_krx.assign(Code=df_krx['Code'].astype(str)).drop_duplicates('Code').set_index('Code')
+        codes = self.name_index.resolve_many(df_theme['종목명'])
+        resolved = codes.isin(listing.index).to_numpy()
+        if not resolved.all():
+            print(f"시세 목록에서 찾지 못한 종목: {df_theme.loc[~resolved, '종목명'].nunique()}개")
+        
+        quotes = listing.reindex(codes[resolved].to_numpy()).rename_axis('Code').reset_index()
+        df_final = pd.concat(
+            [df_theme.loc[resolved, ['테마']].reset_index(drop=True), quotes],
+            axis=1
+        )
+        df_final['종목명'] = df_final['Name']
+        
+        # 테마명 변경 적용
+        df_final['테마'] = df_final['테마'].replace(THEME_RENAME)
+        return df_final
+    
+    def _cached_group_stage(self, themes: List[Theme], kind: Hashable, compute):
+        """현재 유니버스의 테마 목록이면 그룹 통계 단계 결과를 캐시합니다."""
+        universe = self._universe
+        if (universe is None or self._universe_key is None
+                or not universe.is_materialized('themes') or universe.themes is not themes):
+            return compute()
+        key = (self._universe_key, fingerprint_mapping(THEME_HIERARCHY), kind)
+        return self._flights.do(
+            ('group_stats', key),
+            lambda: self.stage_cache.get_or_compute('group_stats', key, compute)
+        )
     
     def _dataframe_to_themes(self, df: pd.DataFrame) -> List[Theme]:
         """DataFrame을 Domain Model(Theme 리스트)로 변환합니다."""
-        themes_dict: Dict[str, Theme] = {}
-        
-        for _, row in df.iterrows():
-            theme_name = str(row.get('테마', ''))
-            stock_name = str(row.get('종목명', row.get('Name', '')))
-            code = str(row.get('Code', ''))
-            
-            # MarketCap Value Object 생성
-            marcap_value = float(row.get('Marcap', 0))
-            market_cap = MarketCap(marcap_value) if marcap_value > 0 else MarketCap.zero()
-            
-            # ChangeRatio Value Object 생성
-            change_value = float(row.get('ChagesRatio', 0))
-            try:
-                change_ratio = ChangeRatio(change_value)
-            except ValueError:
-                # 범위 초과 시 0으로 처리
-                change_ratio = ChangeRatio.zero()
-            
-            # Stock 엔티티 생성
-            try:
-                stock = Stock(
-                    code=code,
-                    name=stock_name,
-                    market_cap=market_cap,
-                    change_ratio=change_ratio
-                )
-            except ValueError:
-                # 유효하지 않은 데이터는 스킵
-                continue
-            
-            # Theme 엔티티에 Stock 추가
-            if theme_name not in themes_dict:
-                theme = Theme(
-                    name=theme_name,
-                    parent_group=THEME_HIERARCHY.get(theme_name)
-                )
-                themes_dict[theme_name] = theme
-            
-            themes_dict[theme_name].add_stock(stock)
-        
-        return list(themes_dict.values())
-    
-    def _convert_themes_to_dataframe(self, themes: List[Theme]) -> pd.DataFrame:
-        """Domain Model을 DataFrame으로 변환합니다. (하위 호환)"""
-        rows = []
-        
-        for theme in themes:
-            for stock in theme.stocks:
-                rows.append({
-                    '테마': theme.name,
-                    '종목명': stock.name,
-                    'Code': stock.code,
-                    'Name': stock.name,
-                    'Marcap': stock.market_cap.value_in_won,
-                    '시가총액_조': stock.market_cap.in_trillion,
-                    'ChagesRatio': stock.change_ratio.value
-                })
-        
-        return pd.DataFrame(rows)
+        return ThemeUniverse.from_dataframe(df).themes
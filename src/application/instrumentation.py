@@ -0,0 +1,174 @@
+"""
+Application Layer - 파이프라인 계측
+
+단계(fetch, theme_load, merge, model_build, group_stats, view_model_build, html_write)별
+소요 시간, 처리 행 수, 최대 메모리 사용량을 기록하고 JSON 또는 Prometheus 텍스트 형식으로 내보냅니다.
+"""
+import json
+import threading
+from collections import deque
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Iterator, Optional
+
+DEFAULT_MAX_RECORDS = 1000
+
+
+@dataclass
+class StageRecord:
+    """단계 실행 기록"""
+    stage: str
+    wall_time: float = 0.0  # 초
+    rows: Optional[int] = None  # 처리 행 수
+    peak_memory: Optional[int] = None  # 단계 중 최대 추가 메모리 (바이트, track_memory일 때만)
+    started_at: float = 0.0  # epoch 초
+
+
+class PipelineMetrics:
+    """파이프라인 단계 계측기
+
+    stage() 컨텍스트로 감싼 구간의 실행 기록을 모읍니다.
+    개별 기록은 최근 max_records개만 보관하고, 단계별 합계(summary)는 모든 기록을 누적하므로
+    상주 모드나 서버처럼 오래 실행되어도 메모리가 늘어나지 않습니다.
+    track_memory=True이면 tracemalloc으로 단계별 최대 메모리를 측정합니다. (실행 속도가 느려짐)
+    """
+
+    def __init__(self, track_memory: bool = False, max_records: Optional[int] = DEFAULT_MAX_RECORDS):
+        """
+        Args:
+            track_memory: 단계별 최대 메모리 측정 여부
+            max_records: 보관할 최근 개별 기록 수 (None이면 제한 없음)
+        """
+        self.track_memory = track_memory
+        self.records: Deque[StageRecord] = deque(maxlen=max_records)
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """단계 구간 계측 (yield된 기록의 rows를 채워 행 수를 남길 수 있음)"""
+        record = StageRecord(stage=name, started_at=time.time())
+        stack = self._stack()
+        if stack and stack[-1][1] is not None:
+            # reset_peak 전에 상위 단계의 현재까지 최댓값 보존
+            parent = stack[-1]
+            parent[2] = max(parent[2], tracemalloc.get_traced_memory()[1] - parent[1])
+        base = self._enter_memory(outermost=not stack)
+        stack.append([record, base, 0])
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - start
+            _, base, child_peak = stack.pop()
+            if base is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                record.peak_memory = max(peak - base, child_peak, 0)
+                if stack:
+                    # 하위 단계에서 reset_peak가 호출되므로 상위 단계에 최댓값 전달
+                    stack[-1][2] = max(stack[-1][2], record.peak_memory + base - stack[-1][1])
+                else:
+                    _release_tracing()
+            self._add(record)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """단계별 합계 (호출 수, 총 시간, 총 행 수, 최대 메모리)"""
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._totals.items()}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """구조화된 JSON (개별 기록과 단계별 합계)"""
+        with self._lock:
+            records = [asdict(record) for record in self.records]
+        return json.dumps(
+            {'records': records, 'summary': self.summary()},
+            ensure_ascii=False,
+            indent=indent
+        )
+
+    def to_prometheus(self, prefix: str = 'krx_heatmap') -> str:
+        """Prometheus 텍스트 노출 형식"""
+        summary = self.summary()
+        metrics = [
+            ('stage_calls_total', 'counter', '단계 실행 횟수', 'calls'),
+            ('stage_seconds_total', 'counter', '단계 누적 소요 시간(초)', 'seconds'),
+            ('stage_rows_total', 'counter', '단계 누적 처리 행 수', 'rows'),
+            ('stage_peak_memory_bytes', 'gauge', '단계 최대 메모리 사용량(바이트)', 'peak_memory'),
+        ]
+        lines = []
+        for name, kind, help_text, key in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for stage, stats in summary.items():
+                value = stats[key]
+                text = repr(float(value)) if isinstance(value, float) else str(int(value))
+                lines.append(f'{prefix}_{name}{{stage="{stage}"}} {text}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """기록 초기화"""
+        with self._lock:
+            self.records.clear()
+            self._totals.clear()
+
+    def _add(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            stats = self._totals.setdefault(record.stage, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'peak_memory': 0})
+            stats['calls'] += 1
+            stats['seconds'] += record.wall_time
+            stats['rows'] += record.rows or 0
+            stats['peak_memory'] = max(stats['peak_memory'], record.peak_memory or 0)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter_memory(self, outermost: bool) -> Optional[int]:
+        if not self.track_memory:
+            return None
+        if outermost:
+            _acquire_tracing()
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+
+# tracemalloc은 프로세스 전역이므로 측정 중인 최상위 단계 수를 세어,
+# 이 모듈이 시작한 추적만 마지막 단계가 끝날 때 중지 (다른 코드가 시작한 추적은 그대로 둠)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class NullMetrics(PipelineMetrics):
+    """아무것도 기록하지 않는 계측기 (기본값)"""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        yield StageRecord(stage=name)
+
+
+NULL_METRICS = NullMetrics()
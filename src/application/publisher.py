@@ -0,0 +1,59 @@
+"""
+Application Layer - 히트맵 스냅샷 제공
+
+서버 등 반복 조회하는 쪽에 현재 히트맵 ViewModel을 데이터 지문과 함께 제공합니다.
+지문이 바뀌었을 때만 그룹 지표와 ViewModel을 다시 만듭니다.
+"""
+import hashlib
+import threading
+from typing import Hashable, Optional
+
+from application.heatmap_service import HeatmapService
+from application.instrumentation import PipelineMetrics
+from application.view_model_builder import HeatmapViewModelBuilder, NodeBudget
+from presentation.view_models import HeatmapSnapshot
+
+
+class HeatmapPublisher:
+    """히트맵 스냅샷 제공자"""
+
+    def __init__(
+        self,
+        service: Optional[HeatmapService] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        budget: Optional[NodeBudget] = None
+    ):
+        """
+        Args:
+            service: 히트맵 서비스 (None이면 생성, 시세는 listing_ttl마다 다시 조회)
+            metrics: 단계별 계측기 (None이면 기록하지 않음)
+            budget: 종목 노드 수 제한 (None이면 모든 종목 표시)
+        """
+        self.service = service if service is not None else HeatmapService(metrics=metrics)
+        self.metrics = metrics
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._snapshot: Optional[HeatmapSnapshot] = None
+
+    def snapshot(self) -> Optional[HeatmapSnapshot]:
+        """현재 데이터의 스냅샷 (데이터가 없으면 None)"""
+        with self._lock:
+            themes = self.service.get_themes()
+            if not themes:
+                return None
+
+            key = self.service.data_fingerprint()
+            if self._snapshot is not None and key == self._key:
+                return self._snapshot
+
+            group_stats = self.service.get_group_metrics(themes)
+            view_model = HeatmapViewModelBuilder.build(themes, group_stats, self.metrics, self.budget)
+            self._key = key
+            self._snapshot = HeatmapSnapshot(fingerprint=_digest(key), view_model=view_model)
+            return self._snapshot
+
+
+def _digest(key: Hashable) -> str:
+    """입력 지문을 ETag 등에 쓸 짧은 문자열로 변환"""
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
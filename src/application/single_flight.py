@@ -0,0 +1,76 @@
+"""
+Application Layer - 동시 요청 병합 (single-flight)
+
+같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 진행 중인 작업의 결과(또는 예외)를 함께 받습니다.
+스레드와 asyncio 코루틴 양쪽에서 사용할 수 있습니다.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """키별 실행 중 작업 병합기
+
+    작업이 끝나면 키가 해제되므로, 결과를 보관하는 캐시가 아니라 동시에 도착한 요청만 합칩니다.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Args:
+            executor: do_async가 작업을 실행할 실행기 (None이면 이벤트 루프 기본 실행기)
+        """
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.shared = 0  # 진행 중인 작업에 합류한 요청 수
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """fn을 실행하거나, 같은 키의 작업이 실행 중이면 그 결과를 기다려 반환합니다."""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """do의 asyncio 버전 (fn은 실행기 스레드에서 실행되어 이벤트 루프를 막지 않음)"""
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(self.executor, self._run, key, future, fn)
+        # 공유 Future를 직접 기다리면 한 호출자의 취소가 Future를 취소하여 다른 호출자에게 퍼지므로
+        # 호출자마다 감싼 Future를 shield로 보호 (취소된 호출자만 CancelledError)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _join(self, key: Hashable):
+        """(키의 Future, 새로 실행해야 하는지 여부)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], T]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(key)
+            if not future.done():  # 외부에서 취소된 경우
+                future.set_exception(e)
+        else:
+            # 결과를 알리기 전에 키를 해제하여 이후 요청은 새로 실행되도록 함
+            self._release(key)
+            if not future.done():
+                future.set_result(result)
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
@@ -0,0 +1,112 @@
+"""
+Application Layer - 파이프라인 단계 캐시
+
+조회 → 병합 → 모델 생성 → 그룹 통계로 이어지는 각 단계의 결과를
+입력 지문(fingerprint)을 키로 보관하여, 반복되거나 일부만 다른 요청에서 재사용합니다.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Mapping, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+T = TypeVar('T')
+
+
+class StageCache:
+    """단계별 결과 LRU 캐시
+
+    (단계명, 입력 지문)을 키로 결과를 저장하며, 전체 항목 수가 maxsize를 넘으면
+    가장 오래 사용하지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        if maxsize < 1:
+            raise ValueError("캐시 크기는 1 이상이어야 합니다")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple[str, Hashable], Any]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, item: Tuple[str, Hashable]) -> bool:
+        return item in self._entries
+
+    def get_or_compute(self, stage: str, key: Hashable, compute: Callable[[], T]) -> T:
+        """캐시된 단계 결과를 반환하거나, 없으면 계산하여 저장합니다.
+
+        Args:
+            stage: 단계명 (예: 'listing', 'merged')
+            key: 단계 입력 지문
+            compute: 결과 계산 함수
+        """
+        entry_key = (stage, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def put(self, stage: str, key: Hashable, value: Any) -> None:
+        """단계 결과를 직접 저장합니다. (예: 이전 결과를 갱신하여 새 지문으로 등록)"""
+        with self._lock:
+            self._entries[(stage, key)] = value
+            self._entries.move_to_end((stage, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, stage: str, key: Hashable) -> None:
+        """특정 단계 결과 제거"""
+        with self._lock:
+            self._entries.pop((stage, key), None)
+
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """단계 결과 무효화 (stage가 None이면 전체)"""
+        with self._lock:
+            if stage is None:
+                self._entries.clear()
+                return
+            for entry_key in [k for k in self._entries if k[0] == stage]:
+                del self._entries[entry_key]
+
+
+def fingerprint_file(path: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    """파일 지문 (절대 경로, 수정 시각, 크기). 파일이 없으면 None"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def fingerprint_frame(df: pd.DataFrame) -> int:
+    """DataFrame 내용 지문 (컬럼 구성과 모든 값의 해시)
+
+    프로세스마다 달라지는 hash()를 사용하므로 같은 프로세스의 캐시 키로만 사용합니다.
+    (파일에 저장하는 종목 목록 지문은 name_index.listing_fingerprint)
+    """
+    if df.empty:
+        return hash((tuple(map(str, df.columns)), len(df)))
+    row_hash = pd.util.hash_pandas_object(df, index=False)
+    return hash((tuple(map(str, df.columns)), len(df), int(row_hash.sum())))
+
+
+def fingerprint_mapping(mapping: Mapping[str, Any]) -> int:
+    """설정 딕셔너리 지문"""
+    return hash(tuple(mapping.items()))
@@ -0,0 +1,249 @@
+"""
+Application Layer - 테마 유니버스 (정규 인메모리 표현)
+
+병합된 (테마, 종목) 데이터를 컬럼 배열로 한 번만 정규화하여 보관하고,
+DataFrame 뷰와 Domain Model 뷰는 필요할 때 이 배열로부터 한 번씩 만들어 캐시합니다.
+"""
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from domain.models import StockRegistry, Theme
+from domain.theme_config import THEME_HIERARCHY
+from domain.value_objects import MarketCap, ChangeRatio
+
+
+class ThemeUniverse:
+    """테마 유니버스
+
+    - 종목 컬럼 (고유 종목당 1행): codes, names, marcaps(원), changes(%), amounts(원)
+    - 테마 컬럼: theme_names, offsets (테마 i의 소속은 members[offsets[i]:offsets[i+1]])
+    - members: 소속(테마, 종목) 순서대로의 종목 인덱스
+    """
+
+    def __init__(
+        self,
+        theme_names: np.ndarray,
+        offsets: np.ndarray,
+        members: np.ndarray,
+        codes: np.ndarray,
+        names: np.ndarray,
+        marcaps: np.ndarray,
+        changes: np.ndarray,
+        amounts: np.ndarray
+    ):
+        self.theme_names = theme_names
+        self.offsets = offsets
+        self.members = members
+        self.codes = codes
+        self.names = names
+        self.marcaps = marcaps
+        self.changes = changes
+        self.amounts = amounts
+        self._registry: Optional[StockRegistry] = None  # Domain Model 뷰의 종목 (생성된 경우)
+
+    @classmethod
+    def empty(cls) -> 'ThemeUniverse':
+        """빈 유니버스"""
+        text = np.empty(0, dtype=object)
+        number = np.empty(0, dtype=np.float64)
+        index = np.empty(0, dtype=np.int64)
+        return cls(text, np.zeros(1, dtype=np.int64), index, text, text, number, number, number)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'ThemeUniverse':
+        """병합된 DataFrame으로부터 유니버스를 생성합니다.
+
+        행 단위 순회 대신 컬럼 단위로 검증/보정하고, 테마별 구간(offset)을 미리 계산합니다.
+        """
+        if df.empty:
+            return cls.empty()
+
+        # 1. 컬럼 단위 검증 및 보정
+        theme_names = _text_column(df, '테마')
+        stock_names = _text_column(df, '종목명' if '종목명' in df.columns else 'Name')
+        codes = _text_column(df, 'Code')
+        marcaps, changes, amounts = _quote_columns(df)
+
+        # 유효하지 않은 데이터(빈 테마명/종목명/종목 코드)는 스킵
+        valid = np.flatnonzero((theme_names != '') & (stock_names != '') & (codes != ''))
+        if len(valid) == 0:
+            return cls.empty()
+
+        # 2. 테마/종목 코드 정수화 (등장 순서 유지) 및 (테마, 종목) 중복 제거
+        theme_ids, theme_uniques = pd.factorize(theme_names[valid], sort=False)
+        stock_ids, code_uniques = pd.factorize(codes[valid], sort=False)
+        _, first_pairs = np.unique(
+            theme_ids.astype(np.int64) * len(code_uniques) + stock_ids,
+            return_index=True
+        )
+        memberships = np.sort(first_pairs)
+
+        # 3. 테마별 구간 계산 (테마 순으로 안정 정렬)
+        memberships = memberships[np.argsort(theme_ids[memberships], kind='stable')]
+        counts = np.bincount(theme_ids[memberships], minlength=len(theme_uniques))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        # 4. 종목 컬럼 (종목 코드당 첫 등장 행 기준)
+        _, first_rows = np.unique(stock_ids, return_index=True)
+        rows = valid[first_rows]
+
+        return cls(
+            theme_names=np.asarray(theme_uniques, dtype=object),
+            offsets=offsets,
+            members=stock_ids[memberships].astype(np.int64),
+            codes=codes[rows],
+            names=stock_names[rows],
+            marcaps=marcaps[rows],
+            changes=changes[rows],
+            amounts=amounts[rows]
+        )
+
+    @property
+    def theme_count(self) -> int:
+        """테마 수"""
+        return len(self.theme_names)
+
+    @property
+    def stock_count(self) -> int:
+        """고유 종목 수"""
+        return len(self.codes)
+
+    @property
+    def membership_count(self) -> int:
+        """(테마, 종목) 소속 수"""
+        return len(self.members)
+
+    def update_quotes(self, listing: pd.DataFrame) -> bool:
+        """종목 구성은 그대로 두고 KRX 시세만 갱신합니다.
+
+        이미 생성된 Domain Model 뷰의 종목은 StockRegistry를 통해 그 자리에서 갱신되고,
+        DataFrame 뷰는 다음 접근 시 다시 생성됩니다.
+
+        Args:
+            listing: Code, Marcap, ChagesRatio, Amount 컬럼을 가진 KRX 종목 목록
+
+        Returns:
+            모든 종목의 시세가 있어 갱신했으면 True, 빠진 종목이 있으면 False (갱신하지 않음)
+        """
+        if 'Code' not in listing.columns:
+            return False
+        quotes = listing.assign(Code=listing['Code'].astype(str)).drop_duplicates('Code').set_index('Code')
+        if not pd.Index(self.codes).isin(quotes.index).all():
+            return False
+
+        self.marcaps, self.changes, self.amounts = _quote_columns(quotes.reindex(self.codes))
+        self.__dict__.pop('dataframe', None)
+        if self._registry is not None:
+            for code, cap, change, amount in zip(
+                self.codes, self.marcaps.tolist(), self.changes.tolist(), self.amounts.tolist()
+            ):
+                self._registry.update_quote(code, MarketCap(cap), ChangeRatio(change), amount)
+        return True
+
+    @cached_property
+    def themes(self) -> List[Theme]:
+        """Domain Model 뷰 (처음 접근할 때 한 번 생성)"""
+        registry = self._registry = StockRegistry()
+        stocks = [
+            registry.get_or_create(
+                code=code,
+                name=name,
+                market_cap=MarketCap(cap),
+                change_ratio=ChangeRatio(change),
+                traded_value=amount
+            )
+            for code, name, cap, change, amount in zip(
+                self.codes, self.names,
+                self.marcaps.tolist(), self.changes.tolist(), self.amounts.tolist()
+            )
+        ]
+
+        members = self.members.tolist()
+        themes = []
+        for i, theme_name in enumerate(self.theme_names):
+            theme = Theme(name=theme_name, parent_group=THEME_HIERARCHY.get(theme_name))
+            theme.add_stocks(stocks[j] for j in members[self.offsets[i]:self.offsets[i + 1]])
+            themes.append(theme)
+        return themes
+
+    @cached_property
+    def dataframe(self) -> pd.DataFrame:
+        """DataFrame 뷰 (하위 호환 컬럼, 처음 접근할 때 한 번 생성)
+
+        소속 1행당 1행입니다. 종목 컬럼을 소속 순서로 모으는 인덱싱에서 한 번 복사되며,
+        그 배열은 DataFrame에 다시 복사하지 않고 담습니다.
+        여러 호출자가 공유하므로 값을 그 자리에서 바꿀 수 없도록 배열을 읽기 전용으로 둡니다.
+        (바꾸려면 df.copy() 사용)
+        """
+        if self.membership_count == 0:
+            return pd.DataFrame()
+
+        theme_rows = np.repeat(np.arange(self.theme_count), np.diff(self.offsets))
+        names = self.names[self.members]
+        marcaps = self.marcaps[self.members]
+        columns = {
+            '테마': self.theme_names[theme_rows],
+            '종목명': names,
+            'Code': self.codes[self.members],
+            'Name': names,
+            'Marcap': marcaps,
+            '시가총액_조': marcaps / 1_000_000_000_000,
+            'ChagesRatio': self.changes[self.members],
+        }
+        for values in columns.values():
+            values.flags.writeable = False
+        self._dataframe_columns = columns
+        return pd.DataFrame(columns, copy=False)
+
+    def is_materialized(self, view: str) -> bool:
+        """뷰('themes' 또는 'dataframe')가 이미 생성되어 있는지 여부"""
+        if view not in ('themes', 'dataframe'):
+            raise ValueError(f"알 수 없는 뷰입니다: {view}")
+        return view in self.__dict__
+
+    def owns(self, df: pd.DataFrame) -> bool:
+        """df가 이 유니버스의 DataFrame 뷰이고 내용이 그대로인지 여부
+
+        값은 읽기 전용이라 바뀔 수 없고, 행을 지우거나 컬럼을 교체하면 배열이 달라지므로
+        길이와 컬럼 배열이 생성 당시와 같은지 확인합니다.
+        """
+        if not self.is_materialized('dataframe') or self.dataframe is not df or len(df) != self.membership_count:
+            return False
+        try:
+            return all(
+                np.may_share_memory(df[column].to_numpy(), values)
+                for column, values in self._dataframe_columns.items()
+            )
+        except KeyError:
+            return False
+
+
+def _text_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """문자열 컬럼 배열 (컬럼이 없으면 빈 문자열)"""
+    if column not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    return df[column].astype(str).to_numpy(dtype=object)
+
+
+def _quote_columns(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """검증/보정된 (시가총액, 등락률, 거래대금) 배열"""
+    # 시가총액/거래대금: 없거나 0 이하이면 0
+    marcaps = _numeric_column(df, 'Marcap')
+    marcaps[~(marcaps > 0)] = 0.0
+    amounts = _numeric_column(df, 'Amount')
+    amounts[~(amounts > 0)] = 0.0
+    # 등락률: ChangeRatio 허용 범위(±100%)를 벗어나면 0으로 처리
+    changes = _numeric_column(df, 'ChagesRatio')
+    changes[~(np.abs(changes) <= 100)] = 0.0
+    return marcaps, changes, amounts
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """실수 컬럼 배열 (컬럼이 없거나 숫자가 아니면 0)"""
+    if column not in df.columns:
+        return np.zeros(len(df))
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
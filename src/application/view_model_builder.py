@@ -3,9 +3,67 @@ Application Layer - ViewModel 변환기
 
 Domain Model을 Presentation ViewModel로 변환하는 로직입니다.
 """
-from typing import List, Dict
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
 from domain.models import Theme, ThemeGroup
-from presentation.view_models import HeatmapViewModel, TreemapNode
+from domain.services import top_n_per_segment
+from presentation.view_models import HeatmapViewModel
+from application.instrumentation import PipelineMetrics, NULL_METRICS
+
+NODE_TEMPLATE = "<b>%{label}</b>"
+LEAF_TEMPLATE = "<b>%{label}</b><br>%{value:.2f}조<br>%{customdata:.2f}%"
+OTHERS_LABEL = "기타"
+
+
+@dataclass(frozen=True)
+class NodeBudget:
+    """종목(Leaf) 노드 수 제한
+    
+    테마마다 시가총액 상위 종목만 남기고 나머지는 '기타' 노드 하나로 합칩니다.
+    '기타' 노드의 시가총액은 나머지 종목의 합계, 등락률은 시가총액 가중 평균이며
+    테마/그룹/루트의 값은 제한과 관계없이 전체 종목으로 계산합니다.
+    
+    둘 다 지정하면 테마별로 더 작은 쪽을 적용합니다. ('기타' 노드는 제한에 포함하지 않음)
+    """
+    per_theme: Optional[int] = None  # 테마별 최대 종목 수
+    total: Optional[int] = None  # 전체 최대 종목 수 (테마별 시가총액 비중으로 배분, 테마당 최소 1개)
+    
+    def __post_init__(self):
+        for name in ('per_theme', 'total'):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name}은(는) 1 이상이어야 합니다: {value}")
+    
+    def limits(self, caps: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """테마별 남길 종목 수
+        
+        Args:
+            caps: 테마 순서로 이어 붙인 종목별 시가총액
+            counts: 테마별 종목 수
+        """
+        limits = counts.copy()
+        if self.per_theme is not None:
+            np.minimum(limits, self.per_theme, out=limits)
+        if self.total is not None:
+            owner = np.repeat(np.arange(len(counts)), counts)
+            theme_caps = np.bincount(owner, weights=caps, minlength=len(counts))
+            total_cap = theme_caps.sum()
+            if total_cap > 0:
+                share = np.floor(self.total * theme_caps / total_cap).astype(np.int64)
+            else:
+                share = np.full(len(counts), self.total // max(len(counts), 1), dtype=np.int64)
+            np.minimum(limits, np.maximum(share, 1), out=limits)
+        return limits
+    
+    def select(self, caps: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """남길 종목의 위치 (테마 순서로 이어 붙인 배열 기준, 오름차순)"""
+        owner = np.repeat(np.arange(len(counts)), counts)
+        return top_n_per_segment(owner, caps, self.limits(caps, counts))
 
 
 class HeatmapViewModelBuilder:
@@ -15,86 +73,347 @@ class HeatmapViewModelBuilder:
     """
     
     @staticmethod
-    def build(themes: List[Theme], group_stats: Dict[str, ThemeGroup]) -> HeatmapViewModel:
+    def build(
+        themes: List[Theme],
+        group_stats: Dict[str, ThemeGroup],
+        metrics: Optional[PipelineMetrics] = None,
+        budget: Optional[NodeBudget] = None
+    ) -> HeatmapViewModel:
         """Domain Model로부터 HeatmapViewModel을 생성합니다.
         
+        테마/그룹에 집계 지표(metrics)가 계산되어 있으면 노드에 함께 담습니다.
+        
         Args:
             themes: 테마 목록
             group_stats: 그룹 통계
+            metrics: 단계별 계측기 (None이면 기록하지 않음)
+            budget: 종목 노드 수 제한 (None이면 모든 종목을 노드로 만듦)
             
         Returns:
             HeatmapViewModel
         """
-        nodes: List[TreemapNode] = []
-        root_id = "KRX_Themes"
+        with (metrics or NULL_METRICS).stage('view_model_build') as record:
+            quotes = _leaf_quotes(themes)
+            structure = _structure_for(themes, group_stats, _selection(quotes, budget))
+            view_model = HeatmapViewModel.with_structure(
+                structure.ids, structure.labels, structure.parents, structure.text_templates
+            )
+            HeatmapViewModelBuilder._fill_values(view_model, themes, group_stats, structure, quotes)
+            record.rows = len(view_model)
+        return view_model
+    
+    @staticmethod
+    def refresh(
+        view_model: HeatmapViewModel,
+        themes: List[Theme],
+        group_stats: Dict[str, ThemeGroup],
+        metrics: Optional[PipelineMetrics] = None,
+        budget: Optional[NodeBudget] = None
+    ) -> HeatmapViewModel:
+        """구조(노드 ID/라벨/부모)가 같으면 기존 ViewModel의 값만 갱신합니다.
         
-        # 1. Root 노드
-        total_mkt_cap = sum(theme.total_market_cap.in_trillion for theme in themes)
+        시세만 바뀐 경우 노드를 다시 만들지 않고 시가총액, 등락률, 지표 배열만 그 자리에서 바꿉니다.
+        구조가 다르면(노드 수 제한으로 남는 종목이 바뀐 경우 포함) build()로 새로 생성합니다.
         
-        if total_mkt_cap > 0:
-            weighted_sum = sum(
-                stock.weighted_change() 
-                for theme in themes 
-                for stock in theme.stocks
-            )
-            total_change = weighted_sum / total_mkt_cap
-        else:
-            total_change = 0.0
-        
-        nodes.append(TreemapNode(
-            id=root_id,
-            label="대한민국 테마별 증시",
-            parent_id="",
-            value=total_mkt_cap,
-            color=total_change,
-            custom_data=total_change,
-            text_template="<b>%{label}</b>"
-        ))
-        
-        # 2. 그룹 노드 (중간 계층)
-        for group_name, group in group_stats.items():
-            group_id = f"Group_{group_name}"
-            
-            nodes.append(TreemapNode(
-                id=group_id,
-                label=group_name,
-                parent_id=root_id,
-                value=group.market_cap.in_trillion,
-                color=group.weighted_change_ratio,
-                custom_data=group.weighted_change_ratio,
-                text_template="<b>%{label}</b>"
-            ))
-        
-        # 3. 테마 노드
-        for theme in themes:
-            parent_id = f"Group_{theme.parent_group}" if theme.parent_group else root_id
-            theme_id = f"Theme_{theme.name}"
+        Args:
+            view_model: 같은 테마 목록으로 이전에 생성한 ViewModel
+            themes: 테마 목록 (시세가 갱신된 상태)
+            group_stats: 그룹 통계
+            metrics: 단계별 계측기 (None이면 기록하지 않음)
+            budget: 종목 노드 수 제한 (build()에 전달한 값)
             
-            nodes.append(TreemapNode(
-                id=theme_id,
-                label=theme.name,
-                parent_id=parent_id,
-                value=theme.total_market_cap.in_trillion,
-                color=theme.weighted_change_ratio,
-                custom_data=theme.weighted_change_ratio,
-                text_template="<b>%{label}</b>"
-            ))
-        
-        # 4. 종목 노드 (Leaf)
-        for theme in themes:
-            theme_id = f"Theme_{theme.name}"
+        Returns:
+            갱신된 view_model 또는 새 HeatmapViewModel
+        """
+        quotes = _leaf_quotes(themes)
+        structure = _structure_for(themes, group_stats, _selection(quotes, budget))
+        # 캐시된 구조 배열을 공유하는 ViewModel만 제자리 갱신
+        if view_model.ids is not structure.ids:
+            return HeatmapViewModelBuilder.build(themes, group_stats, metrics, budget)
+        
+        with (metrics or NULL_METRICS).stage('view_model_refresh') as record:
+            HeatmapViewModelBuilder._fill_values(view_model, themes, group_stats, structure, quotes)
+            record.rows = len(view_model)
+        return view_model
+    
+    @staticmethod
+    def _fill_values(
+        view_model: HeatmapViewModel,
+        themes: List[Theme],
+        group_stats: Dict[str, ThemeGroup],
+        structure: '_Structure',
+        quotes: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    ) -> None:
+        """시가총액, 등락률, 지표 컬럼을 채웁니다. (구조는 그대로)"""
+        caps_won, changes, counts = quotes
+        n_groups, n_themes = len(group_stats), len(themes)
+        theme_start = 1 + n_groups
+        leaf_start = theme_start + n_themes
+        
+        # 종목: 시가총액(조), 등락률, 가중 등락률
+        caps = caps_won / 1_000_000_000_000
+        weighted = changes * caps
+        
+        # 테마: 종목 구간별 합계 (시가총액 0이면 등락률 0)
+        owner = np.repeat(np.arange(n_themes), counts)
+        theme_caps_won = np.bincount(owner, weights=caps_won, minlength=n_themes)
+        theme_caps = theme_caps_won / 1_000_000_000_000
+        theme_changes = _weighted_mean(
+            np.bincount(owner, weights=weighted, minlength=n_themes), theme_caps, theme_caps_won
+        )
+        
+        # 루트: 테마 시가총액 합계와 전체 가중 등락률
+        total_cap = float(theme_caps.sum())
+        view_model.values[0] = total_cap
+        view_model.colors[0] = float(weighted.sum()) / total_cap if total_cap > 0 else 0.0
+        
+        for i, group in enumerate(group_stats.values(), start=1):
+            view_model.values[i] = group.market_cap.in_trillion
+            view_model.colors[i] = group.weighted_change_ratio
+            view_model.metrics[i] = group.metrics.to_dict() if group.metrics else None
+        
+        view_model.values[theme_start:leaf_start] = theme_caps
+        view_model.colors[theme_start:leaf_start] = theme_changes
+        view_model.metrics[theme_start:leaf_start] = [
+            theme.metrics.to_dict() if theme.metrics else None for theme in themes
+        ]
+        
+        sources = structure.leaf_sources
+        if sources is None:
+            view_model.values[leaf_start:] = caps
+            view_model.colors[leaf_start:] = changes
+        else:
+            leaf_values = view_model.values[leaf_start:]
+            leaf_colors = view_model.colors[leaf_start:]
+            kept = sources >= 0
+            leaf_values[kept] = caps[sources[kept]]
+            leaf_colors[kept] = changes[sources[kept]]
             
-            for stock in theme.stocks:
-                stock_id = f"{theme.name}_{stock.name}"
-                
-                nodes.append(TreemapNode(
-                    id=stock_id,
-                    label=stock.name,
-                    parent_id=theme_id,
-                    value=stock.market_cap.in_trillion,
-                    color=stock.change_ratio.value,
-                    custom_data=stock.change_ratio.value,
-                    text_template="<b>%{label}</b><br>%{value:.2f}조<br>%{customdata:.2f}%"
-                ))
-        
-        return HeatmapViewModel(nodes=nodes)
+            # 기타: 남기지 않은 종목의 테마별 합계와 가중 등락률
+            rest = np.ones(len(caps), dtype=bool)
+            rest[sources[kept]] = False
+            rest_caps_won = np.bincount(owner[rest], weights=caps_won[rest], minlength=n_themes)
+            rest_caps = rest_caps_won / 1_000_000_000_000
+            rest_changes = _weighted_mean(
+                np.bincount(owner[rest], weights=weighted[rest], minlength=n_themes), rest_caps, rest_caps_won
+            )
+            others = -1 - sources[~kept]  # 기타 노드의 테마 번호
+            leaf_values[~kept] = rest_caps[others]
+            leaf_colors[~kept] = rest_changes[others]
+        np.copyto(view_model.custom_data, view_model.colors)
+
+
+def _leaf_quotes(themes: List[Theme]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(테마 순서로 이어 붙인 종목별 시가총액(원), 등락률, 테마별 종목 수)"""
+    counts = np.fromiter((len(theme.stocks) for theme in themes), dtype=np.int64, count=len(themes))
+    n_stocks = int(counts.sum())
+    caps_won = np.fromiter(
+        (stock.market_cap.value_in_won for theme in themes for stock in theme.stocks),
+        dtype=np.float64, count=n_stocks
+    )
+    changes = np.fromiter(
+        (stock.change_ratio.value for theme in themes for stock in theme.stocks),
+        dtype=np.float64, count=n_stocks
+    )
+    return caps_won, changes, counts
+
+
+def _selection(quotes: Tuple[np.ndarray, np.ndarray, np.ndarray], budget: Optional[NodeBudget]) -> Optional[np.ndarray]:
+    """노드 수 제한으로 남길 종목 위치 (제한이 없거나 모든 종목이 남으면 None)"""
+    if budget is None:
+        return None
+    caps_won, _, counts = quotes
+    selected = budget.select(caps_won, counts)
+    return None if len(selected) == len(caps_won) else selected
+
+
+def _weighted_mean(weighted_sum: np.ndarray, caps: np.ndarray, caps_won: np.ndarray) -> np.ndarray:
+    """가중 합계 / 시가총액 (시가총액 0이면 0)"""
+    result = np.zeros(len(caps))
+    np.divide(weighted_sum, caps, out=result, where=caps_won != 0)
+    return result
+
+
+class _Structure:
+    """노드 구조 (ID/라벨/부모/템플릿) 배열과 그 구조를 만든 입력
+    
+    노드 순서: 루트 | 그룹 (중간 계층, 여러 단계 가능) | 테마 | 종목 (Leaf)
+    노드 ID는 노드 키의 해시(_node_ids)이며 배열 위치와는 별개입니다.
+    (그룹/테마는 이름, 종목은 (테마명, 종목 코드), 기타는 테마명으로 식별하므로 다른 노드가 추가/삭제되어도 유지)
+    부모는 부모 노드의 ID입니다.
+    같은 구조의 반복 렌더링은 이 배열을 그대로 공유하므로 문자열을 새로 만들지 않습니다.
+    
+    노드 수 제한이 있으면 종목 노드는 테마별로 남긴 종목 뒤에 '기타' 노드(남긴 종목이 전부가 아닐 때)가 옵니다.
+    """
+    
+    def __init__(
+        self,
+        themes: List[Theme],
+        group_stats: Dict[str, ThemeGroup],
+        selected: Optional[np.ndarray] = None
+    ):
+        self.themes = themes
+        self.key = _structure_key(themes, group_stats, selected)
+        group_names, group_parents, theme_parents, self.counts, _, _ = self.key
+        n_groups, n_themes = len(group_names), len(themes)
+        theme_start = 1 + n_groups
+        leaf_start = theme_start + n_themes
+        
+        # 종목 노드별 원본 종목 위치 (기타 노드는 -1 - 테마 번호, 제한이 없으면 None)
+        self.leaf_sources = _leaf_sources(self.counts, selected)
+        owner = np.repeat(np.arange(n_themes), self.counts)
+        if self.leaf_sources is None:
+            leaf_owner = owner
+        else:
+            kept = self.leaf_sources >= 0
+            leaf_owner = np.where(kept, owner[np.maximum(self.leaf_sources, 0)], -1 - self.leaf_sources)
+        size = leaf_start + len(leaf_owner)
+        
+        # 부모 노드 위치 (그룹이 통계에 없으면 루트 아래에 둠)
+        group_index = {name: i for i, name in enumerate(group_names, start=1)}
+        parent_pos = np.empty(size, dtype=np.int64)
+        parent_pos[0] = -1
+        parent_pos[1:theme_start] = [group_index.get(parent, 0) for parent in group_parents]
+        parent_pos[theme_start:leaf_start] = [group_index.get(parent, 0) for parent in theme_parents]
+        parent_pos[leaf_start:] = theme_start + leaf_owner
+        
+        self.ids = _node_ids(_node_keys(themes, group_names, self.leaf_sources))
+        self.parents = self.ids[np.maximum(parent_pos, 0)]
+        self.parents[0] = ""
+        
+        self.labels = np.empty(size, dtype=object)
+        self.labels[0] = HeatmapViewModel.DEFAULT_ROOT_LABEL
+        self.labels[1:theme_start] = group_names
+        self.labels[theme_start:leaf_start] = [theme.name for theme in themes]
+        names = [stock.name for theme in themes for stock in theme.stocks]
+        if self.leaf_sources is None:
+            self.labels[leaf_start:] = names
+        else:
+            self.labels[leaf_start:] = [names[i] if i >= 0 else OTHERS_LABEL for i in self.leaf_sources.tolist()]
+        
+        self.text_templates = np.empty(size, dtype=object)
+        self.text_templates[:leaf_start] = NODE_TEMPLATE
+        self.text_templates[leaf_start:] = LEAF_TEMPLATE
+    
+    def matches(
+        self,
+        themes: List[Theme],
+        group_stats: Dict[str, ThemeGroup],
+        selected: Optional[np.ndarray] = None
+    ) -> bool:
+        """같은 테마 목록, 그룹, 소속 종목, 남길 종목으로 만든 구조인지 여부"""
+        if themes is not self.themes:
+            return False
+        key = _structure_key(themes, group_stats, selected)
+        return (
+            key[:3] == self.key[:3]
+            and all(_same_array(a, b) for a, b in zip(key[3:], self.key[3:]))
+        )
+
+
+def _node_ids(keys: Iterable[Tuple[str, ...]]) -> np.ndarray:
+    """노드 키별 ID 문자열 배열
+    
+    키(그룹명, 테마명, 테마별 종목 코드 등)의 해시이므로 프로세스(배치 워커, 서버 재시작)와
+    관계없이 같은 노드는 항상 같은 ID이고, 테마나 종목이 추가/삭제되어도 나머지 노드의 ID는 바뀌지 않습니다.
+    plotly.js가 ID에 연결해 둔 확대/애니메이션 상태와 diff_view_models의 구조 비교가 같은 노드를 가리킵니다.
+    """
+    ids = [
+        hashlib.blake2b('\x1f'.join(key).encode('utf-8'), digest_size=8).hexdigest()
+        for key in keys
+    ]
+    return np.array(ids, dtype=object)
+
+
+def _node_keys(themes: List[Theme], group_names: Tuple[str, ...], leaf_sources: Optional[np.ndarray]):
+    """노드 순서대로의 ID 키"""
+    yield ('root',)
+    for name in group_names:
+        yield ('group', name)
+    for theme in themes:
+        yield ('theme', theme.name)
+    stocks = [(theme.name, stock.code) for theme in themes for stock in theme.stocks]
+    if leaf_sources is None:
+        for theme_name, code in stocks:
+            yield ('stock', theme_name, code)
+        return
+    for source in leaf_sources.tolist():
+        if source >= 0:
+            yield ('stock',) + stocks[source]
+        else:
+            yield ('others', themes[-1 - source].name)
+
+
+def _structure_key(
+    themes: List[Theme],
+    group_stats: Dict[str, ThemeGroup],
+    selected: Optional[np.ndarray] = None
+):
+    """(그룹명, 그룹의 부모, 테마의 그룹, 테마별 종목 수, 종목 객체 ID, 남길 종목 위치)
+    
+    문자열 생성 없이 비교 가능한 구조 지문
+    """
+    counts = np.fromiter((len(theme.stocks) for theme in themes), dtype=np.int64, count=len(themes))
+    members = np.fromiter(
+        (id(stock) for theme in themes for stock in theme.stocks),
+        dtype=np.uint64, count=int(counts.sum())
+    )
+    return (
+        tuple(group_stats),
+        tuple(group.parent_group for group in group_stats.values()),
+        tuple(theme.parent_group for theme in themes),
+        counts,
+        members,
+        selected,
+    )
+
+
+def _same_array(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return np.array_equal(a, b)
+
+
+def _leaf_sources(counts: np.ndarray, selected: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """종목 노드별 원본 종목 위치 (테마마다 남긴 종목 뒤에 기타 노드 -1 - 테마 번호)"""
+    if selected is None:
+        return None
+    n_themes = len(counts)
+    owner = np.repeat(np.arange(n_themes), counts)
+    kept_counts = np.bincount(owner[selected], minlength=n_themes)
+    has_others = kept_counts < counts
+    
+    # 테마별 구간: 남긴 종목 kept_counts개 + 기타 0/1개
+    sizes = kept_counts + has_others
+    ends = np.cumsum(sizes)
+    sources = np.empty(int(ends[-1]) if n_themes else 0, dtype=np.int64)
+    is_others = np.zeros(len(sources), dtype=bool)
+    is_others[ends[has_others] - 1] = True
+    sources[~is_others] = selected
+    sources[is_others] = -1 - np.flatnonzero(has_others)
+    return sources
+
+
+_STRUCTURE_CACHE_SIZE = 4
+_structures: List[_Structure] = []  # 최근 사용한 구조 (테마 목록 객체별)
+_structures_lock = threading.Lock()
+
+
+def _structure_for(
+    themes: List[Theme],
+    group_stats: Dict[str, ThemeGroup],
+    selected: Optional[np.ndarray] = None
+) -> _Structure:
+    """테마 목록의 노드 구조 (구조가 같으면 캐시된 배열 재사용)"""
+    with _structures_lock:
+        for i, structure in enumerate(_structures):
+            if structure.matches(themes, group_stats, selected):
+                _structures.insert(0, _structures.pop(i))
+                return structure
+    
+    structure = _Structure(themes, group_stats, selected)
+    with _structures_lock:
+        _structures[:] = [s for s in _structures if s.themes is not themes]
+        _structures.insert(0, structure)
+        del _structures[_STRUCTURE_CACHE_SIZE:]
+    return structure
@@ -0,0 +1,150 @@
+"""
+Domain Theme Hierarchy
+
+테마 계층 구조(섹터 → 산업 → 테마 → 세부 테마)를 컴파일한 결과입니다.
+노드를 깊이 오름차순(위상 정렬)으로 저장하고 부모를 인덱스 배열로 표현하여,
+깊은 계층부터 부모로 값을 누적하는 한 번의 상향식 패스로 모든 계층을 집계합니다.
+"""
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .theme_config import THEME_HIERARCHY
+
+
+class ThemeHierarchy:
+    """컴파일된 테마 계층 구조
+
+    - names: 위상 정렬된 노드명 (부모가 항상 자식보다 앞)
+    - parents: 부모 노드 인덱스 배열 (최상위 노드는 -1)
+    - depths: 노드 깊이 배열 (최상위 노드는 0)
+    """
+
+    def __init__(self, names: List[str], parents: np.ndarray, depths: np.ndarray):
+        self.names: Tuple[str, ...] = tuple(names)
+        self.parents = parents
+        self.depths = depths
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        # 같은 깊이의 노드는 연속 구간에 위치하므로 깊이별 경계만 저장
+        max_depth = int(depths.max()) if len(depths) else -1
+        self._level_offsets = np.searchsorted(depths, np.arange(max_depth + 2))
+
+        self.has_children = np.zeros(len(self.names), dtype=bool)
+        self.has_children[parents[parents >= 0]] = True
+
+    @classmethod
+    def compile(cls, mapping: Mapping[str, str]) -> 'ThemeHierarchy':
+        """자식 → 부모 매핑을 부모 인덱스 배열로 컴파일합니다.
+
+        Args:
+            mapping: 자식 노드명 → 부모 노드명 딕셔너리 (여러 단계 연결 가능)
+
+        Returns:
+            ThemeHierarchy
+
+        Raises:
+            ValueError: 계층 구조에 순환이 있는 경우
+        """
+        # 등장 순서를 유지하며 모든 노드 수집
+        order: Dict[str, None] = {}
+        for child, parent in mapping.items():
+            if not child or not parent:
+                continue
+            order.setdefault(parent, None)
+            order.setdefault(child, None)
+
+        depth: Dict[str, int] = {}
+        for name in order:
+            path = []
+            node = name
+            while node not in depth:
+                if node in path:
+                    raise ValueError(f"테마 계층 구조에 순환이 있습니다: {node}")
+                path.append(node)
+                parent = mapping.get(node)
+                if not parent:
+                    depth[node] = 0
+                    path.pop()
+                    break
+                node = parent
+            for visited in reversed(path):
+                depth[visited] = depth[mapping[visited]] + 1
+
+        # 깊이 오름차순, 같은 깊이 안에서는 등장 순서 유지 (stable sort)
+        names = sorted(order, key=lambda n: depth[n])
+        index = {name: i for i, name in enumerate(names)}
+        parents = np.array(
+            [index[mapping[n]] if mapping.get(n) else -1 for n in names],
+            dtype=np.int64
+        )
+        depths = np.array([depth[n] for n in names], dtype=np.int64)
+        return cls(names, parents, depths)
+
+    @classmethod
+    def default(cls) -> 'ThemeHierarchy':
+        """theme_config.THEME_HIERARCHY로부터 컴파일된 계층 구조 (캐시됨)"""
+        return _compile_default()
+
+    def with_overrides(self, overrides: Mapping[str, str]) -> 'ThemeHierarchy':
+        """추가 자식 → 부모 매핑을 반영한 계층 구조를 반환합니다.
+
+        모든 매핑이 이미 반영되어 있으면 재컴파일 없이 자기 자신을 반환합니다.
+        """
+        if all(self.parent_of(child) == parent for child, parent in overrides.items()):
+            return self
+        merged = {
+            name: self.names[p] for name, p in zip(self.names, self.parents) if p >= 0
+        }
+        merged.update(overrides)
+        return ThemeHierarchy.compile(merged)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def index_of(self, name: str) -> Optional[int]:
+        """노드 인덱스 (없으면 None)"""
+        return self._index.get(name)
+
+    def parent_of(self, name: str) -> Optional[str]:
+        """부모 노드명 (최상위이거나 없으면 None)"""
+        idx = self._index.get(name)
+        if idx is None or self.parents[idx] < 0:
+            return None
+        return self.names[self.parents[idx]]
+
+    def ancestors(self, index: int) -> List[int]:
+        """상위 노드 인덱스 목록 (부모부터 최상위까지)"""
+        chain = []
+        parent = self.parents[index]
+        while parent >= 0:
+            chain.append(int(parent))
+            parent = self.parents[parent]
+        return chain
+
+    def rollup(self, values: np.ndarray) -> np.ndarray:
+        """모든 노드에 대해 자신과 하위 노드 값의 합을 계산합니다.
+
+        가장 깊은 계층부터 한 계층씩 부모로 누적하며, 각 계층은 벡터 연산으로 처리합니다.
+
+        Args:
+            values: 노드별 값, shape (n,) 또는 (n, k)
+
+        Returns:
+            하위 노드까지 누적된 값 (입력과 같은 shape)
+        """
+        totals = np.array(values, dtype=np.float64, copy=True)
+        offsets = self._level_offsets
+        for d in range(len(offsets) - 2, 0, -1):
+            lo, hi = offsets[d], offsets[d + 1]
+            np.add.at(totals, self.parents[lo:hi], totals[lo:hi])
+        return totals
+
+
+@lru_cache(maxsize=1)
+def _compile_default() -> ThemeHierarchy:
+    return ThemeHierarchy.compile(THEME_HIERARCHY)
@@ -4,7 +4,7 @@ Domain Models (Entities)
 엔티티는 식별자를 가지며 생명주기 동안 추적됩니다.
 """
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from .value_objects import MarketCap, ChangeRatio
 
 
@@ -13,12 +13,15 @@ class Stock:
     """주식 종목 엔티티
     
     종목 코드로 식별되는 엔티티입니다.
+    여러 테마에 동시에 속할 수 있으며(다대다), 종목 코드당 하나의 인스턴스를
+    모든 테마가 공유하므로 시세 갱신은 한 객체만 변경하면 됩니다.
     """
     code: str  # 식별자
     name: str
     market_cap: MarketCap
     change_ratio: ChangeRatio
-    theme: Optional['Theme'] = None
+    traded_value: float = 0.0  # 거래대금 (원)
+    themes: List['Theme'] = field(default_factory=list, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.code:
@@ -26,6 +29,11 @@ class Stock:
         if not self.name:
             raise ValueError("종목명은 필수입니다")
     
+    @property
+    def theme(self) -> Optional['Theme']:
+        """대표 테마 (처음 추가된 테마) - 하위 호환성 유지"""
+        return self.themes[0] if self.themes else None
+    
     @property
     def market_cap_trillion(self) -> float:
         """시가총액 (조 단위) - 하위 호환성 유지"""
@@ -34,6 +42,18 @@ class Stock:
     def weighted_change(self) -> float:
         """시가총액으로 가중된 등락률"""
         return self.change_ratio.weighted_by(self.market_cap)
+    
+    def update_quote(
+        self,
+        market_cap: MarketCap,
+        change_ratio: ChangeRatio,
+        traded_value: Optional[float] = None
+    ) -> None:
+        """시세 갱신 (이 종목을 포함한 모든 테마에 반영됨)"""
+        self.market_cap = market_cap
+        self.change_ratio = change_ratio
+        if traded_value is not None:
+            self.traded_value = traded_value
 
 
 @dataclass
@@ -45,6 +65,7 @@ class Theme:
     name: str  # 식별자
     stocks: List[Stock] = field(default_factory=list)
     parent_group: Optional[str] = None
+    metrics: Optional['ThemeMetrics'] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.name:
@@ -54,13 +75,25 @@ class Theme:
         """종목 추가"""
         if stock not in self.stocks:
             self.stocks.append(stock)
-            stock.theme = self
+            if not any(theme is self for theme in stock.themes):
+                stock.themes.append(self)
+    
+    def add_stocks(self, stocks: Iterable[Stock]) -> None:
+        """여러 종목을 한 번에 추가 (이미 포함된 종목은 제외)"""
+        existing = {id(stock) for stock in self.stocks}
+        for stock in stocks:
+            if id(stock) in existing:
+                continue
+            existing.add(id(stock))
+            self.stocks.append(stock)
+            if not any(theme is self for theme in stock.themes):
+                stock.themes.append(self)
     
     def remove_stock(self, stock: Stock) -> None:
         """종목 제거"""
         if stock in self.stocks:
             self.stocks.remove(stock)
-            stock.theme = None
+            stock.themes[:] = [theme for theme in stock.themes if theme is not self]
     
     @property
     def total_market_cap(self) -> MarketCap:
@@ -95,6 +128,41 @@ class Theme:
         return len(self.stocks)
 
 
+@dataclass(frozen=True)
+class ThemeMetrics:
+    """테마/그룹 집계 지표
+    
+    ThemeStatisticsService.aggregate_metrics가 계산하며, 요청하지 않은 지표는 None입니다.
+    """
+    stock_count: int
+    market_cap: MarketCap
+    cap_weighted_change: Optional[float] = None  # 시가총액 가중 등락률 (%)
+    equal_weighted_change: Optional[float] = None  # 동일 가중 등락률 (%)
+    advancers: Optional[int] = None  # 상승 종목 수
+    decliners: Optional[int] = None  # 하락 종목 수
+    unchanged: Optional[int] = None  # 보합 종목 수
+    traded_value: Optional[float] = None  # 거래대금 합계 (원)
+    top_gainer: Optional[Stock] = None  # 최대 상승 종목
+    top_loser: Optional[Stock] = None  # 최대 하락 종목
+    
+    def to_dict(self) -> Dict[str, object]:
+        """계산된 지표만 담은 딕셔너리 (종목은 종목명으로 표시)"""
+        result: Dict[str, object] = {
+            'stock_count': self.stock_count,
+            'market_cap': self.market_cap.in_trillion,
+        }
+        for key in ('cap_weighted_change', 'equal_weighted_change', 'advancers',
+                    'decliners', 'unchanged', 'traded_value'):
+            value = getattr(self, key)
+            if value is not None:
+                result[key] = value
+        if self.top_gainer is not None:
+            result['top_gainer'] = self.top_gainer.name
+        if self.top_loser is not None:
+            result['top_loser'] = self.top_loser.name
+        return result
+
+
 @dataclass
 class ThemeGroup:
     """테마 그룹 데이터 클래스 (집계용)
@@ -104,6 +172,8 @@ class ThemeGroup:
     name: str
     market_cap: MarketCap
     change_sum: float  # 가중 평균 계산용 (등락률 * 시가총액) 합계
+    parent_group: Optional[str] = None  # 상위 그룹명 (최상위 그룹이면 None)
+    metrics: Optional['ThemeMetrics'] = None  # 집계 지표 (aggregate_metrics로 계산한 경우)
     
     @property
     def weighted_change_ratio(self) -> float:
@@ -112,3 +182,68 @@ class ThemeGroup:
             return 0.0
         return self.change_sum / self.market_cap.in_trillion
 
+
+class StockRegistry:
+    """종목 플라이웨이트 저장소
+    
+    종목 코드당 하나의 Stock 인스턴스만 생성하여 여러 테마가 공유하도록 합니다.
+    메모리 사용량은 (테마, 종목) 소속 수가 아니라 고유 종목 수에 비례합니다.
+    """
+    
+    def __init__(self):
+        self._stocks: Dict[str, Stock] = {}
+    
+    def __len__(self) -> int:
+        return len(self._stocks)
+    
+    def __contains__(self, code: str) -> bool:
+        return code in self._stocks
+    
+    def get(self, code: str) -> Optional[Stock]:
+        """종목 코드로 조회 (없으면 None)"""
+        return self._stocks.get(code)
+    
+    def get_or_create(
+        self,
+        code: str,
+        name: str,
+        market_cap: MarketCap,
+        change_ratio: ChangeRatio,
+        traded_value: float = 0.0
+    ) -> Stock:
+        """등록된 종목을 반환하거나 새로 생성하여 등록합니다.
+        
+        이미 등록된 종목이면 기존 인스턴스를 그대로 반환합니다. (시세 갱신은 update_quote 사용)
+        
+        Raises:
+            ValueError: 종목 코드나 종목명이 비어 있는 경우
+        """
+        stock = self._stocks.get(code)
+        if stock is None:
+            stock = Stock(
+                code=code,
+                name=name,
+                market_cap=market_cap,
+                change_ratio=change_ratio,
+                traded_value=traded_value
+            )
+            self._stocks[code] = stock
+        return stock
+    
+    def update_quote(
+        self,
+        code: str,
+        market_cap: MarketCap,
+        change_ratio: ChangeRatio,
+        traded_value: Optional[float] = None
+    ) -> bool:
+        """종목 시세 갱신
+        
+        Returns:
+            등록된 종목이면 True, 없으면 False
+        """
+        stock = self._stocks.get(code)
+        if stock is None:
+            return False
+        stock.update_quote(market_cap, change_ratio, traded_value)
+        return True
@@ -4,50 +4,207 @@ Domain Services
 도메인 로직을 담당하는 서비스 레이어입니다.
 여러 엔티티에 걸친 비즈니스 로직을 처리합니다.
 """
-from typing import List, Dict
-from .models import Theme, ThemeGroup, Stock
-from .theme_config import THEME_HIERARCHY
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from .models import Theme, ThemeGroup, ThemeMetrics, Stock
+from .hierarchy import ThemeHierarchy
 from .value_objects import MarketCap
 
+# 집계 지표 (aggregate_metrics의 metrics 인자)
+METRIC_CAP_WEIGHTED_CHANGE = 'cap_weighted_change'  # 시가총액 가중 등락률
+METRIC_EQUAL_WEIGHTED_CHANGE = 'equal_weighted_change'  # 동일 가중 등락률
+METRIC_BREADTH = 'breadth'  # 상승/하락/보합 종목 수
+METRIC_TRADED_VALUE = 'traded_value'  # 거래대금 합계
+METRIC_MOVERS = 'movers'  # 최대 상승/하락 종목
+
+ALL_METRICS = (
+    METRIC_CAP_WEIGHTED_CHANGE,
+    METRIC_EQUAL_WEIGHTED_CHANGE,
+    METRIC_BREADTH,
+    METRIC_TRADED_VALUE,
+    METRIC_MOVERS,
+)
+
 
 class ThemeStatisticsService:
     """테마 통계 계산 도메인 서비스"""
     
     @staticmethod
-    def calculate_group_stats(themes: List[Theme]) -> Dict[str, ThemeGroup]:
+    def calculate_group_stats(
+        themes: List[Theme],
+        hierarchy: Optional[ThemeHierarchy] = None
+    ) -> Dict[str, ThemeGroup]:
         """계층 구조를 고려한 그룹 통계 계산
         
+        상위 그룹을 가진 테마의 종목을 테마 노드에 모은 뒤,
+        컴파일된 계층 구조를 따라 모든 상위 계층으로 한 번에 누적합니다.
+        
         Args:
             themes: 테마 목록
+            hierarchy: 계층 구조 (None이면 THEME_HIERARCHY 사용)
             
         Returns:
             그룹명을 키로, ThemeGroup 통계를 값으로 하는 딕셔너리
         """
-        group_stats: Dict[str, Dict[str, float]] = {}
+        # parent_group은 theme 객체의 속성 또는 THEME_HIERARCHY에서 가져올 수 있음
+        overrides = {theme.name: theme.parent_group for theme in themes if theme.parent_group}
+        hierarchy = (hierarchy or ThemeHierarchy.default()).with_overrides(overrides)
         
+        # 상위 그룹이 있는 테마만 집계 대상
+        theme_indices = []
+        stocks: List[Stock] = []
         for theme in themes:
-            # parent_group은 theme 객체의 속성 또는 THEME_HIERARCHY에서 가져올 수 있음
-            parent_group = theme.parent_group or THEME_HIERARCHY.get(theme.name)
-            
-            if not parent_group:
+            idx = hierarchy.index_of(theme.name)
+            if idx is None or hierarchy.parents[idx] < 0:
                 continue
+            theme_indices.append((idx, len(theme.stocks)))
+            stocks.extend(theme.stocks)
+        
+        n = len(hierarchy)
+        node_stats = np.zeros((n, 3))  # 시가총액(조), 가중 등락률 합계, 테마 수
+        if theme_indices:
+            idx, counts = np.array(theme_indices, dtype=np.int64).T
+            owner = np.repeat(idx, counts)
+            caps = np.fromiter((s.market_cap.in_trillion for s in stocks), dtype=np.float64, count=len(stocks))
+            changes = np.fromiter((s.change_ratio.value for s in stocks), dtype=np.float64, count=len(stocks))
+            node_stats[:, 0] = np.bincount(owner, weights=caps, minlength=n)
+            node_stats[:, 1] = np.bincount(owner, weights=caps * changes, minlength=n)
+            node_stats[:, 2] = np.bincount(idx, minlength=n)
+        
+        totals = hierarchy.rollup(node_stats)
+        
+        # 하위에 집계된 테마가 있는 그룹 노드만 ThemeGroup으로 변환
+        result = {}
+        for i in np.flatnonzero(hierarchy.has_children & (totals[:, 2] > 0)):
+            group_name = hierarchy.names[i]
+            result[group_name] = ThemeGroup(
+                name=group_name,
+                market_cap=MarketCap.from_trillion(totals[i, 0]),
+                change_sum=totals[i, 1],
+                parent_group=hierarchy.parent_of(group_name)
+            )
+        
+        return result
+    
+    @staticmethod
+    def aggregate_metrics(
+        themes: List[Theme],
+        metrics: Iterable[str] = ALL_METRICS,
+        hierarchy: Optional[ThemeHierarchy] = None
+    ) -> Dict[str, ThemeGroup]:
+        """테마와 그룹의 집계 지표를 한 번에 계산
+        
+        각 종목 행을 소속 테마 구간과 상위 그룹 구간에 모두 배치한 뒤,
+        하나의 구간 집계 커널(aggregate_segments)로 모든 지표를 계산합니다.
+        그룹의 시가총액/가중 등락률은 하위 테마 합계(branchvalues='total')와 맞도록 테마별로 더하고,
+        종목 수/상승·하락 수/거래대금/동일 가중 등락률은 여러 하위 테마에 속한 종목을 그룹마다 한 번만 셉니다.
+        테마 지표는 theme.metrics에 저장되고, 그룹 지표는 반환되는 ThemeGroup.metrics에 담깁니다.
+        
+        Args:
+            themes: 테마 목록
+            metrics: 계산할 지표 (ALL_METRICS의 부분집합)
+            hierarchy: 계층 구조 (None이면 THEME_HIERARCHY 사용)
             
-            theme_mkt_cap = theme.total_market_cap
-            theme_change_sum = sum(stock.weighted_change() for stock in theme.stocks)
-            
-            if parent_group not in group_stats:
-                group_stats[parent_group] = {'cap': 0, 'change_sum': 0}
-            
-            group_stats[parent_group]['cap'] += theme_mkt_cap.in_trillion
-            group_stats[parent_group]['change_sum'] += theme_change_sum
+        Returns:
+            그룹명을 키로, 지표가 포함된 ThemeGroup을 값으로 하는 딕셔너리
+        """
+        metrics = frozenset(metrics)
+        unknown = metrics - set(ALL_METRICS)
+        if unknown:
+            raise ValueError(f"지원하지 않는 지표입니다: {sorted(unknown)}")
+        
+        overrides = {theme.name: theme.parent_group for theme in themes if theme.parent_group}
+        hierarchy = (hierarchy or ThemeHierarchy.default()).with_overrides(overrides)
+        n_themes = len(themes)
+        
+        # 1. 종목 배열과 테마 구간 (세그먼트 0 ~ n_themes-1)
+        stocks = [stock for theme in themes for stock in theme.stocks]
+        counts = np.fromiter((len(t.stocks) for t in themes), dtype=np.int64, count=n_themes)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        theme_rows = np.arange(len(stocks))
+        theme_segments = np.repeat(np.arange(n_themes), counts)
+        
+        # 2. 그룹 구간 (세그먼트 n_themes + 계층 노드 인덱스)
+        pair_theme, pair_node = [], []
+        for t, theme in enumerate(themes):
+            idx = hierarchy.index_of(theme.name)
+            if idx is None or hierarchy.parents[idx] < 0:
+                continue
+            nodes = hierarchy.ancestors(idx)
+            if hierarchy.has_children[idx]:
+                nodes.insert(0, idx)
+            pair_theme.extend([t] * len(nodes))
+            pair_node.extend(nodes)
+        pair_theme = np.array(pair_theme, dtype=np.int64)
+        pair_counts = counts[pair_theme]
+        group_segments = np.repeat(n_themes + np.array(pair_node, dtype=np.int64), pair_counts)
+        # (테마, 그룹) 쌍마다 해당 테마의 종목 행 구간을 이어 붙임
+        pair_starts = np.cumsum(pair_counts) - pair_counts
+        group_rows = (np.arange(pair_counts.sum())
+                      - np.repeat(pair_starts - offsets[pair_theme], pair_counts))
+        
+        rows = np.concatenate((theme_rows, group_rows)).astype(np.int64)
+        segments = np.concatenate((theme_segments, group_segments)).astype(np.int64)
+        
+        # 구간마다 같은 종목은 첫 행만 종목 단위 지표에 포함
+        stock_index: Dict[int, int] = {}
+        stock_keys = np.fromiter(
+            (stock_index.setdefault(id(s), len(stock_index)) for s in stocks), dtype=np.int64, count=len(stocks)
+        )
+        _, first_rows = np.unique(segments * max(len(stock_index), 1) + stock_keys[rows], return_index=True)
+        distinct = np.zeros(len(rows), dtype=bool)
+        distinct[first_rows] = True
+        
+        # 3. 단일 패스 집계
+        caps = np.fromiter((s.market_cap.in_trillion for s in stocks), dtype=np.float64, count=len(stocks))
+        changes = np.fromiter((s.change_ratio.value for s in stocks), dtype=np.float64, count=len(stocks))
+        amounts = np.fromiter((s.traded_value for s in stocks), dtype=np.float64, count=len(stocks))
+        stats = aggregate_segments(
+            segments,
+            n_themes + len(hierarchy),
+            caps[rows],
+            changes[rows],
+            amounts[rows],
+            metrics,
+            distinct
+        )
+        
+        def to_metrics(seg: int) -> ThemeMetrics:
+            values = {}
+            for key in ('cap_weighted_change', 'equal_weighted_change', 'traded_value'):
+                if key in stats:
+                    values[key] = float(stats[key][seg])
+            for key in ('advancers', 'decliners', 'unchanged'):
+                if key in stats:
+                    values[key] = int(stats[key][seg])
+            for key in ('top_gainer', 'top_loser'):
+                if key in stats and stats[key][seg] >= 0:
+                    values[key] = stocks[rows[stats[key][seg]]]
+            return ThemeMetrics(
+                stock_count=int(stats['count'][seg]),
+                market_cap=MarketCap.from_trillion(float(stats['cap'][seg])),
+                **values
+            )
+        
+        for t, theme in enumerate(themes):
+            theme.metrics = to_metrics(t)
         
-        # ThemeGroup 객체로 변환
         result = {}
-        for group_name, stats in group_stats.items():
+        for i in np.flatnonzero(hierarchy.has_children):
+            seg = n_themes + i
+            if stats['count'][seg] == 0:
+                continue
+            group_name = hierarchy.names[i]
             result[group_name] = ThemeGroup(
                 name=group_name,
-                market_cap=MarketCap.from_trillion(stats['cap']),
-                change_sum=stats['change_sum']
+                market_cap=MarketCap.from_trillion(float(stats['cap'][seg])),
+                change_sum=float(stats['change_sum'][seg]),
+                parent_group=hierarchy.parent_of(group_name),
+                metrics=to_metrics(seg)
             )
         
         return result
@@ -93,8 +250,304 @@ class ThemeStatisticsService:
         Returns:
             시가총액 상위 종목 목록
         """
-        return sorted(
-            theme.stocks,
-            key=lambda s: s.market_cap.value_in_won,
-            reverse=True
-        )[:top_n]
+        caps = _market_caps(theme.stocks)
+        return [theme.stocks[i] for i in _top_n_indices(caps, top_n)]
+    
+    @staticmethod
+    def get_top_stocks_by_market_cap_batch(
+        themes: List[Theme],
+        top_n: int,
+        rank_index: Optional['MarketCapRankIndex'] = None,
+        version: Optional[Hashable] = None
+    ) -> Dict[str, List[Stock]]:
+        """모든 테마의 시가총액 상위 N개 종목을 한 번에 반환
+        
+        Args:
+            themes: 테마 목록
+            top_n: 테마별 상위 N개
+            rank_index: 렌더링 간 재사용할 순위 인덱스 (None이면 캐시 없이 계산)
+            version: 시세 버전 (rank_index의 캐시 키, None이면 캐시하지 않음)
+            
+        Returns:
+            테마명을 키로, 시가총액 상위 종목 목록을 값으로 하는 딕셔너리
+        """
+        if rank_index is None:
+            return _top_stocks_per_theme(themes, top_n)
+        return rank_index.top_stocks(themes, top_n, version)
+
+
+class MarketCapRankIndex:
+    """테마별 시가총액 순위 인덱스
+    
+    전체 종목의 시가총액을 테마 구간으로 이어 붙인 배열에서 구간별 부분 선택 한 번으로
+    모든 테마의 상위 종목을 고릅니다.
+    호출자가 시세 버전(시세가 바뀔 때마다 달라지는 값, 예: HeatmapService.data_fingerprint)을 넘기면
+    같은 테마 목록, 같은 버전의 결과를 최근 max_entries개까지 보관하여 다음 렌더링에서 계산을 생략합니다.
+    여러 스레드에서 함께 사용할 수 있습니다.
+    """
+    
+    def __init__(self, max_entries: int = 8):
+        """
+        Args:
+            max_entries: 보관할 최대 결과 수 (오래 사용하지 않은 것부터 제거)
+        """
+        self.max_entries = max_entries
+        # (시세 버전, top_n) -> (테마 목록, 테마명별 상위 종목)
+        # 테마 목록 객체를 함께 보관하므로 같은 객체인지 비교할 수 있음
+        self._entries: 'OrderedDict[Tuple[Hashable, int], Tuple[List[Theme], Dict[str, List[Stock]]]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def top_stocks(
+        self,
+        themes: List[Theme],
+        top_n: int,
+        version: Optional[Hashable] = None
+    ) -> Dict[str, List[Stock]]:
+        """테마별 시가총액 상위 N개 종목
+        
+        Args:
+            themes: 테마 목록
+            top_n: 테마별 상위 N개
+            version: 시세 버전 (None이면 캐시하지 않음, 시세나 종목 구성이 바뀌면 다른 값을 넘겨야 함)
+        """
+        key = (version, top_n)
+        if version is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is themes:
+                    self._entries.move_to_end(key)
+                    return dict(entry[1])
+        
+        result = _top_stocks_per_theme(themes, top_n)
+        if version is not None:
+            with self._lock:
+                self._entries[key] = (themes, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            result = dict(result)
+        return result
+    
+    def invalidate(self) -> None:
+        """보관한 결과를 모두 제거"""
+        with self._lock:
+            self._entries.clear()
+
+
+def _top_stocks_per_theme(themes: List[Theme], top_n: int) -> Dict[str, List[Stock]]:
+    """모든 테마의 시가총액 상위 N개 종목 (구간별 선택 한 번)"""
+    counts = np.fromiter((len(t.stocks) for t in themes), dtype=np.int64, count=len(themes))
+    stocks = [stock for theme in themes for stock in theme.stocks]
+    segments = np.repeat(np.arange(len(themes)), counts)
+    limits = np.minimum(counts, max(0, top_n))
+    
+    # 테마 순서, 테마 안에서는 시가총액 내림차순
+    ranked = _ranked_per_segment(segments, _market_caps(stocks), limits).tolist()
+    ends = np.cumsum(limits).tolist()
+    result = {}
+    start = 0
+    for theme, end in zip(themes, ends):
+        result[theme.name] = [stocks[i] for i in ranked[start:end]]
+        start = end
+    return result
+
+
+def _market_caps(stocks: List[Stock]) -> np.ndarray:
+    """종목 시가총액(원) 배열"""
+    return np.fromiter(
+        (stock.market_cap.value_in_won for stock in stocks),
+        dtype=np.float64,
+        count=len(stocks)
+    )
+
+
+def _top_n_indices(values: np.ndarray, top_n: int) -> np.ndarray:
+    """값이 큰 순서의 상위 N개 인덱스 (부분 선택)
+    
+    전체 정렬 없이 부분 선택(np.partition)으로 구한 기준값 이상의 후보만 정렬하며,
+    동일 값은 원래 순서를 유지하여 안정 정렬과 같은 결과를 냅니다.
+    """
+    n = len(values)
+    k = max(0, min(top_n, n))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    if k < n:
+        threshold = np.partition(values, n - k)[n - k]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:k - len(above)]
+        candidates = np.concatenate((above, ties))
+    else:
+        candidates = np.arange(n)
+    
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+def aggregate_segments(
+    segments: np.ndarray,
+    n_segments: int,
+    caps: np.ndarray,
+    changes: np.ndarray,
+    amounts: np.ndarray,
+    metrics: Iterable[str] = ALL_METRICS,
+    distinct: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """구간(세그먼트)별 집계 커널
+    
+    행마다 소속 세그먼트 번호가 주어진 배열을 받아, 요청한 지표를 세그먼트별로 한 번에 계산합니다.
+    
+    Args:
+        segments: 행별 세그먼트 번호
+        n_segments: 세그먼트 수
+        caps: 행별 시가총액 (조)
+        changes: 행별 등락률 (%)
+        amounts: 행별 거래대금 (원)
+        metrics: 계산할 지표
+        distinct: 종목 단위 지표(count, 동일 가중 등락률, 상승/하락/보합, 거래대금)에 포함할 행
+            (같은 구간에 같은 종목이 여러 행이면 하나만 True, None이면 모든 행)
+        
+    Returns:
+        지표명 -> 세그먼트별 값 배열 딕셔너리.
+        항상 count, cap, change_sum을 포함하며 top_gainer/top_loser는 행 위치(없으면 -1)입니다.
+    """
+    metrics = frozenset(metrics)
+    cap = np.bincount(segments, weights=caps, minlength=n_segments)
+    change_sum = np.bincount(segments, weights=caps * changes, minlength=n_segments)
+    stats = {'cap': cap, 'change_sum': change_sum}
+    if METRIC_MOVERS in metrics:
+        # 같은 종목의 중복 행은 등락률이 같으므로 모든 행에서 찾아도 결과 종목은 같음
+        stats['top_gainer'] = _segment_arg_extreme(segments, n_segments, changes, np.maximum, -np.inf)
+        stats['top_loser'] = _segment_arg_extreme(segments, n_segments, changes, np.minimum, np.inf)
+    
+    if distinct is not None:
+        segments, changes, amounts = segments[distinct], changes[distinct], amounts[distinct]
+    count = stats['count'] = np.bincount(segments, minlength=n_segments)
+    
+    if METRIC_CAP_WEIGHTED_CHANGE in metrics:
+        stats['cap_weighted_change'] = np.divide(
+            change_sum, cap, out=np.zeros(n_segments), where=cap > 0
+        )
+    if METRIC_EQUAL_WEIGHTED_CHANGE in metrics:
+        change_total = np.bincount(segments, weights=changes, minlength=n_segments)
+        stats['equal_weighted_change'] = np.divide(
+            change_total, count, out=np.zeros(n_segments), where=count > 0
+        )
+    if METRIC_BREADTH in metrics:
+        stats['advancers'] = np.bincount(segments[changes > 0], minlength=n_segments)
+        stats['decliners'] = np.bincount(segments[changes < 0], minlength=n_segments)
+        stats['unchanged'] = count - stats['advancers'] - stats['decliners']
+    if METRIC_TRADED_VALUE in metrics:
+        stats['traded_value'] = np.bincount(segments, weights=amounts, minlength=n_segments)
+    
+    return stats
+
+
+def top_n_per_segment(segments: np.ndarray, values: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """세그먼트별 값이 큰 상위 limits[세그먼트]개 행 위치 (모든 세그먼트를 한 번에 계산)
+    
+    세그먼트별 기준값을 부분 선택(np.partition)으로 구하므로 전체 정렬을 하지 않으며,
+    동일 값은 앞선 행이 선택됩니다. (_top_n_indices와 같은 기준)
+    
+    Args:
+        segments: 행별 세그먼트 번호
+        values: 행별 값
+        limits: 세그먼트별 선택 개수
+        
+    Returns:
+        선택된 행 위치 (오름차순)
+    """
+    return np.flatnonzero(_top_mask_per_segment(segments, values, limits))
+
+
+def _ranked_per_segment(segments: np.ndarray, values: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """top_n_per_segment의 선택 결과를 세그먼트 순, 세그먼트 안에서는 값 내림차순으로 반환
+    
+    정렬은 선택된 행(세그먼트별 상위 N개)에만 합니다.
+    """
+    rows = np.flatnonzero(_top_mask_per_segment(segments, values, limits))
+    return rows[np.lexsort((rows, -values[rows], segments[rows]))]
+
+
+def _top_mask_per_segment(segments: np.ndarray, values: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """세그먼트별 상위 limits[세그먼트]개 행이면 True인 마스크"""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if np.any(segments[1:] < segments[:-1]):
+        # 세그먼트가 연속 구간이 아니면 세그먼트 순으로 모은 뒤 계산 (안정 정렬이라 세그먼트 안 순서 유지)
+        order = np.argsort(segments, kind='stable')
+        mask = np.empty(n, dtype=bool)
+        mask[order] = _top_mask_per_segment(segments[order], values[order], limits)
+        return mask
+    
+    if np.isnan(values).any():
+        values = np.where(np.isnan(values), -np.inf, values)  # 값이 없는 행은 가장 작은 값으로 취급
+    counts = np.bincount(segments, minlength=len(limits))
+    limits = np.minimum(limits, counts)
+    # 종목 수가 limit 이하인 세그먼트는 전부 선택, 나머지는 기준값 이상만 선택
+    partial = (counts > limits) & (limits > 0)
+    mask = (counts <= limits)[segments]
+    if not partial.any():
+        return mask
+    
+    thresholds = _segment_kth_largest(values, counts, limits, np.flatnonzero(partial))
+    in_partial = partial[segments]
+    threshold = thresholds[segments]
+    above = in_partial & (values > threshold)
+    mask |= above
+    
+    # 기준값과 같은 행은 앞선 행부터 남은 개수만큼 선택
+    ties = np.flatnonzero(in_partial & (values == threshold))
+    tie_segments = segments[ties]
+    tie_rank = np.arange(len(ties)) - np.searchsorted(tie_segments, tie_segments, side='left')
+    remaining = limits - np.bincount(segments[above], minlength=len(limits))
+    mask[ties[tie_rank < remaining[tie_segments]]] = True
+    return mask
+
+
+def _segment_kth_largest(
+    values: np.ndarray,
+    counts: np.ndarray,
+    limits: np.ndarray,
+    targets: np.ndarray
+) -> np.ndarray:
+    """연속 구간 세그먼트 중 targets의 limits[세그먼트]번째로 큰 값 (나머지는 inf)
+    
+    세그먼트를 크기별(2의 거듭제곱 폭)로 묶어 -inf로 채운 2차원 배열에 담고
+    행 단위 np.partition 한 번으로 기준값을 구합니다. (채운 칸은 실제 행 수의 2배 이하)
+    """
+    starts = np.cumsum(counts) - counts
+    thresholds = np.full(len(counts), np.inf)
+    widths = 1 << np.ceil(np.log2(counts[targets])).astype(np.int64)
+    for width in np.unique(widths).tolist():
+        segs = targets[widths == width]
+        sizes = counts[segs]
+        rows = np.repeat(np.arange(len(segs)), sizes)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        padded = np.full((len(segs), width), -np.inf)
+        padded[rows, cols] = values[np.repeat(starts[segs], sizes) + cols]
+        kth = width - limits[segs]
+        padded.partition(np.unique(kth), axis=1)
+        thresholds[segs] = padded[np.arange(len(segs)), kth]
+    return thresholds
+
+
+def _segment_arg_extreme(
+    segments: np.ndarray,
+    n_segments: int,
+    values: np.ndarray,
+    ufunc: np.ufunc,
+    initial: float
+) -> np.ndarray:
+    """세그먼트별 최댓값/최솟값을 가진 첫 행 위치 (빈 세그먼트는 -1)"""
+    extreme = np.full(n_segments, initial)
+    ufunc.at(extreme, segments, values)
+    positions = np.arange(len(values))
+    hit = values == extreme[segments]
+    first = np.full(n_segments, len(values))
+    np.minimum.at(first, segments[hit], positions[hit])
+    return np.where(first < len(values), first, -1)
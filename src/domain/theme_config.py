@@ -2,6 +2,8 @@
 # Domain Logic으로서 테마의 관계를 정의합니다.
 
 # Child Theme -> Parent Theme Mapping
+# 부모도 다시 부모를 가질 수 있어 섹터 → 산업 → 테마 → 세부 테마 형태의 다단계 구조를 표현합니다.
+# (domain.hierarchy.ThemeHierarchy가 부모 인덱스 배열로 컴파일하여 사용)
 THEME_HIERARCHY = {
     "리튬": "2차전지",
     "2차전지(종합)": "2차전지"
@@ -20,3 +22,7 @@ PRIORITY_THEMES = [
 THEME_RENAME = {
     "2차전지": "2차전지(종합)"
 }
+
+# 종목명 별칭 (테마 파일의 종목명 -> KRX 종목 코드)
+# 약칭이나 옛 종목명 등 정규화(공백/괄호 제거)로 해석되지 않는 이름을 등록합니다.
+STOCK_NAME_ALIASES = {}
@@ -0,0 +1,40 @@
+"""
+Infrastructure Layer - 원자적 파일 쓰기
+
+임시 파일에 끝까지 쓴 뒤 대상 경로로 교체하여, 동시에 쓰거나 읽는 쪽이 있어도
+완성된 파일만 보이게 합니다.
+"""
+import os
+import stat
+import tempfile
+from typing import Callable
+
+# 새 파일의 권한 계산용 umask (umask는 조회만 하는 API가 없어 import 시 한 번 읽음)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path: str, write: Callable[[str], None]) -> None:
+    """write(임시 경로)로 쓴 뒤 path로 교체합니다.
+
+    임시 파일은 쓰는 쪽마다 고유하므로 여러 프로세스/스레드가 같은 경로에 써도 충돌하지 않습니다.
+    mkstemp의 0600 권한 대신 기존 파일의 권한(없으면 umask 기준 기본 권한)을 유지합니다.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, _target_mode(path))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _target_mode(path: str) -> int:
+    """교체 후 파일이 가질 권한"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
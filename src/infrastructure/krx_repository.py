@@ -1,11 +1,19 @@
-import FinanceDataReader as fdr
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class KrxRepository:
     """KRX 데이터 저장소"""
     
-    def fetch_listing(self) -> pd.DataFrame:
-        """KRX 전체 종목 데이터를 가져옵니다."""
+    def fetch_listing(self) -> 'pd.DataFrame':
+        """KRX 전체 종목 데이터를 가져옵니다.
+        
+        FinanceDataReader는 import 비용이 커서 실제로 조회할 때 불러옵니다.
+        """
+        import FinanceDataReader as fdr
+        import pandas as pd
+        
         print("KRX 데이터 로딩 중...")
         try:
             df = fdr.StockListing('KRX')
@@ -14,3 +22,17 @@ class KrxRepository:
         except Exception as e:
             print(f"KRX 데이터 로딩 실패: {e}")
             return pd.DataFrame()
+
+
+class SnapshotKrxRepository:
+    """미리 불러온 KRX 종목 데이터 저장소
+    
+    같은 시점의 시세로 여러 히트맵을 만들 때 재조회 없이 스냅샷을 그대로 제공합니다.
+    """
+    
+    def __init__(self, listing: 'pd.DataFrame'):
+        self.listing = listing
+    
+    def fetch_listing(self) -> 'pd.DataFrame':
+        """스냅샷 종목 데이터를 반환합니다."""
+        return self.listing
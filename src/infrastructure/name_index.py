@@ -0,0 +1,206 @@
+"""
+Infrastructure Layer - 종목명 → 종목 코드 해석 인덱스
+
+테마 데이터는 종목을 한글 종목명으로만 식별합니다.
+정규화한 종목명과 별칭(alias)을 KRX 종목 코드로 연결하는 인덱스를 파일로 유지하고,
+KRX 종목 목록이 바뀌면 달라진 종목만 반영합니다.
+"""
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Mapping, Optional
+
+import pandas as pd
+
+from infrastructure.atomic_file import atomic_write
+
+INDEX_FORMAT_VERSION = 1
+
+_IGNORED_CHARS = re.compile(r'[\s()\[\]]+')
+
+
+def listing_fingerprint(listing: pd.DataFrame) -> str:
+    """종목 목록 지문 (Code, Name 컬럼만의 SHA-256)
+
+    시세(시가총액, 등락률)가 바뀌어도 같고, 프로세스나 실행이 달라도 같은 값이므로 파일에 저장해 비교할 수 있습니다.
+    """
+    digest = hashlib.sha256()
+    for column in ('Code', 'Name'):
+        digest.update(column.encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(listing[column].astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def normalize_name(name) -> Optional[str]:
+    """종목명 정규화
+
+    NFC 정규화 후 공백과 괄호를 제거하고 영문은 대소문자를 구분하지 않습니다.
+    (예: '삼성전자 우', '삼성전자(우)' -> '삼성전자우')
+    """
+    if name is None or (isinstance(name, float) and pd.isna(name)):
+        return None
+    value = _IGNORED_CHARS.sub('', unicodedata.normalize('NFC', str(name))).casefold()
+    if not value or value == 'nan':
+        return None
+    return value
+
+
+class StockNameIndex:
+    """종목명 해석 인덱스
+
+    - names_by_code: 종목 코드 -> 현재 KRX 종목명
+    - aliases: 정규화된 별칭 -> 종목 코드 (수동 등록 + 종목명 변경 전 이름)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 인덱스 저장 경로 (None이면 저장하지 않음)
+        """
+        self.path = path
+        self.names_by_code: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self.listing_fingerprint: Optional[str] = None
+        self.version = 0  # 내용이 바뀔 때마다 증가
+        self.dirty = False  # 마지막 저장 이후 내용이나 목록 지문이 바뀌었는지 여부
+        self._codes_by_name: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'StockNameIndex':
+        """저장된 인덱스를 불러옵니다. (없거나 읽을 수 없으면 빈 인덱스)"""
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"종목명 인덱스 읽기 실패: {e}")
+            return index
+        if data.get('format') != INDEX_FORMAT_VERSION:
+            return index
+
+        index.names_by_code = dict(data.get('names_by_code', {}))
+        index.aliases = dict(data.get('aliases', {}))
+        index.listing_fingerprint = data.get('listing_fingerprint')
+        for code, name in index.names_by_code.items():
+            key = normalize_name(name)
+            if key:
+                index._codes_by_name.setdefault(key, code)
+        return index
+
+    def save(self) -> None:
+        """바뀐 내용이 있으면 인덱스를 파일로 저장합니다. (임시 파일에 쓴 뒤 교체)"""
+        if not self.path or not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            'format': INDEX_FORMAT_VERSION,
+            'listing_fingerprint': self.listing_fingerprint,
+            'names_by_code': self.names_by_code,
+            'aliases': self.aliases,
+        }
+
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+        atomic_write(self.path, write)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.names_by_code)
+
+    def update(self, listing: pd.DataFrame, fingerprint: Optional[str] = None) -> bool:
+        """KRX 종목 목록을 반영합니다. 달라진 종목만 갱신합니다.
+
+        이름이 바뀐 종목은 이전 이름을 별칭으로 남겨 기존 테마 데이터가 계속 해석되도록 합니다.
+
+        Args:
+            listing: Code, Name 컬럼을 가진 KRX 종목 목록
+            fingerprint: 목록 지문 (None이면 listing_fingerprint로 계산, 이전 갱신과 같으면 비교를 생략)
+
+        Returns:
+            인덱스 내용이 바뀌었으면 True
+        """
+        if listing.empty or 'Code' not in listing.columns or 'Name' not in listing.columns:
+            return False
+        if fingerprint is None:
+            fingerprint = listing_fingerprint(listing)
+        if fingerprint == self.listing_fingerprint:
+            return False
+
+        valid = listing[['Code', 'Name']].dropna()
+        current = dict(zip(valid['Code'].astype(str), valid['Name'].astype(str)))
+        changed = False
+
+        # 1. 상장 폐지 (목록에서 사라진 종목)
+        for code in [c for c in self.names_by_code if c not in current]:
+            self._remove_name(code, self.names_by_code.pop(code))
+            changed = True
+
+        # 2. 신규 상장 및 종목명 변경
+        for code, name in current.items():
+            old_name = self.names_by_code.get(code)
+            if old_name == name:
+                continue
+            if old_name is not None:
+                self._remove_name(code, old_name)
+                old_key = normalize_name(old_name)
+                if old_key and old_key != normalize_name(name):
+                    self.aliases[old_key] = code
+            self.names_by_code[code] = name
+            key = normalize_name(name)
+            if key:
+                self._codes_by_name.setdefault(key, code)
+            changed = True
+
+        # 내용이 같아도 새 지문을 저장해 두면 다음 실행에서 비교를 생략
+        self.listing_fingerprint = fingerprint
+        self.dirty = True
+        if changed:
+            self.version += 1
+        return changed
+
+    def add_alias(self, alias: str, code: str) -> None:
+        """별칭 등록 (예: 약칭, 옛 종목명)"""
+        key = normalize_name(alias)
+        if key and self.aliases.get(key) != code:
+            self.aliases[key] = code
+            self.version += 1
+            self.dirty = True
+
+    def add_aliases(self, aliases: Mapping[str, str]) -> None:
+        """별칭 일괄 등록 (별칭 -> 종목 코드)"""
+        for alias, code in aliases.items():
+            self.add_alias(alias, code)
+
+    def resolve(self, name) -> Optional[str]:
+        """종목명(또는 별칭)에 해당하는 종목 코드 (없으면 None)"""
+        key = normalize_name(name)
+        if key is None:
+            return None
+        code = self._codes_by_name.get(key)
+        if code is None:
+            code = self.aliases.get(key)
+        return code
+
+    def resolve_many(self, names: pd.Series) -> pd.Series:
+        """종목명 Series를 종목 코드 Series로 변환 (해석 실패는 NaN)"""
+        uniques = names.dropna().unique()
+        mapping = {name: self.resolve(name) for name in uniques}
+        return names.map(mapping)
+
+    def _remove_name(self, code: str, name: str) -> None:
+        key = normalize_name(name)
+        if key and self._codes_by_name.get(key) == code:
+            del self._codes_by_name[key]
+            # 같은 정규화 이름을 가진 다른 종목이 있으면 대신 연결
+            for other_code, other_name in self.names_by_code.items():
+                if other_code != code and normalize_name(other_name) == key:
+                    self._codes_by_name[key] = other_code
+                    break
@@ -0,0 +1,287 @@
+"""
+Presentation Layer - 히트맵 HTTP 서버
+
+표준 라이브러리 http.server로 히트맵 페이지(/), 트리맵 노드 JSON(/api/nodes),
+이전 스냅샷 대비 변경분 JSON(/api/diff)을 제공합니다.
+응답은 데이터 지문별로 한 번만 만들어 재사용하고, ETag/If-None-Match와 gzip 압축을 지원합니다.
+plotly.js는 페이지에 포함하지 않고 버전별 경로(/assets/plotly-<버전>.min.js)로 한 번 내려받아 브라우저가 캐시합니다.
+"""
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from presentation.view_models import HeatmapSnapshot, HeatmapViewModel, diff_view_models
+from presentation.visualizer import HeatmapVisualizer, plotlyjs_asset_name
+
+GZIP_MIN_SIZE = 1024  # 이보다 작은 응답은 압축하지 않음
+ASSET_PREFIX = '/assets/'
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """지문 하나에 대해 만들어 둔 응답 본문"""
+    content_type: str
+    etag: str
+    body: bytes
+    gzip_body: Optional[bytes] = None
+
+
+class HeatmapHttpServer(ThreadingHTTPServer):
+    """히트맵 HTTP 서버
+
+    요청마다 source()로 현재 스냅샷을 받아, 지문이 바뀐 경우에만 HTML/JSON을 다시 만듭니다.
+    최근 스냅샷을 보관하여 /api/diff?since=<지문>으로 그 이후의 변경분(Plotly.restyle 형식)을 제공하고,
+    poll_interval을 지정하면 페이지가 주기적으로 변경분을 받아 차트를 그 자리에서 갱신합니다.
+    """
+
+    daemon_threads = True
+    history_size = 8  # 변경분 계산을 위해 보관하는 이전 스냅샷 수
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        source: Callable[[], Optional[HeatmapSnapshot]],
+        visualizer: Optional[HeatmapVisualizer] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            address: (호스트, 포트)
+            source: 현재 히트맵 스냅샷 제공 함수 (데이터가 없으면 None)
+            visualizer: HTML 생성에 사용할 시각화기 (None이면 생성)
+            poll_interval: 페이지의 변경분 조회 주기(초, None이면 자동 갱신하지 않음)
+        """
+        super().__init__(address, HeatmapRequestHandler)
+        self.source = source
+        self.visualizer = visualizer if visualizer is not None else HeatmapVisualizer()
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._responses: Dict[Tuple[str, ...], CachedResponse] = {}
+        self._history: 'OrderedDict[str, HeatmapViewModel]' = OrderedDict()
+        self._asset: Optional[CachedResponse] = None
+        self.renders = 0  # 응답 본문 생성 횟수
+
+    def get_response(self, route: str, params: Optional[Dict[str, str]] = None) -> Optional[CachedResponse]:
+        """경로의 현재 응답 (데이터가 없으면 None)
+
+        Args:
+            route: 요청 경로 (ROUTES의 키)
+            params: 쿼리 파라미터 (경로가 사용하는 것만 응답 캐시 키에 포함)
+        """
+        snapshot = self.source()
+        if snapshot is None:
+            return None
+        params = params or {}
+        _, _, param_names = ROUTES[route]
+        with self._lock:
+            if snapshot.fingerprint != self._fingerprint:
+                self._fingerprint = snapshot.fingerprint
+                self._responses = {}
+                self._history[snapshot.fingerprint] = snapshot.view_model
+                self._history.move_to_end(snapshot.fingerprint)
+                while len(self._history) > self.history_size:
+                    self._history.popitem(last=False)
+            # 보관하지 않은 지문은 모두 같은 응답(reload)이므로 하나의 키로 묶음
+            key = (route,) + tuple(
+                params.get(name, '') if params.get(name) in self._history else ''
+                for name in param_names
+            )
+            response = self._responses.get(key)
+            if response is None:
+                response = self._responses[key] = self._render(key, snapshot)
+                self.renders += 1
+            return response
+
+    def get_asset(self, name: str) -> Optional[CachedResponse]:
+        """정적 파일 응답 (plotly.js, 없는 파일이면 None)
+
+        파일명에 버전이 있어 내용이 바뀌지 않으므로 한 번만 만들어 둡니다.
+        """
+        if name != plotlyjs_asset_name():
+            return None
+        with self._lock:
+            if self._asset is None:
+                from plotly.offline import get_plotlyjs
+                body = get_plotlyjs().encode('utf-8')
+                self._asset = CachedResponse(
+                    content_type='text/javascript; charset=utf-8',
+                    etag=f'"{name}"',
+                    body=body,
+                    gzip_body=gzip.compress(body, compresslevel=6)
+                )
+            return self._asset
+
+    def previous_view_model(self, fingerprint: str) -> Optional[HeatmapViewModel]:
+        """보관 중인 이전 스냅샷의 ViewModel (없으면 None)"""
+        return self._history.get(fingerprint)
+
+    def _render(self, key: Tuple[str, ...], snapshot: HeatmapSnapshot) -> CachedResponse:
+        route, *values = key
+        content_type, renderer, param_names = ROUTES[route]
+        body = renderer(self, snapshot, dict(zip(param_names, values)))
+        tag = '-'.join([route.strip('/').replace('/', '-') or 'index'] + [v for v in values if v])
+        return CachedResponse(
+            content_type=content_type,
+            etag=f'"{snapshot.fingerprint}-{tag}"',
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        )
+
+
+# 페이지가 주기적으로 변경분을 받아 차트를 갱신하는 스크립트 ({plot_id}는 plotly가 치환)
+_POLL_SCRIPT = """
+(function () {
+    var gd = document.getElementById('{plot_id}');
+    var fingerprint = '%(fingerprint)s';
+    setInterval(function () {
+        fetch('api/diff?since=' + fingerprint, {cache: 'no-cache'})
+            .then(function (r) { return r.ok ? r.json() : null; })
+            .then(function (d) {
+                if (!d) { return; }
+                if (d.reload) { window.location.reload(); return; }
+                if (Object.keys(d.restyle).length) { Plotly.restyle(gd, d.restyle, [0]); }
+                if (Object.keys(d.relayout).length) { Plotly.relayout(gd, d.relayout); }
+                fingerprint = d.fingerprint;
+            })
+            .catch(function () {});
+    }, %(interval_ms)d);
+})();
+"""
+
+
+def _render_page(server: HeatmapHttpServer, snapshot: HeatmapSnapshot, params: Dict[str, str]) -> bytes:
+    post_script = None
+    if server.poll_interval:
+        post_script = _POLL_SCRIPT % {
+            'fingerprint': snapshot.fingerprint,
+            'interval_ms': int(server.poll_interval * 1000),
+        }
+    return server.visualizer.render_html(
+        snapshot.view_model,
+        include_plotlyjs=ASSET_PREFIX.lstrip('/') + plotlyjs_asset_name(),
+        post_script=post_script
+    )
+
+
+def _render_nodes(server: HeatmapHttpServer, snapshot: HeatmapSnapshot, params: Dict[str, str]) -> bytes:
+    data = dict(snapshot.view_model.to_dict(), fingerprint=snapshot.fingerprint)
+    return _json_bytes(data)
+
+
+def _render_diff(server: HeatmapHttpServer, snapshot: HeatmapSnapshot, params: Dict[str, str]) -> bytes:
+    """since 지문 이후의 변경분 (이전 스냅샷이 없거나 구조가 다르면 reload)"""
+    since = params.get('since', '')
+    if since == snapshot.fingerprint:
+        return _json_bytes({'fingerprint': snapshot.fingerprint, 'changed': [], 'restyle': {}, 'relayout': {}})
+
+    previous = server.previous_view_model(since)
+    diff = diff_view_models(previous, snapshot.view_model) if previous is not None else None
+    if diff is None:
+        return _json_bytes({'fingerprint': snapshot.fingerprint, 'reload': True})
+    return _json_bytes(dict(diff.to_dict(), fingerprint=snapshot.fingerprint))
+
+
+def _json_bytes(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _json_default(value):
+    """numpy 스칼라 등 JSON 기본 타입이 아닌 값 변환"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+# 경로 -> (Content-Type, 본문 생성 함수, 응답에 영향을 주는 쿼리 파라미터)
+ROUTES = {
+    '/': ('text/html; charset=utf-8', _render_page, ()),
+    '/api/nodes': ('application/json; charset=utf-8', _render_nodes, ()),
+    '/api/diff': ('application/json; charset=utf-8', _render_diff, ('since',)),
+}
+
+
+class HeatmapRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD 요청 처리기"""
+
+    server: HeatmapHttpServer
+    server_version = 'KrxHeatmap/1.0'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        route = url.path
+        if route.startswith(ASSET_PREFIX):
+            response = self.server.get_asset(route[len(ASSET_PREFIX):])
+            if response is None:
+                self.send_error(404)
+                return
+            # 버전별 파일명이므로 재검증 없이 캐시
+            self._send(response, send_body, cache_control='public, max-age=31536000, immutable')
+            return
+        if route not in ROUTES:
+            self.send_error(404)
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            response = self.server.get_response(route, params)
+        except Exception as e:
+            self.send_error(500, None, f"히트맵 생성 실패: {e}")
+            return
+        if response is None:
+            self.send_error(503, None, "히트맵 데이터가 없습니다")
+            return
+        self._send(response, send_body, cache_control='no-cache')  # 매번 재검증 (변경 없으면 304)
+
+    def _send(self, response: CachedResponse, send_body: bool, cache_control: str) -> None:
+        use_gzip = response.gzip_body is not None and self._accepts_gzip()
+        # 압축 응답은 바이트가 달라지므로 약한 ETag 사용
+        etag = f"W/{response.etag}" if use_gzip else response.etag
+
+        if self._etag_matches(response.etag):
+            self.send_response(304)
+            self._send_cache_headers(etag, cache_control)
+            self.end_headers()
+            return
+
+        body = response.gzip_body if use_gzip else response.body
+        self.send_response(200)
+        self.send_header('Content-Type', response.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self._send_cache_headers(etag, cache_control)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, etag: str, cache_control: str) -> None:
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def _etag_matches(self, etag: str) -> bool:
+        """If-None-Match에 현재 ETag가 있는지 여부 (약한 비교)"""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        candidates = [tag.strip() for tag in header.split(',')]
+        return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    def _accepts_gzip(self) -> bool:
+        header = self.headers.get('Accept-Encoding', '')
+        for item in header.split(','):
+            coding, _, params = item.strip().partition(';')
+            if coding.strip().lower() == 'gzip':
+                return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+        return False
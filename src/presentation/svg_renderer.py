@@ -0,0 +1,132 @@
+"""
+Presentation Layer - 정적 SVG 히트맵
+
+treemap_layout으로 미리 계산한 사각형을 SVG로 그립니다.
+JavaScript와 plotly.js 없이 바로 표시되는 가벼운 페이지를 만들며, 노드에 마우스를 올리면
+브라우저 기본 툴팁(<title>)으로 시가총액과 등락률을 보여 줍니다.
+"""
+from html import escape
+from typing import List, Optional
+
+import numpy as np
+
+from presentation.treemap_layout import TreemapLayout, compute_layout
+from presentation.view_models import HeatmapViewModel
+
+# HeatmapVisualizer.build_figure와 같은 색상 척도 (-5% 파랑 ~ 0% 회색 ~ +5% 빨강)
+COLOR_MIN, COLOR_MAX = -5.0, 5.0
+COLOR_LOW = np.array([0, 0, 255])
+COLOR_MID = np.array([0x44, 0x44, 0x44])
+COLOR_HIGH = np.array([255, 0, 0])
+
+FONT_FAMILY = "Malgun Gothic, sans-serif"
+MIN_RECT_SIZE = 0.5  # 이보다 작은 사각형은 그리지 않음
+# 글자 폭 / 글자 크기 (라벨이 들어가는지 추정)
+CHAR_WIDTH = 0.6
+WIDE_CHAR_WIDTH = 1.0  # 한글 등 전각 문자
+
+
+def render_svg(
+    view_model: HeatmapViewModel,
+    layout: Optional[TreemapLayout] = None,
+    width: float = 1600.0,
+    height: float = 900.0
+) -> str:
+    """히트맵 SVG 문서
+
+    Args:
+        view_model: HeatmapViewModel
+        layout: 미리 계산한 레이아웃 (None이면 width x height로 계산)
+        width: 레이아웃을 계산할 때의 너비
+        height: 레이아웃을 계산할 때의 높이
+
+    Returns:
+        SVG 문자열
+    """
+    if layout is None:
+        layout = compute_layout(view_model, width, height)
+
+    w, h = layout.widths, layout.heights
+    visible = np.flatnonzero((w >= MIN_RECT_SIZE) & (h >= MIN_RECT_SIZE) & (layout.depth > 0))
+    # 부모가 먼저 그려지도록 깊이 순서 (같은 깊이는 노드 순서)
+    visible = visible[np.argsort(layout.depth[visible], kind='stable')]
+    fills = colors_to_hex(view_model.colors)
+
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {layout.width:g} {layout.height:g}" '
+        f'width="{layout.width:g}" height="{layout.height:g}" font-family="{FONT_FAMILY}">',
+        f'<rect width="{layout.width:g}" height="{layout.height:g}" fill="#222"/>',
+    ]
+    labels = view_model.labels
+    values = view_model.values
+    colors = view_model.colors
+    for i in visible.tolist():
+        x, y, rw, rh = layout.x0[i], layout.y0[i], w[i], h[i]
+        label = str(labels[i])
+        tooltip = f"{escape(label)}&#10;시가총액: {values[i]:.2f}조 원&#10;등락률: {colors[i]:.2f}%"
+        parts.append(
+            f'<g><title>{tooltip}</title>'
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{rw:.1f}" height="{rh:.1f}" fill="{fills[i]}" stroke="#222" stroke-width="0.5"/>'
+        )
+        parts.append(_label(layout, i, label, values[i], colors[i]))
+        parts.append('</g>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def render_svg_page(
+    view_model: HeatmapViewModel,
+    layout: Optional[TreemapLayout] = None,
+    width: float = 1600.0,
+    height: float = 900.0
+) -> str:
+    """SVG를 담은 독립 HTML 페이지 (스크립트 없음)"""
+    svg = render_svg(view_model, layout, width, height)
+    return (
+        '<!DOCTYPE html>\n<html lang="ko"><head><meta charset="utf-8">'
+        f'<title>{escape(view_model.title)}</title>'
+        f'<style>body{{margin:0;background:#222;color:#eee;font-family:{FONT_FAMILY}}}'
+        'h1{font-size:18px;margin:10px}svg{display:block;width:100%;height:auto}</style>'
+        f'</head><body><h1>{escape(view_model.title)}</h1>{svg}</body></html>\n'
+    )
+
+
+def colors_to_hex(colors: np.ndarray) -> List[str]:
+    """등락률을 색상 척도의 '#rrggbb' 문자열로 변환"""
+    t = np.clip((np.nan_to_num(colors) - COLOR_MIN) / (COLOR_MAX - COLOR_MIN), 0.0, 1.0)[:, None]
+    low = COLOR_LOW + (COLOR_MID - COLOR_LOW) * (t * 2)
+    high = COLOR_MID + (COLOR_HIGH - COLOR_MID) * (t * 2 - 1)
+    rgb = np.rint(np.where(t < 0.5, low, high)).astype(np.int64)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return [f"#{value:06x}" for value in packed.tolist()]
+
+
+def _label(layout: TreemapLayout, i: int, label: str, value: float, change: float) -> str:
+    """사각형 안의 라벨 (들어갈 공간이 없으면 빈 문자열)
+
+    종목은 가운데에 이름/시가총액/등락률, 그룹/테마는 머리줄에 이름만 표시합니다.
+    """
+    x, y = layout.x0[i], layout.y0[i]
+    w, h = layout.x1[i] - x, layout.y1[i] - y
+    text_width = _text_width(label)
+    label = escape(label)
+    if layout.is_leaf[i]:
+        size = min(15.0, max(8.0, min(w, h) / 5))
+        if h < size * 3.6 or w < size * max(text_width, CHAR_WIDTH * 7):
+            return ''
+        cx, cy = x + w / 2, y + h / 2
+        return (
+            f'<text x="{cx:.1f}" y="{cy - size * 0.6:.1f}" font-size="{size:.0f}" fill="#fff" text-anchor="middle">'
+            f'<tspan font-weight="bold">{label}</tspan>'
+            f'<tspan x="{cx:.1f}" dy="1.2em">{value:.2f}조</tspan>'
+            f'<tspan x="{cx:.1f}" dy="1.2em">{change:.2f}%</tspan></text>'
+        )
+    size = 12.0
+    if h < size * 1.5 or w < size * text_width + 4:
+        return ''
+    return f'<text x="{x + 4:.1f}" y="{y + size + 2:.1f}" font-size="{size:.0f}" fill="#fff" font-weight="bold">{label}</text>'
+
+
+def _text_width(text: str) -> float:
+    """글자 크기 1일 때의 대략적인 문자열 폭"""
+    return sum(WIDE_CHAR_WIDTH if ord(ch) >= 0x1100 else CHAR_WIDTH for ch in text)
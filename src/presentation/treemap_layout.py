@@ -0,0 +1,183 @@
+"""
+Presentation Layer - Squarified Treemap 레이아웃
+
+HeatmapViewModel의 모든 노드(루트, 그룹, 테마, 종목)에 대한 사각형 좌표를 계산합니다.
+브라우저의 plotly.js 없이 서버나 일괄 작업에서 미리 배치를 계산해 SVG 등으로 그릴 때 사용합니다.
+
+알고리즘: Bruls, Huizing, van Wijk, "Squarified Treemaps" (2000)
+형제 노드를 값 내림차순으로 놓고, 행에 노드를 추가해도 가장 나쁜 가로세로 비율이 나빠지지 않는 동안
+같은 행에 쌓습니다. 후보 행들의 비율은 누적합으로 한 번에 계산합니다.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from presentation.view_models import HeatmapViewModel
+
+ROW_WINDOW = 1024  # 한 행의 후보로 한 번에 검사하는 최대 노드 수
+
+
+@dataclass
+class TreemapLayout:
+    """노드별 사각형 (ViewModel의 노드 순서와 같음)
+
+    크기가 0인 노드(값이 0 이하이거나 부모 영역이 없는 경우)는 x0 == x1 또는 y0 == y1입니다.
+    """
+    x0: np.ndarray
+    y0: np.ndarray
+    x1: np.ndarray
+    y1: np.ndarray
+    depth: np.ndarray  # 루트 0
+    is_leaf: np.ndarray
+    width: float
+    height: float
+
+    def __len__(self) -> int:
+        return len(self.x0)
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.x1 - self.x0
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.y1 - self.y0
+
+
+def compute_layout(
+    view_model: HeatmapViewModel,
+    width: float = 1600.0,
+    height: float = 900.0,
+    header: float = 18.0,
+    padding: float = 2.0
+) -> TreemapLayout:
+    """ViewModel의 모든 노드 사각형을 계산합니다.
+
+    자식 영역은 부모 사각형에서 안쪽 여백(padding)과, 부모가 루트가 아니면 라벨용 머리줄(header)을 뺀 영역입니다.
+    자식 값의 합이 부모 값보다 작으면(branchvalues='total') 남는 부분은 빈 공간으로 둡니다.
+
+    Args:
+        view_model: HeatmapViewModel
+        width: 전체 너비
+        height: 전체 높이
+        header: 그룹/테마 노드의 라벨 영역 높이 (영역이 충분할 때만 적용)
+        padding: 부모와 자식 사이 여백
+
+    Returns:
+        TreemapLayout
+    """
+    n = len(view_model)
+    x0, y0 = np.zeros(n), np.zeros(n)
+    x1, y1 = np.zeros(n), np.zeros(n)
+    depth = np.zeros(n, dtype=np.int64)
+
+    parent_index = _parent_index(view_model)
+    values = np.nan_to_num(view_model.values.astype(np.float64), nan=0.0)
+    # 부모 순서로 묶은 뒤 같은 부모 안에서는 값 내림차순 (동일 값은 원래 순서)
+    order = np.lexsort((np.arange(n), -values, parent_index))
+    sorted_parents = parent_index[order]
+    bounds = np.searchsorted(sorted_parents, np.arange(-1, n + 1))
+
+    def children(parent: int) -> np.ndarray:
+        return order[bounds[parent + 1]:bounds[parent + 2]]
+
+    is_leaf = np.diff(bounds)[1:] == 0
+
+    # 루트(부모 없음)들이 전체 영역을 나눔
+    queue = [(-1, (0.0, 0.0, float(width), float(height)))]
+    while queue:
+        parent, rect = queue.pop()
+        kids = children(parent)
+        if len(kids) == 0:
+            continue
+        capacity = float(values[kids].clip(min=0).sum())
+        if parent >= 0:
+            capacity = max(capacity, float(values[parent]))
+        rects = _squarify(values[kids], capacity, *rect)
+        x0[kids], y0[kids], x1[kids], y1[kids] = rects
+        child_depth = depth[parent] + 1 if parent >= 0 else 0
+        depth[kids] = child_depth
+        for kid in kids[~is_leaf[kids]].tolist():
+            inner = _inner_rect(x0[kid], y0[kid], x1[kid], y1[kid], header if child_depth > 0 else 0.0, padding)
+            queue.append((kid, inner))
+
+    return TreemapLayout(x0, y0, x1, y1, depth, is_leaf, float(width), float(height))
+
+
+def _parent_index(view_model: HeatmapViewModel) -> np.ndarray:
+    """노드별 부모 위치 (루트 또는 부모를 찾을 수 없으면 -1)"""
+    index = {node_id: i for i, node_id in enumerate(view_model.ids.tolist())}
+    return np.fromiter(
+        (index.get(parent, -1) for parent in view_model.parents.tolist()),
+        dtype=np.int64, count=len(view_model)
+    )
+
+
+def _inner_rect(x0: float, y0: float, x1: float, y1: float, header: float, padding: float) -> Tuple[float, ...]:
+    """자식을 배치할 영역 (여백과 머리줄을 뺄 공간이 없으면 줄이지 않음)"""
+    w, h = x1 - x0, y1 - y0
+    pad = padding if min(w, h) > 4 * padding else 0.0
+    top = header if h > 3 * header and w > 2 * header else 0.0
+    return (x0 + pad, y0 + pad + top, max(w - 2 * pad, 0.0), max(h - 2 * pad - top, 0.0))
+
+
+def _squarify(
+    values: np.ndarray,
+    capacity: float,
+    x: float,
+    y: float,
+    w: float,
+    h: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """값 내림차순으로 정렬된 형제 노드의 사각형 (x0, y0, x1, y1)
+
+    capacity(부모 값)가 전체 영역에 해당하며, 값이 0 이하인 노드는 크기 0입니다.
+    """
+    n = len(values)
+    x0, y0 = np.full(n, x), np.full(n, y)
+    x1, y1 = np.full(n, x), np.full(n, y)
+    if capacity <= 0 or w <= 0 or h <= 0:
+        return x0, y0, x1, y1
+
+    # 자식 합계가 부모보다 작으면 마지막 행 뒤의 남는 영역은 비워 둠
+    areas = values.clip(min=0) * (w * h / capacity)
+    positive = int(np.count_nonzero(areas > 0))  # 내림차순이므로 앞쪽만 양수
+    i = 0
+    while i < positive:
+        short = min(w, h)
+        if short <= 0:
+            break
+        rest = areas[i:min(positive, i + ROW_WINDOW)]
+        sums = np.cumsum(rest)
+        # 행 i..i+k의 가장 나쁜 비율: max(short² * 최대 / 합², 합² / (short² * 최소))
+        worst = np.maximum(short * short * rest[0] / (sums * sums), (sums * sums) / (short * short * rest))
+        worse = np.flatnonzero(worst[1:] > worst[:-1])
+        k = int(worse[0]) + 1 if len(worse) else len(rest)
+
+        row = rest[:k]
+        row_sum = float(sums[k - 1])
+        if w >= h:
+            # 세로 열로 왼쪽부터 배치
+            thickness = min(row_sum / h, w)
+            lengths = row / thickness
+            ends = y + np.cumsum(lengths)
+            x0[i:i + k], x1[i:i + k] = x, x + thickness
+            y0[i:i + k], y1[i:i + k] = ends - lengths, ends
+            x += thickness
+            w -= thickness
+        else:
+            # 가로 행으로 위쪽부터 배치
+            thickness = min(row_sum / w, h)
+            lengths = row / thickness
+            ends = x + np.cumsum(lengths)
+            y0[i:i + k], y1[i:i + k] = y, y + thickness
+            x0[i:i + k], x1[i:i + k] = ends - lengths, ends
+            y += thickness
+            h -= thickness
+        i += k
+
+    # 크기 0인 노드는 마지막 위치에 점으로
+    x0[i:], x1[i:] = x, x
+    y0[i:], y1[i:] = y, y
+    return x0, y0, x1, y1
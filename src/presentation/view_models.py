@@ -4,7 +4,9 @@ Presentation Layer View Models
 Presentation 레이어를 위한 데이터 전송 객체(DTO)입니다.
 """
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+import numpy as np
 
 
 @dataclass
@@ -17,42 +19,314 @@ class TreemapNode:
     color: float  # 등락률 (%)
     custom_data: float  # 추가 데이터
     text_template: str  # 표시 템플릿
+    metrics: Optional[Dict[str, object]] = None  # 집계 지표 (계산된 경우)
 
 
-@dataclass
 class HeatmapViewModel:
     """히트맵 시각화를 위한 ViewModel
     
     Domain Model을 Presentation 레이어에서 사용하기 위한 형태로 변환한 데이터입니다.
+    노드 속성별 컬럼 배열로 보관하며, 시각화기는 배열을 복사 없이 그대로 사용합니다.
+    
+    - ids, labels, parents, text_templates: 문자열 배열 (object)
+    - values(시가총액, 조), colors(등락률, %), custom_data: float64 배열
+    - metrics: 노드별 집계 지표 리스트
+    
+    구조 컬럼(ids, labels, parents, text_templates)은 같은 구조의 ViewModel끼리 공유될 수 있으므로
+    읽기 전용으로 다룹니다.
     """
-    nodes: List[TreemapNode]
-    root_label: str = "대한민국 테마별 증시"
-    title: str = "대한민국 테마별 증시 히트맵"
+    
+    DEFAULT_ROOT_LABEL = "대한민국 테마별 증시"
+    DEFAULT_TITLE = "대한민국 테마별 증시 히트맵"
+    
+    def __init__(
+        self,
+        nodes: Optional[List[TreemapNode]] = None,
+        root_label: str = DEFAULT_ROOT_LABEL,
+        title: str = DEFAULT_TITLE
+    ):
+        """
+        Args:
+            nodes: 노드 목록 (하위 호환, None이면 빈 ViewModel)
+            root_label: 루트 노드 라벨
+            title: 차트 제목
+        """
+        self.root_label = root_label
+        self.title = title
+        nodes = nodes or []
+        self._allocate(len(nodes))
+        for i, node in enumerate(nodes):
+            self.ids[i] = node.id
+            self.labels[i] = node.label
+            self.parents[i] = node.parent_id
+            self.values[i] = node.value
+            self.colors[i] = node.color
+            self.custom_data[i] = node.custom_data
+            self.text_templates[i] = node.text_template
+            self.metrics[i] = node.metrics
+    
+    @classmethod
+    def allocate(
+        cls,
+        size: int,
+        root_label: str = DEFAULT_ROOT_LABEL,
+        title: str = DEFAULT_TITLE
+    ) -> 'HeatmapViewModel':
+        """노드 size개의 컬럼 배열을 미리 할당한 ViewModel (생성기가 직접 채움)"""
+        view_model = cls(root_label=root_label, title=title)
+        view_model._allocate(size)
+        return view_model
+    
+    @classmethod
+    def with_structure(
+        cls,
+        ids: np.ndarray,
+        labels: np.ndarray,
+        parents: np.ndarray,
+        text_templates: np.ndarray,
+        root_label: str = DEFAULT_ROOT_LABEL,
+        title: str = DEFAULT_TITLE
+    ) -> 'HeatmapViewModel':
+        """주어진 구조 배열을 복사 없이 공유하고 값 컬럼만 새로 할당한 ViewModel"""
+        view_model = cls.allocate(len(ids), root_label=root_label, title=title)
+        view_model.ids = ids
+        view_model.labels = labels
+        view_model.parents = parents
+        view_model.text_templates = text_templates
+        return view_model
+    
+    def _allocate(self, size: int) -> None:
+        self.ids = np.empty(size, dtype=object)
+        self.labels = np.empty(size, dtype=object)
+        self.parents = np.empty(size, dtype=object)
+        self.values = np.zeros(size, dtype=np.float64)
+        self.colors = np.zeros(size, dtype=np.float64)
+        self.custom_data = np.zeros(size, dtype=np.float64)
+        self.text_templates = np.empty(size, dtype=object)
+        self.metrics: List[Optional[Dict[str, object]]] = [None] * size
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def nodes(self) -> List[TreemapNode]:
+        """노드 목록 (하위 호환, 호출할 때마다 컬럼 배열로부터 생성)"""
+        return [
+            TreemapNode(
+                id=node_id,
+                label=label,
+                parent_id=parent_id,
+                value=value,
+                color=color,
+                custom_data=custom_data,
+                text_template=text_template,
+                metrics=metrics
+            )
+            for node_id, label, parent_id, value, color, custom_data, text_template, metrics in zip(
+                self.ids, self.labels, self.parents,
+                self.values.tolist(), self.colors.tolist(), self.custom_data.tolist(),
+                self.text_templates, self.metrics
+            )
+        ]
     
     def get_ids(self) -> List[str]:
         """모든 노드의 ID 리스트"""
-        return [node.id for node in self.nodes]
+        return self.ids.tolist()
     
     def get_labels(self) -> List[str]:
         """모든 노드의 라벨 리스트"""
-        return [node.label for node in self.nodes]
+        return self.labels.tolist()
     
     def get_parents(self) -> List[str]:
         """모든 노드의 부모 ID 리스트"""
-        return [node.parent_id for node in self.nodes]
+        return self.parents.tolist()
     
     def get_values(self) -> List[float]:
         """모든 노드의 값 리스트"""
-        return [node.value for node in self.nodes]
+        return self.values.tolist()
     
     def get_colors(self) -> List[float]:
         """모든 노드의 색상 값 리스트"""
-        return [node.color for node in self.nodes]
+        return self.colors.tolist()
     
     def get_custom_data(self) -> List[float]:
         """모든 노드의 커스텀 데이터 리스트"""
-        return [node.custom_data for node in self.nodes]
+        return self.custom_data.tolist()
     
     def get_text_templates(self) -> List[str]:
         """모든 노드의 텍스트 템플릿 리스트"""
-        return [node.text_template for node in self.nodes]
+        return self.text_templates.tolist()
+    
+    def get_metrics(self) -> List[Optional[Dict[str, object]]]:
+        """모든 노드의 집계 지표 리스트"""
+        return list(self.metrics)
+    
+    def to_dict(self) -> Dict[str, object]:
+        """JSON 직렬화용 딕셔너리 (노드 속성별 컬럼 배열)"""
+        return {
+            'title': self.title,
+            'root_label': self.root_label,
+            'count': len(self),
+            'nodes': {
+                'ids': self.get_ids(),
+                'labels': self.get_labels(),
+                'parents': self.get_parents(),
+                'values': self.get_values(),
+                'colors': self.get_colors(),
+                'metrics': self.get_metrics(),
+            },
+        }
+
+
+@dataclass
+class ViewModelDiff:
+    """같은 구조의 두 ViewModel 사이의 변경분
+    
+    값이 하나라도 바뀐 컬럼만 새 전체 배열로 담습니다. (Plotly.restyle은 배열 단위로 교체)
+    배열은 복사본이므로 ViewModel이 제자리 갱신(HeatmapViewModelBuilder.refresh)되어도 바뀌지 않습니다.
+    """
+    changed: np.ndarray  # 값/색상이 바뀐 노드 위치
+    values: Optional[np.ndarray] = None
+    colors: Optional[np.ndarray] = None
+    custom_data: Optional[np.ndarray] = None
+    title: Optional[str] = None  # 바뀐 경우 새 제목
+    
+    @property
+    def is_empty(self) -> bool:
+        """변경 없음"""
+        return len(self.changed) == 0 and self.title is None
+    
+    def to_restyle(self) -> Dict[str, list]:
+        """Plotly.restyle(gd, update, [0])에 전달할 update 객체"""
+        update: Dict[str, list] = {}
+        if self.values is not None:
+            update['values'] = [self.values.tolist()]
+        if self.colors is not None:
+            update['marker.colors'] = [self.colors.tolist()]
+        if self.custom_data is not None:
+            update['customdata'] = [self.custom_data.tolist()]
+        return update
+    
+    def to_relayout(self) -> Dict[str, object]:
+        """Plotly.relayout에 전달할 update 객체"""
+        return {'title.text': self.title} if self.title is not None else {}
+    
+    def to_dict(self) -> Dict[str, object]:
+        """JSON 직렬화용 딕셔너리"""
+        return {
+            'changed': self.changed.tolist(),
+            'restyle': self.to_restyle(),
+            'relayout': self.to_relayout(),
+        }
+
+
+def diff_view_models(previous: HeatmapViewModel, current: HeatmapViewModel) -> Optional[ViewModelDiff]:
+    """이전 ViewModel 대비 변경분
+    
+    구조(ID/라벨/부모)가 같을 때만 비교하며, 구조가 다르면 None (전체 차트를 다시 그려야 함)
+    """
+    if not _same_structure(previous, current):
+        return None
+    
+    value_changed = _changed(previous.values, current.values)
+    color_changed = _changed(previous.colors, current.colors)
+    custom_changed = _changed(previous.custom_data, current.custom_data)
+    return ViewModelDiff(
+        changed=np.flatnonzero(value_changed | color_changed | custom_changed),
+        values=current.values.copy() if value_changed.any() else None,
+        colors=current.colors.copy() if color_changed.any() else None,
+        custom_data=current.custom_data.copy() if custom_changed.any() else None,
+        title=current.title if current.title != previous.title else None
+    )
+
+
+def _same_structure(previous: HeatmapViewModel, current: HeatmapViewModel) -> bool:
+    if len(previous) != len(current):
+        return False
+    return all(
+        a is b or np.array_equal(a, b)
+        for a, b in (
+            (previous.ids, current.ids),
+            (previous.labels, current.labels),
+            (previous.parents, current.parents),
+        )
+    )
+
+
+def _changed(previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """위치별 변경 여부 (NaN끼리는 같은 값으로 취급)"""
+    return ~((previous == current) | (np.isnan(previous) & np.isnan(current)))
+
+
+@dataclass(frozen=True)
+class TimelineFrame:
+    """타임라인의 시점 하나 (값 배열만 보관)"""
+    label: str
+    values: np.ndarray
+    colors: np.ndarray
+    custom_data: np.ndarray
+
+
+class HeatmapTimeline:
+    """같은 구조의 여러 시점 히트맵
+    
+    구조(ID/라벨/부모/템플릿)는 처음 추가한 ViewModel의 배열을 한 번만 보관하고,
+    시점마다 값/색상 배열만 복사해 둡니다. (ViewModel은 이후 제자리 갱신될 수 있으므로 복사)
+    """
+    
+    def __init__(self, max_frames: Optional[int] = None):
+        """
+        Args:
+            max_frames: 보관할 최대 시점 수 (넘으면 오래된 시점부터 제거, None이면 제한 없음)
+        """
+        if max_frames is not None and max_frames < 1:
+            raise ValueError("max_frames는 1 이상이어야 합니다")
+        self.max_frames = max_frames
+        self.structure: Optional[HeatmapViewModel] = None  # 구조 컬럼과 제목만 사용
+        self.frames: List[TimelineFrame] = []
+    
+    def __len__(self) -> int:
+        return len(self.frames)
+    
+    def accepts(self, view_model: HeatmapViewModel) -> bool:
+        """구조가 같아 시점으로 추가할 수 있는지 여부"""
+        return self.structure is None or _same_structure(self.structure, view_model)
+    
+    def add(self, label: str, view_model: HeatmapViewModel) -> None:
+        """시점 추가
+        
+        Args:
+            label: 시점 이름 (슬라이더에 표시, 예: '09:30')
+            view_model: 이 시점의 ViewModel
+            
+        Raises:
+            ValueError: 기존 시점과 구조가 다른 경우
+        """
+        if not self.accepts(view_model):
+            raise ValueError("구조(ID/라벨/부모)가 다른 ViewModel은 같은 타임라인에 추가할 수 없습니다")
+        if self.structure is None:
+            self.structure = HeatmapViewModel.with_structure(
+                view_model.ids, view_model.labels, view_model.parents, view_model.text_templates,
+                root_label=view_model.root_label
+            )
+        self.structure.title = view_model.title
+        self.frames.append(TimelineFrame(
+            label=label,
+            values=view_model.values.copy(),
+            colors=view_model.colors.copy(),
+            custom_data=view_model.custom_data.copy()
+        ))
+        if self.max_frames is not None:
+            del self.frames[:-self.max_frames]
+    
+    def clear(self) -> None:
+        """모든 시점과 구조 제거"""
+        self.structure = None
+        self.frames = []
+
+
+@dataclass(frozen=True)
+class HeatmapSnapshot:
+    """특정 데이터 지문의 ViewModel (서버 응답 캐시 단위)"""
+    fingerprint: str  # 입력 데이터가 같으면 같은 값
+    view_model: HeatmapViewModel
@@ -1,7 +1,15 @@
-import plotly.graph_objects as go
-import pandas as pd
 import os
-from presentation.view_models import HeatmapViewModel
+from contextlib import nullcontext
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from infrastructure.atomic_file import atomic_write
+from presentation.view_models import HeatmapTimeline, HeatmapViewModel
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class HeatmapVisualizer:
     """히트맵 시각화 클래스
@@ -10,40 +18,118 @@ class HeatmapVisualizer:
     비즈니스 로직은 포함하지 않으며, ViewModel을 받아 Plotly 차트를 생성합니다.
     """
     
+    def __init__(self, metrics=None, asset_dir: Optional[str] = None, float32: bool = True):
+        """
+        Args:
+            metrics: stage(name) 컨텍스트를 제공하는 계측기 (예: PipelineMetrics, None이면 기록하지 않음)
+            asset_dir: plotly.js를 한 번만 저장해 두고 HTML이 참조할 디렉터리
+                (None이면 HTML마다 plotly.js 전체(약 4.8MB)를 포함)
+            float32: 시가총액/등락률 배열을 정밀도가 허용하면 float32 typed array로 기록 (False면 float64)
+        """
+        self.metrics = metrics
+        self.asset_dir = asset_dir
+        self.float32 = float32
+    
     def create_treemap_from_viewmodel(
         self, 
         view_model: HeatmapViewModel, 
-        output_file: str = 'theme_heatmap.html'
+        output_file: str = 'theme_heatmap.html',
+        open_browser: bool = True
     ):
         """ViewModel을 기반으로 Plotly Treemap을 생성하고 저장합니다.
         
         Args:
             view_model: HeatmapViewModel
             output_file: 출력 파일명
+            open_browser: 저장 후 브라우저로 열지 여부
+        """
+        self.write_html(view_model, output_file)
+        print(f"\n히트맵 생성 완료: {output_file}")
+        
+        if open_browser:
+            _open_in_browser(output_file)
+    
+    def render_html(
+        self,
+        view_model: HeatmapViewModel,
+        include_plotlyjs=True,
+        post_script: Optional[str] = None
+    ) -> bytes:
+        """히트맵 HTML 문서를 바이트로 반환합니다. (headless - 파일, 콘솔, 브라우저를 건드리지 않음)
+        
+        Args:
+            view_model: HeatmapViewModel
+            include_plotlyjs: plotly.js 포함 방식 (True: 문서에 포함, 문자열: script src, 'cdn', False)
+            post_script: 그림 생성 후 실행할 JavaScript (예: 자동 갱신)
+            
+        Returns:
+            UTF-8 HTML
+        """
+        fig = self.build_figure(view_model)
+        
+        with self._stage('html_render') as record:
+            html = fig.to_html(
+                full_html=True, include_plotlyjs=include_plotlyjs, post_script=post_script, auto_play=False
+            ).encode('utf-8')
+            record.rows = len(view_model)
+        return html
+    
+    def write_html(self, view_model: HeatmapViewModel, output_file: str) -> str:
+        """히트맵 HTML을 저장합니다. (headless - 출력 메시지와 브라우저 실행 없음)
+        
+        임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 이전 파일이나 완성된 새 파일만 봅니다.
+        루프에서 여러 파일을 만드는 일괄 작업과 데몬은 이 메서드를 사용합니다.
+        
+        Args:
+            view_model: HeatmapViewModel
+            output_file: 출력 파일명
+            
+        Returns:
+            output_file
         """
+        fig = self.build_figure(view_model)
+        
+        with self._stage('html_write') as record:
+            self._write_html(fig, output_file)
+            record.rows = len(view_model)
+        return output_file
+    
+    def build_figure(self, view_model: HeatmapViewModel):
+        """ViewModel로부터 Plotly Treemap Figure를 생성합니다.
+        
+        Args:
+            view_model: HeatmapViewModel
+            
+        Returns:
+            plotly.graph_objects.Figure
+        """
+        import plotly.graph_objects as go  # import 비용이 커서 그릴 때 불러옴
+        
         custom_colorscale = [
             [0.0, 'blue'],
             [0.5, '#444444'],
             [1.0, 'red']
         ]
         
+        # numpy 숫자 배열은 plotly가 base64 typed array({dtype, bdata})로 기록하므로 dtype이 곧 크기
+        typed = self._typed
         fig = go.Figure(go.Treemap(
-            ids=view_model.get_ids(),
-            labels=view_model.get_labels(),
-            parents=view_model.get_parents(),
-            values=view_model.get_values(),
+            ids=view_model.ids,
+            labels=view_model.labels,
+            parents=view_model.parents,
+            values=typed(view_model.values),
             branchvalues='total',
             maxdepth=2,
             marker=dict(
-                colors=view_model.get_colors(),
+                colors=typed(view_model.colors),
                 colorscale=custom_colorscale,
                 cmid=0,
                 cmin=-5,
                 cmax=5,
                 colorbar=dict(title="등락률(%)")
             ),
-            customdata=view_model.get_custom_data(),
-            texttemplate=view_model.get_text_templates(),
+            customdata=typed(view_model.custom_data),
+            texttemplate=view_model.text_templates,
             hovertemplate='<b>%{label}</b><br>시가총액: %{value:.2f}조 원<br>등락률: %{customdata:.2f}%<extra></extra>',
             textposition='middle center'
         ))
@@ -53,105 +139,176 @@ class HeatmapVisualizer:
             margin=dict(t=50, l=10, r=10, b=10),
             font=dict(family="Malgun Gothic", size=15)
         )
+        return fig
+    
+    def create_static_treemap(
+        self,
+        view_model: HeatmapViewModel,
+        output_file: str = 'theme_heatmap.html',
+        width: float = 1600.0,
+        height: float = 900.0,
+        open_browser: bool = True
+    ):
+        """레이아웃을 미리 계산한 정적 SVG 히트맵을 저장합니다. (plotly.js 불필요)
         
-        fig.write_html(output_file)
-        print(f"\n히트맵 생성 완료: {output_file}")
+        output_file이 .svg로 끝나면 SVG 문서만, 아니면 SVG를 담은 HTML 페이지를 저장합니다.
         
-        # 브라우저 자동 실행
-        try:
-            os.startfile(output_file)
-        except AttributeError:
-            import webbrowser
-            webbrowser.open(output_file)
+        Args:
+            view_model: HeatmapViewModel
+            output_file: 출력 파일명
+            width: 히트맵 너비
+            height: 히트맵 높이
+            open_browser: 저장 후 브라우저로 열지 여부
+        """
+        from presentation.svg_renderer import render_svg, render_svg_page
+        from presentation.treemap_layout import compute_layout
+        
+        with self._stage('treemap_layout') as record:
+            layout = compute_layout(view_model, width, height)
+            record.rows = len(view_model)
+        
+        with self._stage('html_write') as record:
+            render = render_svg if output_file.lower().endswith('.svg') else render_svg_page
+            document = render(view_model, layout)
+            
+            def write(path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(document)
+            
+            atomic_write(output_file, write)
+            record.rows = len(view_model)
+        print(f"\n정적 히트맵 생성 완료: {output_file}")
+        
+        if open_browser:
+            _open_in_browser(output_file)
     
-    def create_treemap(self, df_final: pd.DataFrame, group_stats: dict, output_file: str = 'theme_heatmap.html'):
-        """데이터프레임을 기반으로 Plotly Treemap을 생성하고 저장합니다. (기존 API - 하위 호환)
+    def create_treemap_timeline(
+        self,
+        timeline: HeatmapTimeline,
+        output_file: str = 'theme_heatmap_timeline.html',
+        open_browser: bool = True
+    ):
+        """여러 시점을 시간 슬라이더로 넘겨 볼 수 있는 히트맵 HTML을 저장합니다.
         
-        DEPRECATED: 하위 호환을 위해 유지하지만, create_treemap_from_viewmodel 사용을 권장합니다.
+        Args:
+            timeline: HeatmapTimeline (시점이 하나 이상)
+            output_file: 출력 파일명
+            open_browser: 저장 후 브라우저로 열지 여부
         """
-        from domain.theme_config import THEME_HIERARCHY
+        self.write_timeline_html(timeline, output_file)
+        print(f"\n타임라인 히트맵 생성 완료: {output_file} ({len(timeline)}개 시점)")
         
-        ids = []
-        labels = []
-        parents = []
-        values = []
-        colors = []
-        custom_data = []
-        text_templates = []
+        if open_browser:
+            _open_in_browser(output_file)
+    
+    def write_timeline_html(self, timeline: HeatmapTimeline, output_file: str) -> str:
+        """타임라인 히트맵 HTML을 저장합니다. (headless - 출력 메시지와 브라우저 실행 없음)
         
-        root_id = "KRX_Themes"
-        root_label = "대한민국 테마별 증시"
+        Args:
+            timeline: HeatmapTimeline (시점이 하나 이상)
+            output_file: 출력 파일명
+            
+        Returns:
+            output_file
+        """
+        fig = self.build_timeline_figure(timeline)
         
-        # 1. Root 노드
-        ids.append(root_id)
-        labels.append(root_label)
-        parents.append("")
+        with self._stage('html_write') as record:
+            self._write_html(fig, output_file)
+            record.rows = len(timeline.structure) * len(timeline)
+        return output_file
+    
+    def build_timeline_figure(self, timeline: HeatmapTimeline):
+        """시점별 애니메이션 프레임과 슬라이더를 가진 Treemap Figure를 생성합니다.
         
-        total_mkt_cap = df_final['시가총액_조'].sum()
-        total_change = (df_final['ChagesRatio'] * df_final['시가총액_조']).sum() / total_mkt_cap if total_mkt_cap > 0 else 0
+        구조 배열(ID/라벨/부모/템플릿)은 기본 트레이스에 한 번만 담고,
+        각 프레임에는 값/색상 배열만 담아 plotly가 기본 트레이스에 덮어쓰게 합니다.
+        처음에는 가장 최근 시점을 표시합니다.
         
-        values.append(total_mkt_cap)
-        colors.append(total_change)
-        custom_data.append(total_change)
-        text_templates.append("<b>%{label}</b>")
+        Args:
+            timeline: HeatmapTimeline (시점이 하나 이상)
+            
+        Returns:
+            plotly.graph_objects.Figure
+        """
+        import plotly.graph_objects as go
         
-        # 2. 테마(Branch) 노드
-        theme_groups = df_final.groupby('테마')
+        if not timeline.frames:
+            raise ValueError("타임라인에 시점이 없습니다")
+        
+        latest = timeline.frames[-1]
+        view_model = HeatmapViewModel.with_structure(
+            timeline.structure.ids, timeline.structure.labels, timeline.structure.parents,
+            timeline.structure.text_templates,
+            root_label=timeline.structure.root_label, title=timeline.structure.title
+        )
+        view_model.values = latest.values
+        view_model.colors = latest.colors
+        view_model.custom_data = latest.custom_data
+        fig = self.build_figure(view_model)
+        
+        fig.frames = [
+            go.Frame(
+                name=frame.label,
+                data=[go.Treemap(
+                    values=self._typed(frame.values),
+                    marker=dict(colors=self._typed(frame.colors)),
+                    customdata=self._typed(frame.custom_data)
+                )],
+                traces=[0]
+            )
+            for frame in timeline.frames
+        ]
+        
+        # 트리맵은 보간 전환을 지원하지 않으므로 즉시 다시 그림
+        step_args = dict(mode='immediate', frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+        fig.update_layout(
+            sliders=[dict(
+                active=len(timeline.frames) - 1,
+                currentvalue=dict(prefix="시점: "),
+                pad=dict(t=30),
+                steps=[
+                    dict(method='animate', label=frame.label, args=[[frame.label], step_args])
+                    for frame in timeline.frames
+                ]
+            )],
+            updatemenus=[dict(
+                type='buttons',
+                direction='left',
+                x=0, y=0, xanchor='right', yanchor='top',
+                pad=dict(t=60, r=10),
+                buttons=[
+                    dict(label='▶', method='animate',
+                         args=[None, dict(step_args, frame=dict(duration=700, redraw=True), fromcurrent=True)]),
+                    dict(label='❚❚', method='animate', args=[[None], step_args]),
+                ]
+            )],
+            margin=dict(t=50, l=10, r=10, b=90)
+        )
+        return fig
+    
+    def create_treemap(
+        self,
+        df_final: 'pd.DataFrame',
+        group_stats: dict,
+        output_file: str = 'theme_heatmap.html',
+        open_browser: bool = True
+    ):
+        """데이터프레임을 기반으로 Plotly Treemap을 생성하고 저장합니다. (기존 API - 하위 호환)
+        
+        DEPRECATED: 하위 호환을 위해 유지하지만, create_treemap_from_viewmodel 사용을 권장합니다.
+        
+        Args:
+            df_final: 테마/종목명/시가총액/등락률 데이터프레임
+            group_stats: 그룹별 통계
+            output_file: 출력 파일명
+            open_browser: 저장 후 브라우저로 열지 여부
+        """
+        import plotly.graph_objects as go
+        
+        ids, labels, parents, values, colors, text_templates = _legacy_treemap_columns(df_final, group_stats)
+        custom_data = colors
         
-        for theme_name, group in theme_groups:
-            parent_group = THEME_HIERARCHY.get(theme_name)
-            
-            theme_mkt_cap = group['시가총액_조'].sum()
-            theme_change_sum = (group['ChagesRatio'] * group['시가총액_조']).sum()
-            theme_change = theme_change_sum / theme_mkt_cap if theme_mkt_cap > 0 else 0
-            
-            if parent_group:
-                parent_id = f"Group_{parent_group}"
-            else:
-                parent_id = root_id
-                
-            theme_id = f"Theme_{theme_name}"
-            
-            ids.append(theme_id)
-            labels.append(theme_name)
-            parents.append(parent_id)
-            values.append(theme_mkt_cap)
-            colors.append(theme_change)
-            custom_data.append(theme_change)
-            text_templates.append("<b>%{label}</b>")
-            
-        # 3. 중간 그룹 노드 (예: '2차전지')
-        for group_name, stats in group_stats.items():
-            group_id = f"Group_{group_name}"
-            
-            group_cap = stats['cap']
-            group_change = stats['change_sum'] / group_cap if group_cap > 0 else 0
-                
-            ids.append(group_id)
-            labels.append(group_name)
-            parents.append(root_id)
-            values.append(group_cap)
-            colors.append(group_change)
-            custom_data.append(group_change)
-            text_templates.append("<b>%{label}</b>")
-            
-        # 4. 종목(Leaf) 노드
-        for _, row in df_final.iterrows():
-            stock_name = row['종목명']
-            theme_name = row['테마']
-            
-            stock_id = f"{theme_name}_{stock_name}"
-            parent_id = f"Theme_{theme_name}"
-            
-            ids.append(stock_id)
-            labels.append(stock_name)
-            parents.append(parent_id)
-            values.append(row['시가총액_조'])
-            colors.append(row['ChagesRatio'])
-            custom_data.append(row['ChagesRatio'])
-            text_templates.append("<b>%{label}</b><br>%{value:.2f}조<br>%{customdata:.2f}%")
-            
-        # 5. 시각화 생성
         custom_colorscale = [
             [0.0, 'blue'],
             [0.5, '#444444'],
@@ -185,12 +342,154 @@ class HeatmapVisualizer:
             font=dict(family="Malgun Gothic", size=15)
         )
         
-        fig.write_html(output_file)
+        with self._stage('html_write') as record:
+            self._write_html(fig, output_file)
+            record.rows = len(ids)
         print(f"\n히트맵 생성 완료: {output_file}")
         
-        # 브라우저 자동 실행
-        try:
-            os.startfile(output_file)
-        except AttributeError:
-            import webbrowser
-            webbrowser.open(output_file)
+        if open_browser:
+            _open_in_browser(output_file)
+    
+    def _write_html(self, fig, output_file: str) -> None:
+        """HTML 저장 (임시 파일에 쓴 뒤 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않도록 함)"""
+        include_plotlyjs = True
+        if self.asset_dir is not None:
+            include_plotlyjs = _relative_src(write_plotlyjs_asset(self.asset_dir), output_file)
+        # 프레임이 있는 그림도 열 때 자동 재생하지 않음 (슬라이더는 최근 시점에서 시작)
+        atomic_write(
+            output_file,
+            lambda path: fig.write_html(path, include_plotlyjs=include_plotlyjs, auto_play=False)
+        )
+    
+    def _typed(self, values: np.ndarray) -> np.ndarray:
+        """typed array로 기록할 숫자 배열 (float32 설정이면 정밀도가 허용할 때 float32)"""
+        return _compact_floats(values) if self.float32 else np.asarray(values)
+    
+    def _stage(self, name: str):
+        """계측 구간 (계측기가 없으면 빈 컨텍스트)"""
+        if self.metrics is None:
+            return nullcontext(SimpleNamespace(rows=None))
+        return self.metrics.stage(name)
+
+
+LEGACY_ROOT_ID = "KRX_Themes"
+LEGACY_ROOT_LABEL = "대한민국 테마별 증시"
+BRANCH_TEMPLATE = "<b>%{label}</b>"
+LEAF_TEMPLATE = "<b>%{label}</b><br>%{value:.2f}조<br>%{customdata:.2f}%"
+
+
+def _legacy_treemap_columns(df_final: 'pd.DataFrame', group_stats: dict) -> Tuple[list, ...]:
+    """create_treemap의 노드 열 (ids, labels, parents, values, colors, text_templates)
+    
+    노드 순서: 루트, 테마(이름순), 그룹(group_stats 순서), 종목(df_final 행 순서)
+    테마 합계는 groupby 집계로, 종목 노드는 열 단위 연산으로 만들어 행마다 Python 코드를 실행하지 않습니다.
+    """
+    from domain.theme_config import THEME_HIERARCHY
+    
+    caps = df_final['시가총액_조']
+    changes = df_final['ChagesRatio']
+    weighted = changes * caps
+    themes = df_final['테마']
+    
+    # 1. Root 노드
+    total_mkt_cap = caps.sum()
+    total_change = weighted.sum() / total_mkt_cap if total_mkt_cap > 0 else 0
+    
+    # 2. 테마(Branch) 노드
+    theme_caps = caps.groupby(themes).sum()
+    theme_sums = weighted.groupby(themes).sum().reindex(theme_caps.index)
+    theme_names = theme_caps.index
+    with np.errstate(divide='ignore', invalid='ignore'):
+        theme_changes = np.where(theme_caps.to_numpy() > 0, theme_sums.to_numpy() / theme_caps.to_numpy(), 0.0)
+    theme_parents = theme_names.map(THEME_HIERARCHY)
+    has_parent = theme_parents.notna() & (theme_parents != '')
+    theme_parent_ids = np.where(has_parent, 'Group_' + theme_parents.astype(str), LEGACY_ROOT_ID)
+    
+    # 3. 중간 그룹 노드 (예: '2차전지', 상위 그룹이 있으면 그 아래에 배치)
+    group_names = list(group_stats)
+    group_caps = [stats['cap'] for stats in group_stats.values()]
+    group_changes = [
+        stats['change_sum'] / stats['cap'] if stats['cap'] > 0 else 0
+        for stats in group_stats.values()
+    ]
+    group_parents = [
+        f"Group_{stats['parent_group']}" if stats.get('parent_group') else LEGACY_ROOT_ID
+        for stats in group_stats.values()
+    ]
+    
+    # 4. 종목(Leaf) 노드
+    theme_keys = themes.astype(str)
+    stock_ids = theme_keys + '_' + df_final['종목명'].astype(str)
+    
+    n_branches = 1 + len(theme_names) + len(group_names)
+    ids = (
+        [LEGACY_ROOT_ID]
+        + ('Theme_' + theme_names.astype(str)).tolist()
+        + [f"Group_{name}" for name in group_names]
+        + stock_ids.tolist()
+    )
+    labels = [LEGACY_ROOT_LABEL] + theme_names.tolist() + group_names + df_final['종목명'].tolist()
+    parents = [""] + theme_parent_ids.tolist() + group_parents + ('Theme_' + theme_keys).tolist()
+    values = [total_mkt_cap] + theme_caps.tolist() + group_caps + caps.tolist()
+    colors = [total_change] + theme_changes.tolist() + group_changes + changes.tolist()
+    text_templates = [BRANCH_TEMPLATE] * n_branches + [LEAF_TEMPLATE] * len(df_final)
+    return ids, labels, parents, values, colors, text_templates
+
+
+# float32 변환을 허용하는 최대 상대 오차
+# (plotly.js는 branchvalues='total'에서 자식 합계가 부모보다 1e-6 이상 크면 노드를 그리지 않음)
+FLOAT32_RTOL = 1e-7
+
+
+def _compact_floats(values: np.ndarray) -> np.ndarray:
+    """정밀도 손실이 FLOAT32_RTOL 이내이면 float32로 변환 (아니면 그대로)
+    
+    float32는 유효숫자 약 7자리로 화면 표시(소수 둘째 자리)에는 충분하며, typed array 크기가 절반이 됩니다.
+    float32 범위를 벗어나거나 아주 작은 값(비정규 수)이 있으면 float64를 유지합니다.
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        compact = values.astype(np.float32)
+        exact = np.isclose(compact, values, rtol=FLOAT32_RTOL, atol=0.0, equal_nan=True)
+    return compact if exact.all() else values
+
+
+def _open_in_browser(output_file: str) -> None:
+    """저장한 HTML을 브라우저로 엽니다."""
+    try:
+        os.startfile(output_file)
+    except AttributeError:
+        import webbrowser
+        webbrowser.open(output_file)
+
+
+def plotlyjs_asset_name() -> str:
+    """버전이 포함된 plotly.js 파일명 (plotly를 업데이트하면 새 파일로 저장되어 브라우저 캐시와 섞이지 않음)"""
+    from plotly.offline import get_plotlyjs_version
+    return f"plotly-{get_plotlyjs_version()}.min.js"
+
+
+def write_plotlyjs_asset(asset_dir: str) -> str:
+    """asset_dir에 plotly.js를 저장하고 경로를 반환합니다. (이미 있으면 그대로 사용)"""
+    path = os.path.join(asset_dir, plotlyjs_asset_name())
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+        os.makedirs(asset_dir, exist_ok=True)
+        bundle = get_plotlyjs()
+        
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(bundle)
+        
+        atomic_write(path, write)
+    return path
+
+
+def _relative_src(asset_path: str, output_file: str) -> str:
+    """HTML에서 asset을 참조할 script src (HTML 위치 기준 상대 경로)"""
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    try:
+        return os.path.relpath(os.path.abspath(asset_path), output_dir).replace(os.sep, '/')
+    except ValueError:  # Windows에서 드라이브가 다른 경우
+        from pathlib import Path
+        return Path(asset_path).resolve().as_uri()
+
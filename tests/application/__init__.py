@@ -0,0 +1 @@
+# tests/application 패키지 초기화 파일
@@ -0,0 +1,45 @@
+"""
+히트맵 일괄 생성 설정 테스트
+"""
+import pandas as pd
+import pytest
+from application.batch import HeatmapVariant
+
+
+@pytest.fixture
+def listing():
+    """KRX 종목 목록"""
+    return pd.DataFrame({
+        'Code': ['005930', '000660', '068270', '263750'],
+        'Name': ['삼성전자', 'SK하이닉스', '셀트리온', '펄어비스'],
+        'Market': ['KOSPI', 'KOSPI', 'KOSPI', 'KOSDAQ GLOBAL'],
+        'Marcap': [400e12, 100e12, 40e12, 2e12],
+    })
+
+
+def test_variant_filters_market(listing):
+    """시장 구분 필터 (KOSDAQ은 KOSDAQ GLOBAL 포함)"""
+    variant = HeatmapVariant(name='KOSDAQ', output_file='kosdaq.html', markets=('KOSDAQ',))
+    assert list(variant(listing)['Code']) == ['263750']
+
+
+def test_variant_filters_top_n(listing):
+    """시가총액 상위 N개 필터"""
+    variant = HeatmapVariant(name='상위 2', output_file='top2.html', top_n=2)
+    assert list(variant(listing)['Code']) == ['005930', '000660']
+
+
+def test_variant_from_dict():
+    """설정 딕셔너리로부터 생성 (캐시 키로 쓰이므로 해시 가능)"""
+    variant = HeatmapVariant.from_dict({
+        'name': 'KOSPI',
+        'output_file': 'kospi.html',
+        'markets': ['KOSPI'],
+    })
+    assert variant.markets == ('KOSPI',)
+    assert hash(variant) == hash(HeatmapVariant.from_dict({
+        'name': 'KOSPI', 'output_file': 'kospi.html', 'markets': ['KOSPI']
+    }))
+
+    with pytest.raises(ValueError, match="output_file"):
+        HeatmapVariant.from_dict({'name': 'KOSPI'})
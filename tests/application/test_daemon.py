@@ -0,0 +1,157 @@
+"""
+시세 갱신 및 상주 모드 테스트
+"""
+import pandas as pd
+import pytest
+from application.daemon import HeatmapDaemon
+from application.heatmap_service import HeatmapService
+from application.instrumentation import PipelineMetrics
+from infrastructure.name_index import StockNameIndex
+
+
+class QuoteKrxRepository:
+    """호출할 때마다 현재 시세를 반환하는 저장소"""
+
+    def __init__(self):
+        self.listing = pd.DataFrame({
+            'Code': ['005930', '000660'],
+            'Name': ['삼성전자', 'SK하이닉스'],
+            'Marcap': [400e12, 100e12],
+            'ChagesRatio': [1.0, 2.0],
+        })
+        self.calls = 0
+
+    def fetch_listing(self):
+        self.calls += 1
+        return self.listing.copy()
+
+
+class FakeThemeFileRepository:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.calls = 0
+
+    def load_themes(self):
+        self.calls += 1
+        return pd.DataFrame({'테마': ['반도체', '반도체'], '종목명': ['삼성전자', 'SK하이닉스']})
+
+
+class RecordingVisualizer:
+    def __init__(self):
+        self.view_models = []
+
+    def write_html(self, view_model, output_file):
+        self.view_models.append(view_model)
+        return output_file
+
+    def write_timeline_html(self, timeline, output_file):
+        self.timeline_lengths = getattr(self, 'timeline_lengths', []) + [len(timeline)]
+        return output_file
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / 'themes.xlsx'
+    path.write_bytes(b'data')
+    return HeatmapService(
+        listing_ttl=None,
+        name_index=StockNameIndex(),
+        krx_repo=QuoteKrxRepository(),
+        file_repo=FakeThemeFileRepository(str(path)),
+        metrics=PipelineMetrics()
+    )
+
+
+def test_refresh_quotes_updates_existing_models(service):
+    """종목 구성이 같으면 기존 Domain Model의 시세만 갱신"""
+    themes = service.get_themes()
+    samsung = themes[0].stocks[0]
+    service.krx_repo.listing.loc[0, ['Marcap', 'ChagesRatio']] = [500e12, -3.0]
+
+    assert service.refresh_quotes()
+
+    assert service.get_themes() is themes
+    assert samsung.market_cap.in_trillion == 500
+    assert samsung.change_ratio.value == -3.0
+    assert service.get_heatmap_data()['Marcap'].tolist() == [500e12, 100e12]
+    assert service.krx_repo.calls == 2
+    assert service.file_repo.calls == 1
+    assert service.metrics.summary()['merge']['calls'] == 1
+
+
+def test_refresh_quotes_recomputes_group_metrics(service):
+    """갱신된 시세로 집계 지표를 다시 계산"""
+    themes = service.get_themes()
+    before = service.get_group_metrics(themes)
+    service.krx_repo.listing['ChagesRatio'] = [-1.0, -2.0]
+
+    service.refresh_quotes()
+    service.get_group_metrics(themes)
+
+    assert themes[0].metrics.decliners == 2
+    assert before is not service.get_group_metrics(themes)
+
+
+def test_top_stocks_reused_until_quotes_change(service):
+    """테마별 상위 종목 순위는 시세가 바뀔 때까지 재사용"""
+    themes = service.get_themes()
+    first = service.get_top_stocks(themes, top_n=1)
+
+    assert service.get_top_stocks(themes, top_n=1)['반도체'] is first['반도체']
+    assert [stock.name for stock in first['반도체']] == ['삼성전자']
+
+    service.krx_repo.listing.loc[1, 'Marcap'] = 900e12
+    service.refresh_quotes()
+
+    assert [stock.name for stock in service.get_top_stocks(themes, top_n=1)['반도체']] == ['SK하이닉스']
+
+
+def test_refresh_quotes_rebuilds_when_listing_changes(service):
+    """종목이 상장 폐지되면 갱신하지 않고 다음 조회에서 전체 재생성"""
+    themes = service.get_themes()
+    service.krx_repo.listing = service.krx_repo.listing.iloc[:1]
+
+    assert not service.refresh_quotes()
+
+    new_themes = service.get_themes()
+    assert new_themes is not themes
+    assert [stock.name for stock in new_themes[0].stocks] == ['삼성전자']
+
+
+def test_daemon_reuses_view_model_structure(service, tmp_path):
+    """상주 모드는 두 번째 주기부터 ViewModel 값만 갱신"""
+    visualizer = RecordingVisualizer()
+    daemon = HeatmapDaemon(str(tmp_path / 'out.html'), interval=0.01, service=service, visualizer=visualizer)
+
+    daemon.refresh()
+    service.krx_repo.listing['ChagesRatio'] = [-5.0, 3.0]
+    daemon.run(max_cycles=2)
+
+    first, second, third = visualizer.view_models
+    assert first is second is third
+    assert [node.color for node in third.nodes if node.label == '삼성전자'] == [-5.0]
+    assert daemon.cycles == 3
+    assert service.file_repo.calls == 1
+
+
+def test_daemon_rejects_invalid_interval(service):
+    with pytest.raises(ValueError):
+        HeatmapDaemon('out.html', interval=0, service=service)
+
+
+def test_daemon_accumulates_timeline(service, tmp_path):
+    """타임라인 파일을 지정하면 주기마다 값 배열을 시점으로 추가"""
+    visualizer = RecordingVisualizer()
+    daemon = HeatmapDaemon(
+        str(tmp_path / 'out.html'), interval=0.01, service=service, visualizer=visualizer,
+        timeline_file=str(tmp_path / 'timeline.html'), max_frames=2
+    )
+
+    daemon.refresh()
+    service.krx_repo.listing['ChagesRatio'] = [-5.0, 3.0]
+    daemon.run(max_cycles=2)
+
+    assert visualizer.timeline_lengths == [1, 2, 2]
+    first, second = daemon.timeline.frames
+    assert first.colors is not second.colors
+    assert daemon.timeline.structure.ids is visualizer.view_models[-1].ids
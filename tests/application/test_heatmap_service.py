@@ -0,0 +1,63 @@
+"""
+HeatmapService 단위 테스트
+"""
+import pandas as pd
+import pytest
+from application.heatmap_service import HeatmapService
+from infrastructure.name_index import StockNameIndex
+
+
+@pytest.fixture
+def merged_df():
+    """병합 완료된 (테마, 종목) 데이터"""
+    return pd.DataFrame({
+        '테마': ['반도체', 'AI', '반도체', '반도체', '바이오'],
+        '종목명': ['SK하이닉스', 'SK하이닉스', '삼성전자', 'SK하이닉스', ''],
+        'Code': ['000660', '000660', '005930', '000660', '207940'],
+        'Marcap': [100e12, 100e12, 400e12, 100e12, 80e12],
+        'ChagesRatio': [3.0, 3.0, 150.0, 3.0, -1.0],
+        'Amount': [1e12, 1e12, None, 1e12, 1e11],
+    })
+
+
+class TestDataframeToThemes:
+    """DataFrame -> Theme 변환 테스트"""
+
+    def test_groups_by_theme_in_order(self, merged_df):
+        """테마 등장 순서 유지, 중복 종목 및 빈 종목명 제외"""
+        themes = HeatmapService(name_index=StockNameIndex())._dataframe_to_themes(merged_df)
+
+        assert [t.name for t in themes] == ['반도체', 'AI']
+        assert [s.name for s in themes[0].stocks] == ['SK하이닉스', '삼성전자']
+        assert [s.name for s in themes[1].stocks] == ['SK하이닉스']
+
+    def test_shared_stock_instance(self, merged_df):
+        """같은 종목 코드는 하나의 Stock 인스턴스를 공유"""
+        semiconductor, ai = HeatmapService(name_index=StockNameIndex())._dataframe_to_themes(merged_df)
+
+        assert semiconductor.stocks[0] is ai.stocks[0]
+        assert semiconductor.stocks[0].themes == [semiconductor, ai]
+
+    def test_clamps_invalid_values(self, merged_df):
+        """범위를 벗어난 등락률과 결측 거래대금은 0으로 처리"""
+        semiconductor = HeatmapService(name_index=StockNameIndex())._dataframe_to_themes(merged_df)[0]
+        samsung = semiconductor.stocks[1]
+
+        assert samsung.change_ratio.value == 0.0
+        assert samsung.traded_value == 0.0
+        assert samsung.market_cap.in_trillion == pytest.approx(400.0)
+
+    def test_empty_dataframe(self):
+        """빈 DataFrame은 빈 목록"""
+        assert HeatmapService(name_index=StockNameIndex())._dataframe_to_themes(pd.DataFrame()) == []
+
+
+def test_default_service_uses_no_name_index_file(tmp_path, monkeypatch):
+    """name_index_path를 지정하지 않으면 현재 디렉터리에 인덱스 파일을 읽거나 쓰지 않음"""
+    monkeypatch.chdir(tmp_path)
+    service = HeatmapService()
+    service.name_index.update(pd.DataFrame({'Code': ['005930'], 'Name': ['삼성전자']}))
+    service.name_index.save()
+
+    assert service.name_index.path is None
+    assert list(tmp_path.iterdir()) == []
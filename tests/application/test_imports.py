@@ -0,0 +1,27 @@
+"""
+시작 시점 import 테스트
+
+무거운 모듈(FinanceDataReader, plotly)은 해당 단계가 실행될 때만 불러와야 합니다.
+"""
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def _loaded_modules(code: str) -> set:
+    script = f"import sys; sys.path.insert(0, {SRC_DIR!r}); {code}; print('\\n'.join(sys.modules))"
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return {name.split('.')[0] for name in result.stdout.split()}
+
+
+def test_pipeline_modules_do_not_import_heavy_dependencies():
+    """서비스/시각화 모듈 import만으로는 FinanceDataReader, plotly를 불러오지 않음"""
+    loaded = _loaded_modules(
+        "import application.heatmap_service, application.view_model_builder, "
+        "application.batch, presentation.visualizer"
+    )
+
+    assert 'FinanceDataReader' not in loaded
+    assert 'plotly' not in loaded
@@ -0,0 +1,92 @@
+"""
+PipelineMetrics 단위 테스트
+"""
+import json
+import tracemalloc
+
+from application.instrumentation import PipelineMetrics, NULL_METRICS
+
+
+def test_stage_records_time_and_rows():
+    """단계별 소요 시간과 행 수 기록"""
+    metrics = PipelineMetrics()
+
+    with metrics.stage('fetch') as record:
+        record.rows = 10
+    with metrics.stage('fetch') as record:
+        record.rows = 5
+
+    summary = metrics.summary()
+    assert summary['fetch']['calls'] == 2
+    assert summary['fetch']['rows'] == 15
+    assert summary['fetch']['seconds'] >= 0
+    assert metrics.records[0].peak_memory is None
+
+
+def test_track_memory_nested_stages():
+    """메모리 측정 시 하위 단계의 최댓값이 상위 단계에 반영"""
+    metrics = PipelineMetrics(track_memory=True)
+
+    with metrics.stage('model_build'):
+        with metrics.stage('group_stats'):
+            data = bytearray(2_000_000)
+            del data
+
+    records = {record.stage: record for record in metrics.records}
+    assert records['group_stats'].peak_memory >= 2_000_000
+    assert records['model_build'].peak_memory >= records['group_stats'].peak_memory
+
+
+def test_export_formats():
+    """JSON 및 Prometheus 텍스트 내보내기"""
+    metrics = PipelineMetrics()
+    with metrics.stage('merge') as record:
+        record.rows = 3
+
+    data = json.loads(metrics.to_json())
+    assert data['records'][0]['stage'] == 'merge'
+    assert data['summary']['merge']['rows'] == 3
+
+    text = metrics.to_prometheus()
+    assert '# TYPE krx_heatmap_stage_seconds_total counter' in text
+    assert 'krx_heatmap_stage_rows_total{stage="merge"} 3' in text
+
+
+def test_null_metrics_records_nothing():
+    """기본 계측기는 기록하지 않음"""
+    with NULL_METRICS.stage('fetch') as record:
+        record.rows = 1
+    assert list(NULL_METRICS.records) == []
+
+
+def test_records_bounded_summary_complete():
+    """개별 기록은 최근 max_records개만 보관하고 합계는 모든 실행을 누적"""
+    metrics = PipelineMetrics(max_records=3)
+    for rows in range(10):
+        with metrics.stage('fetch') as record:
+            record.rows = rows
+
+    assert [record.rows for record in metrics.records] == [7, 8, 9]
+    assert metrics.summary()['fetch']['calls'] == 10
+    assert metrics.summary()['fetch']['rows'] == 45
+    metrics.reset()
+    assert metrics.summary() == {}
+
+
+def test_overlapping_memory_tracking_keeps_tracing():
+    """여러 계측기가 겹쳐도 마지막 단계가 끝날 때만 자신이 시작한 추적을 중지"""
+    first, second = PipelineMetrics(track_memory=True), PipelineMetrics(track_memory=True)
+
+    with first.stage('outer'):
+        with second.stage('inner'):
+            pass
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        with first.stage('outer'):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
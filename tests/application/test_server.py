@@ -0,0 +1,200 @@
+"""
+히트맵 스냅샷 제공자 및 HTTP 서버 테스트
+"""
+import gzip
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+from application.heatmap_service import HeatmapService
+from application.publisher import HeatmapPublisher
+from infrastructure.name_index import StockNameIndex
+from presentation.server import HeatmapHttpServer
+
+
+class QuoteKrxRepository:
+    def __init__(self):
+        self.listing = pd.DataFrame({
+            'Code': ['005930', '000660'],
+            'Name': ['삼성전자', 'SK하이닉스'],
+            'Marcap': [400e12, 100e12],
+            'ChagesRatio': [1.0, 2.0],
+        })
+
+    def fetch_listing(self):
+        return self.listing.copy()
+
+
+class FakeThemeFileRepository:
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load_themes(self):
+        return pd.DataFrame({'테마': ['반도체', '반도체'], '종목명': ['삼성전자', 'SK하이닉스']})
+
+
+class FakeVisualizer:
+    """plotly 없이 ViewModel 라벨만 담은 페이지 생성"""
+
+    def render_html(self, view_model, include_plotlyjs=True, post_script=None):
+        html = '<html>' + ''.join(view_model.get_labels()) * 100 + '</html>' + (post_script or '')
+        return html.encode('utf-8')
+
+
+@pytest.fixture
+def publisher(tmp_path):
+    path = tmp_path / 'themes.xlsx'
+    path.write_bytes(b'data')
+    service = HeatmapService(
+        listing_ttl=None,
+        name_index=StockNameIndex(),
+        krx_repo=QuoteKrxRepository(),
+        file_repo=FakeThemeFileRepository(str(path))
+    )
+    return HeatmapPublisher(service)
+
+
+@pytest.fixture
+def server(publisher):
+    server = HeatmapHttpServer(('127.0.0.1', 0), publisher.snapshot, visualizer=FakeVisualizer())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path, headers=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_publisher_reuses_snapshot_until_data_changes(publisher):
+    """지문이 같으면 같은 스냅샷, 시세가 바뀌면 새 스냅샷"""
+    first = publisher.snapshot()
+    assert publisher.snapshot() is first
+
+    publisher.service.krx_repo.listing['ChagesRatio'] = [-1.0, -2.0]
+    publisher.service.invalidate('listing')
+    second = publisher.snapshot()
+
+    assert second.fingerprint != first.fingerprint
+    assert second.view_model.nodes[0].color < 0
+
+
+def test_nodes_api_returns_columns(server):
+    status, headers, body = _get(server, '/api/nodes')
+
+    data = json.loads(body)
+    assert status == 200
+    assert headers['Content-Type'].startswith('application/json')
+    assert data['count'] == len(data['nodes']['ids'])
+    assert '삼성전자' in data['nodes']['labels']
+    assert headers['ETag'] == f'"{data["fingerprint"]}-api-nodes"'
+
+
+def test_etag_not_modified(server):
+    """If-None-Match가 현재 ETag와 같으면 304, 응답은 다시 만들지 않음"""
+    _, headers, _ = _get(server, '/')
+    status, _, body = _get(server, '/', {'If-None-Match': headers['ETag']})
+
+    assert status == 304
+    assert body == b''
+    assert server.renders == 1
+
+
+def test_gzip_encoding(server):
+    status, headers, body = _get(server, '/', {'Accept-Encoding': 'gzip'})
+
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['ETag'].startswith('W/')
+    assert gzip.decompress(body).startswith(b'<html>')
+
+    status, _, _ = _get(server, '/', {'If-None-Match': headers['ETag'], 'Accept-Encoding': 'gzip'})
+    assert status == 304
+
+
+def test_regenerates_when_fingerprint_changes(server, publisher):
+    _, first, _ = _get(server, '/api/nodes')
+    publisher.service.krx_repo.listing['Marcap'] = [300e12, 100e12]
+    publisher.service.invalidate('listing')
+
+    status, second, _ = _get(server, '/api/nodes', {'If-None-Match': first['ETag']})
+
+    assert status == 200
+    assert second['ETag'] != first['ETag']
+
+
+def test_unknown_path(server):
+    status, _, _ = _get(server, '/missing')
+    assert status == 404
+
+
+def test_diff_api_returns_changed_arrays(server, publisher):
+    """시세만 바뀌면 이전 지문 대비 값/색상 배열만 전달"""
+    _, _, body = _get(server, '/api/nodes')
+    since = json.loads(body)['fingerprint']
+
+    status, _, body = _get(server, f'/api/diff?since={since}')
+    assert status == 200
+    assert json.loads(body) == {'fingerprint': since, 'changed': [], 'restyle': {}, 'relayout': {}}
+
+    publisher.service.krx_repo.listing['ChagesRatio'] = [-1.0, 2.0]
+    publisher.service.invalidate('listing')
+    status, headers, body = _get(server, f'/api/diff?since={since}')
+
+    data = json.loads(body)
+    assert status == 200
+    assert data['fingerprint'] != since
+    assert set(data['restyle']) == {'marker.colors', 'customdata'}
+    assert data['changed']
+    assert headers['ETag'] == f'"{data["fingerprint"]}-api-diff-{since}"'
+
+
+def test_diff_api_unknown_fingerprint_requests_reload(server):
+    """보관하지 않은 지문은 하나의 reload 응답을 공유"""
+    status, headers, body = _get(server, '/api/diff?since=unknown')
+
+    data = json.loads(body)
+    assert status == 200
+    assert data['reload'] is True
+    assert headers['ETag'] == f'"{data["fingerprint"]}-api-diff"'
+    _get(server, '/api/diff?since=other')
+    assert server.renders == 1
+
+
+def test_poll_script_embedded(publisher):
+    server = HeatmapHttpServer(
+        ('127.0.0.1', 0), publisher.snapshot, visualizer=FakeVisualizer(), poll_interval=5
+    )
+    try:
+        response = server.get_response('/')
+    finally:
+        server.server_close()
+
+    assert b'api/diff?since=' in response.body
+    assert b'5000' in response.body
+
+
+def test_plotlyjs_asset_served_once(server):
+    """plotly.js는 버전별 경로에서 한 번 만든 응답을 장기 캐시로 제공"""
+    from presentation.visualizer import plotlyjs_asset_name
+
+    path = f'/assets/{plotlyjs_asset_name()}'
+    status, headers, body = _get(server, path, {'Accept-Encoding': 'gzip'})
+
+    assert status == 200
+    assert headers['Content-Type'].startswith('text/javascript')
+    assert 'immutable' in headers['Cache-Control']
+    assert len(gzip.decompress(body)) > 1_000_000
+    assert server.get_asset(plotlyjs_asset_name()) is server.get_asset(plotlyjs_asset_name())
+    assert _get(server, '/assets/missing.js')[0] == 404
@@ -0,0 +1,170 @@
+"""
+SingleFlight 및 HeatmapService 동시 요청 병합 테스트
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+from application.heatmap_service import HeatmapService
+from application.single_flight import SingleFlight
+from infrastructure.name_index import StockNameIndex
+
+
+class TestSingleFlight:
+    """SingleFlight 테스트"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 'result'
+
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(flights.do, 'key', slow)
+            started.wait()
+            followers = [pool.submit(flights.do, 'key', slow) for _ in range(3)]
+            results = [leader.result()] + [f.result() for f in followers]
+
+        assert results == ['result'] * 4
+        assert len(calls) == 1
+        assert flights.shared == 3
+        assert 'key' not in flights
+
+    def test_exception_is_shared_and_released(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            flights.do('key', fail)
+        assert flights.do('key', lambda: 1) == 1
+
+    def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        assert flights.do('a', lambda: 1) == 1
+        assert flights.do('b', lambda: 2) == 2
+        assert flights.shared == 0
+
+    def test_async_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return len(calls)
+
+        async def run():
+            return await asyncio.gather(*(flights.do_async('key', slow) for _ in range(5)))
+
+        assert asyncio.run(run()) == [1] * 5
+        assert len(calls) == 1
+
+    def test_cancelling_one_async_caller_does_not_cancel_others(self):
+        """먼저 실행한 호출자가 취소되어도 합류한 호출자는 결과를 받음"""
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return 'result'
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do_async('key', slow))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(flights.do_async('key', slow))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        assert asyncio.run(run()) == 'result'
+        assert 'key' not in flights
+
+
+class SlowKrxRepository:
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_listing(self):
+        self.calls += 1
+        time.sleep(0.05)
+        return pd.DataFrame({
+            'Code': ['005930', '000660'],
+            'Name': ['삼성전자', 'SK하이닉스'],
+            'Marcap': [400e12, 100e12],
+            'ChagesRatio': [1.0, 2.0],
+        })
+
+
+class FakeThemeFileRepository:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.calls = 0
+
+    def load_themes(self):
+        self.calls += 1
+        return pd.DataFrame({'테마': ['반도체', '반도체'], '종목명': ['삼성전자', 'SK하이닉스']})
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / 'themes.xlsx'
+    path.write_bytes(b'data')
+    return HeatmapService(
+        listing_ttl=None,
+        name_index=StockNameIndex(),
+        krx_repo=SlowKrxRepository(),
+        file_repo=FakeThemeFileRepository(str(path))
+    )
+
+
+def test_concurrent_get_themes_fetches_once(service):
+    """동시에 들어온 get_themes는 조회와 생성을 한 번만 수행"""
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: service.get_themes(), range(8)))
+
+    assert all(themes is results[0] for themes in results)
+    assert service.krx_repo.calls == 1
+    assert service.file_repo.calls == 1
+
+
+def test_concurrent_refresh_quotes_fetches_once(service):
+    """동시에 요청된 시세 갱신은 한 번의 조회를 공유"""
+    service.get_themes()
+    gate = threading.Event()
+    fetch = service.krx_repo.fetch_listing
+    service.krx_repo.fetch_listing = lambda: gate.wait() and fetch()
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(service.refresh_quotes) for _ in range(4)]
+        deadline = time.monotonic() + 5
+        while service._flights.shared < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        gate.set()
+        results = [f.result() for f in futures]
+
+    assert results == [True] * 4
+    assert service.krx_repo.calls == 2
+
+
+def test_get_themes_async(service):
+    async def run():
+        return await asyncio.gather(*(service.get_themes_async() for _ in range(4)))
+
+    results = asyncio.run(run())
+
+    assert all(themes is results[0] for themes in results)
+    assert service.krx_repo.calls == 1
@@ -0,0 +1,143 @@
+"""
+StageCache 및 HeatmapService 단계 캐시 테스트
+"""
+import pandas as pd
+import pytest
+from application.heatmap_service import HeatmapService
+from application.instrumentation import PipelineMetrics
+from application.stage_cache import StageCache, fingerprint_file, fingerprint_frame
+from infrastructure.name_index import StockNameIndex
+
+
+class TestStageCache:
+    """StageCache 테스트"""
+
+    def test_get_or_compute_reuses_result(self):
+        """같은 단계/지문은 한 번만 계산"""
+        cache = StageCache()
+        calls = []
+
+        for _ in range(3):
+            value = cache.get_or_compute('merged', 1, lambda: calls.append(1) or 'result')
+
+        assert value == 'result'
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_lru_eviction(self):
+        """최대 크기를 넘으면 가장 오래 사용하지 않은 항목 제거"""
+        cache = StageCache(maxsize=2)
+        cache.get_or_compute('a', 1, lambda: 1)
+        cache.get_or_compute('b', 1, lambda: 2)
+        cache.get_or_compute('a', 1, lambda: 1)
+        cache.get_or_compute('c', 1, lambda: 3)
+
+        assert ('a', 1) in cache
+        assert ('b', 1) not in cache
+
+    def test_invalidate_stage(self):
+        """단계별 무효화"""
+        cache = StageCache()
+        cache.get_or_compute('listing', 1, lambda: 1)
+        cache.get_or_compute('themes', 1, lambda: 2)
+
+        cache.invalidate('listing')
+        assert ('listing', 1) not in cache
+        assert ('themes', 1) in cache
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_fingerprints(self, tmp_path):
+        """입력 지문"""
+        df = pd.DataFrame({'Code': ['005930'], 'Marcap': [1.0]})
+        assert fingerprint_frame(df) == fingerprint_frame(df.copy())
+        assert fingerprint_frame(df) != fingerprint_frame(df.assign(Marcap=2.0))
+
+        path = tmp_path / 'themes.xlsx'
+        assert fingerprint_file(str(path)) is None
+        path.write_bytes(b'data')
+        assert fingerprint_file(str(path)) is not None
+
+
+class FakeKrxRepository:
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_listing(self):
+        self.calls += 1
+        return pd.DataFrame({
+            'Code': ['005930', '000660'],
+            'Name': ['삼성전자', 'SK하이닉스'],
+            'Marcap': [400e12, 100e12],
+            'ChagesRatio': [1.0, 2.0],
+        })
+
+
+class FakeThemeFileRepository:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.calls = 0
+
+    def load_themes(self):
+        self.calls += 1
+        return pd.DataFrame({'테마': ['반도체', '반도체'], '종목명': ['삼성전자', 'SK하이닉스']})
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / 'themes.xlsx'
+    path.write_bytes(b'data')
+    service = HeatmapService(listing_ttl=None, name_index=StockNameIndex())
+    service.krx_repo = FakeKrxRepository()
+    service.file_repo = FakeThemeFileRepository(str(path))
+    return service
+
+
+def test_service_reuses_cached_stages(service):
+    """get_themes/get_heatmap_data 반복 호출 시 조회와 변환을 재사용"""
+    themes = service.get_themes()
+    df = service.get_heatmap_data()
+    stats = service.get_group_stats_models(themes)
+
+    assert service.get_themes() is themes
+    assert service.get_heatmap_data() is df
+    assert service.get_group_stats_models(themes) is stats
+    assert service.krx_repo.calls == 1
+    assert service.file_repo.calls == 1
+
+
+def test_service_invalidate_listing(service):
+    """시세 무효화 시 시세만 다시 조회"""
+    service.get_themes()
+    service.invalidate('listing')
+    service.get_themes()
+
+    assert service.krx_repo.calls == 2
+    assert service.file_repo.calls == 1
+
+
+def test_service_resolves_name_variants(service):
+    """테마 파일 종목명의 공백 차이도 종목 코드로 해석"""
+    service.file_repo.load_themes = lambda: pd.DataFrame({
+        '테마': ['반도체', '반도체'],
+        '종목명': ['삼성 전자', 'SK하이닉스'],
+    })
+
+    themes = service.get_themes()
+
+    assert [stock.name for stock in themes[0].stocks] == ['삼성전자', 'SK하이닉스']
+
+
+def test_service_records_stages_once(service):
+    """캐시된 단계는 다시 계측되지 않음"""
+    service.metrics = PipelineMetrics()
+
+    themes = service.get_themes()
+    service.get_group_stats_models(themes)
+    service.get_themes()
+
+    summary = service.metrics.summary()
+    assert set(summary) == {'fetch', 'theme_load', 'merge', 'model_build', 'group_stats'}
+    assert summary['fetch']['calls'] == 1
+    assert summary['merge']['rows'] == 2
@@ -0,0 +1,85 @@
+"""
+ThemeUniverse 단위 테스트
+"""
+import pandas as pd
+import pytest
+from application.heatmap_service import HeatmapService
+from infrastructure.name_index import StockNameIndex
+from application.theme_universe import ThemeUniverse
+
+
+@pytest.fixture
+def merged_df():
+    """병합 완료된 (테마, 종목) 데이터"""
+    return pd.DataFrame({
+        '테마': ['반도체', 'AI', '반도체'],
+        '종목명': ['SK하이닉스', 'SK하이닉스', '삼성전자'],
+        'Code': ['000660', '000660', '005930'],
+        'Marcap': [100e12, 100e12, 400e12],
+        'ChagesRatio': [3.0, 3.0, 2.0],
+    })
+
+
+def test_columnar_layout(merged_df):
+    """고유 종목 컬럼과 테마별 소속 구간"""
+    universe = ThemeUniverse.from_dataframe(merged_df)
+
+    assert universe.stock_count == 2
+    assert universe.membership_count == 3
+    assert list(universe.theme_names) == ['반도체', 'AI']
+    assert list(universe.offsets) == [0, 2, 3]
+    assert list(universe.codes[universe.members]) == ['000660', '005930', '000660']
+
+
+def test_views_are_cached(merged_df):
+    """DataFrame/Domain Model 뷰는 한 번만 생성"""
+    universe = ThemeUniverse.from_dataframe(merged_df)
+
+    assert universe.themes is universe.themes
+    assert universe.dataframe is universe.dataframe
+    assert universe.owns(universe.dataframe)
+    assert not universe.owns(merged_df)
+    assert universe.is_materialized('themes') and universe.is_materialized('dataframe')
+
+
+def test_shared_dataframe_view_is_protected(merged_df):
+    """공유 DataFrame 뷰는 값을 바꿀 수 없고, 행/컬럼을 바꾸면 더 이상 유니버스의 뷰로 보지 않음"""
+    universe = ThemeUniverse.from_dataframe(merged_df)
+    assert not universe.is_materialized('dataframe')
+    df = universe.dataframe
+
+    with pytest.raises(ValueError):
+        df.loc[0, '시가총액_조'] = 1.0
+    df['시가총액_조'] = df['시가총액_조'] * 2
+    assert not universe.owns(df)
+
+    other = ThemeUniverse.from_dataframe(merged_df)
+    df = other.dataframe
+    df.drop(index=0, inplace=True)
+    assert not other.owns(df)
+
+
+def test_dataframe_view_matches_domain_view(merged_df):
+    """DataFrame 뷰와 Domain Model 뷰의 내용 일치"""
+    universe = ThemeUniverse.from_dataframe(merged_df)
+    df = universe.dataframe
+
+    expected = [
+        (theme.name, stock.code, stock.market_cap.in_trillion, stock.change_ratio.value)
+        for theme in universe.themes
+        for stock in theme.stocks
+    ]
+    actual = list(zip(df['테마'], df['Code'], df['시가총액_조'], df['ChagesRatio']))
+    assert actual == expected
+
+
+def test_calculate_group_stats_reuses_universe(merged_df, monkeypatch):
+    """get_heatmap_data 결과로 그룹 통계를 계산할 때 재변환하지 않음"""
+    service = HeatmapService(name_index=StockNameIndex())
+    universe = ThemeUniverse.from_dataframe(merged_df)
+    monkeypatch.setattr(service, '_build_universe', lambda: universe)
+    service._universe = universe
+
+    df_final = service.get_heatmap_data()
+    monkeypatch.setattr(ThemeUniverse, 'from_dataframe', classmethod(lambda cls, df: pytest.fail("재변환")))
+    service.calculate_group_stats(df_final)
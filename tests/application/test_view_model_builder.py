@@ -0,0 +1,215 @@
+"""
+HeatmapViewModelBuilder 및 컬럼형 HeatmapViewModel 테스트
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from application.view_model_builder import HeatmapViewModelBuilder, NodeBudget
+from domain.models import Stock, Theme, ThemeGroup
+from domain.value_objects import MarketCap, ChangeRatio
+from presentation.view_models import HeatmapViewModel, TreemapNode, diff_view_models
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+@pytest.fixture
+def themes():
+    samsung = Stock("005930", "삼성전자", MarketCap.from_trillion(400), ChangeRatio(1.0))
+    hynix = Stock("000660", "SK하이닉스", MarketCap.from_trillion(100), ChangeRatio(-2.0))
+    lg = Stock("373220", "LG에너지솔루션", MarketCap.from_trillion(80), ChangeRatio(3.0))
+    semis = Theme(name="반도체", parent_group="IT")
+    semis.add_stocks([samsung, hynix])
+    battery = Theme(name="2차전지")
+    battery.add_stock(lg)
+    return [semis, battery]
+
+
+@pytest.fixture
+def group_stats():
+    return {"IT": ThemeGroup(name="IT", market_cap=MarketCap.from_trillion(500), change_sum=200.0)}
+
+
+def test_build_fills_columns(themes, group_stats):
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    assert len(view_model) == 1 + 1 + 2 + 3
+    ids = view_model.get_ids()
+    assert len(set(ids)) == len(ids)
+    assert view_model.get_labels() == [
+        "대한민국 테마별 증시", "IT", "반도체", "2차전지", "삼성전자", "SK하이닉스", "LG에너지솔루션",
+    ]
+    assert view_model.get_parents() == ["", ids[0], ids[1], ids[0], ids[2], ids[2], ids[3]]
+    assert isinstance(view_model.values, np.ndarray)
+    np.testing.assert_allclose(view_model.values, [580, 500, 500, 80, 400, 100, 80])
+    np.testing.assert_allclose(view_model.colors[2], (400 * 1.0 - 100 * 2.0) / 500)
+    np.testing.assert_allclose(view_model.colors[0], (400 - 200 + 240) / 580)
+    np.testing.assert_array_equal(view_model.custom_data, view_model.colors)
+
+
+def test_repeat_build_shares_structure(themes, group_stats):
+    """구조가 같으면 ID/라벨/부모 배열을 다시 만들지 않음"""
+    first = HeatmapViewModelBuilder.build(themes, group_stats)
+    themes[0].stocks[0].update_quote(MarketCap.from_trillion(410), ChangeRatio(2.0))
+    second = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    assert second is not first
+    assert second.ids is first.ids
+    assert second.labels is first.labels
+    assert second.parents is first.parents
+    assert second.values[4] == pytest.approx(410)
+    assert first.values[4] == pytest.approx(400)
+
+
+def test_structure_change_rebuilds_ids(themes, group_stats):
+    first = HeatmapViewModelBuilder.build(themes, group_stats)
+    themes[1].add_stock(Stock("006400", "삼성SDI", MarketCap.from_trillion(30), ChangeRatio(0.5)))
+    second = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    assert second.ids is not first.ids
+    assert second.get_labels()[-1] == "삼성SDI"
+    assert second.get_parents()[-1] == first.get_ids()[3]
+
+
+def test_node_ids_stable_across_structure_changes(themes, group_stats):
+    """테마/종목이 추가되거나 빠져도 나머지 노드의 ID는 그대로"""
+    first = HeatmapViewModelBuilder.build(themes, group_stats)
+    ids = dict(zip(first.get_labels(), first.get_ids()))
+    
+    themes[0].stocks.remove(themes[0].stocks[0])
+    themes.insert(0, Theme(name="바이오"))
+    second = HeatmapViewModelBuilder.build(themes, group_stats)
+    
+    for label, node_id in zip(second.get_labels(), second.get_ids()):
+        if label in ids:
+            assert node_id == ids[label]
+    assert "삼성전자" not in second.get_labels()
+    assert diff_view_models(first, second) is None
+
+
+def test_node_ids_independent_of_build_history(themes, group_stats):
+    """노드 ID는 이전에 만든 노드와 관계없이 노드 키로 정해짐 (프로세스마다 같은 ID)"""
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+    script = (
+        f"import sys; sys.path.insert(0, {SRC_DIR!r}); "
+        "from application.view_model_builder import _node_ids; "
+        "print(_node_ids([('theme', '다른 테마'), ('theme', '반도체')])[1])"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == view_model.get_ids()[2]
+
+
+def test_nodes_compatibility(themes, group_stats):
+    """nodes 목록과 노드 목록으로 만든 ViewModel은 컬럼과 같은 내용"""
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+    nodes = view_model.nodes
+
+    assert isinstance(nodes[0], TreemapNode)
+    assert [node.label for node in nodes] == view_model.get_labels()
+
+    rebuilt = HeatmapViewModel(nodes=nodes)
+    assert rebuilt.get_ids() == view_model.get_ids()
+    assert rebuilt.get_values() == view_model.get_values()
+    assert rebuilt.get_text_templates() == view_model.get_text_templates()
+
+
+def test_refresh_updates_values_in_place(themes, group_stats):
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+    themes[1].stocks[0].update_quote(MarketCap.from_trillion(90), ChangeRatio(-1.0))
+
+    refreshed = HeatmapViewModelBuilder.refresh(view_model, themes, group_stats)
+
+    assert refreshed is view_model
+    assert view_model.values[-1] == pytest.approx(90)
+    assert view_model.colors[3] == pytest.approx(-1.0)
+
+
+def test_refresh_rebuilds_when_structure_changes(themes, group_stats):
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    refreshed = HeatmapViewModelBuilder.refresh(view_model, themes[:1], group_stats)
+
+    assert refreshed is not view_model
+    assert len(refreshed) == 1 + 1 + 1 + 2
+
+
+def test_diff_reports_changed_columns(themes, group_stats):
+    previous = HeatmapViewModelBuilder.build(themes, group_stats)
+    themes[1].stocks[0].update_quote(MarketCap.from_trillion(80), ChangeRatio(-1.0))
+    current = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    diff = diff_view_models(previous, current)
+
+    assert diff.values is None
+    assert diff.changed.tolist() == [0, 3, 6]
+    assert set(diff.to_restyle()) == {'marker.colors', 'customdata'}
+    assert diff.to_restyle()['marker.colors'][0][6] == pytest.approx(-1.0)
+    assert diff.to_relayout() == {}
+
+
+def test_diff_unaffected_by_later_refresh(themes, group_stats):
+    """보관한 변경분은 다음 제자리 갱신(refresh) 후에도 그대로"""
+    previous = HeatmapViewModelBuilder.build(themes, group_stats)
+    themes[1].stocks[0].update_quote(MarketCap.from_trillion(80), ChangeRatio(-1.0))
+    current = HeatmapViewModelBuilder.build(themes, group_stats)
+    diff = diff_view_models(previous, current)
+
+    themes[1].stocks[0].update_quote(MarketCap.from_trillion(80), ChangeRatio(4.0))
+    assert HeatmapViewModelBuilder.refresh(current, themes, group_stats) is current
+
+    assert current.colors[6] == pytest.approx(4.0)
+    assert diff.to_restyle()['marker.colors'][0][6] == pytest.approx(-1.0)
+
+
+def test_diff_empty_and_structure_change(themes, group_stats):
+    previous = HeatmapViewModelBuilder.build(themes, group_stats)
+    assert diff_view_models(previous, HeatmapViewModelBuilder.build(themes, group_stats)).is_empty
+
+    current = HeatmapViewModelBuilder.build(themes[:1], group_stats)
+    assert diff_view_models(previous, current) is None
+
+
+def test_budget_folds_rest_into_others(themes, group_stats):
+    """테마별 상위 종목만 남기고 나머지는 기타 노드 하나로 합침 (테마 값은 전체 기준)"""
+    themes[0].add_stock(Stock("035420", "NAVER", MarketCap.from_trillion(50), ChangeRatio(4.0)))
+    full = HeatmapViewModelBuilder.build(themes, group_stats)
+
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats, budget=NodeBudget(per_theme=1))
+
+    assert view_model.get_labels()[4:] == ["삼성전자", "기타", "LG에너지솔루션"]
+    ids = view_model.get_ids()
+    assert view_model.get_parents()[4:] == [ids[2], ids[2], ids[3]]
+    assert ids[4] == full.get_ids()[4]  # 같은 종목은 제한과 관계없이 같은 ID
+    assert view_model.values[5] == pytest.approx(150)
+    assert view_model.colors[5] == pytest.approx((100 * -2.0 + 50 * 4.0) / 150)
+    np.testing.assert_allclose(view_model.values[:4], full.values[:4])
+    np.testing.assert_allclose(view_model.colors[:4], full.colors[:4])
+
+
+def test_budget_total_split_by_cap_share(themes, group_stats):
+    budget = NodeBudget(total=2)
+
+    np.testing.assert_array_equal(budget.limits(np.array([400.0, 100.0, 80.0]), np.array([2, 1])), [1, 1])
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats, budget=budget)
+    assert view_model.get_labels()[4:] == ["삼성전자", "기타", "LG에너지솔루션"]
+
+    with pytest.raises(ValueError):
+        NodeBudget(per_theme=0)
+
+
+def test_budget_refresh_in_place_until_selection_changes(themes, group_stats):
+    budget = NodeBudget(per_theme=1)
+    view_model = HeatmapViewModelBuilder.build(themes, group_stats, budget=budget)
+
+    themes[0].stocks[1].update_quote(MarketCap.from_trillion(120), ChangeRatio(1.0))
+    refreshed = HeatmapViewModelBuilder.refresh(view_model, themes, group_stats, budget=budget)
+    assert refreshed is view_model
+    assert view_model.values[5] == pytest.approx(120)
+
+    themes[0].stocks[1].update_quote(MarketCap.from_trillion(500), ChangeRatio(1.0))
+    rebuilt = HeatmapViewModelBuilder.refresh(view_model, themes, group_stats, budget=budget)
+    assert rebuilt is not view_model
+    assert rebuilt.get_labels()[4:6] == ["SK하이닉스", "기타"]
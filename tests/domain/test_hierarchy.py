@@ -0,0 +1,91 @@
+"""
+Theme Hierarchy 단위 테스트
+"""
+import numpy as np
+import pytest
+from src.domain.hierarchy import ThemeHierarchy
+from src.domain.models import Stock, Theme
+from src.domain.value_objects import MarketCap, ChangeRatio
+from src.domain.services import ThemeStatisticsService
+
+
+class TestThemeHierarchy:
+    """ThemeHierarchy 테스트"""
+
+    @pytest.fixture
+    def hierarchy(self):
+        """섹터 → 산업 → 테마 → 세부 테마 4단계 계층"""
+        return ThemeHierarchy.compile({
+            "리튬": "2차전지",
+            "리튬(염호)": "리튬",
+            "2차전지": "에너지",
+            "태양광": "에너지",
+            "에너지": "산업재",
+        })
+
+    def test_topological_order(self, hierarchy):
+        """부모 노드가 항상 자식 노드보다 앞에 위치"""
+        for i, parent in enumerate(hierarchy.parents):
+            assert parent < i
+        assert hierarchy.names[0] == "산업재"
+        assert hierarchy.parent_of("리튬(염호)") == "리튬"
+        assert hierarchy.parent_of("산업재") is None
+
+    def test_rollup_all_levels(self, hierarchy):
+        """한 번의 상향식 누적으로 모든 계층 합계 계산"""
+        values = np.zeros(len(hierarchy))
+        values[hierarchy.index_of("리튬(염호)")] = 1.0
+        values[hierarchy.index_of("리튬")] = 2.0
+        values[hierarchy.index_of("태양광")] = 4.0
+
+        totals = hierarchy.rollup(values)
+
+        assert totals[hierarchy.index_of("리튬")] == 3.0
+        assert totals[hierarchy.index_of("2차전지")] == 3.0
+        assert totals[hierarchy.index_of("에너지")] == 7.0
+        assert totals[hierarchy.index_of("산업재")] == 7.0
+
+    def test_cycle_raises_error(self):
+        """순환 구조는 에러 발생"""
+        with pytest.raises(ValueError, match="순환"):
+            ThemeHierarchy.compile({"A": "B", "B": "C", "C": "A"})
+
+    def test_with_overrides_reuses_compiled(self, hierarchy):
+        """이미 반영된 매핑이면 재컴파일하지 않음"""
+        assert hierarchy.with_overrides({"리튬": "2차전지"}) is hierarchy
+
+        updated = hierarchy.with_overrides({"태양광": "2차전지"})
+        assert updated is not hierarchy
+        assert updated.parent_of("태양광") == "2차전지"
+
+
+def test_calculate_group_stats_multi_level():
+    """다단계 계층의 그룹 통계 계산"""
+    hierarchy = ThemeHierarchy.compile({
+        "리튬": "2차전지",
+        "2차전지(종합)": "2차전지",
+        "2차전지": "에너지",
+    })
+    lithium = Theme(name="리튬")
+    lithium.add_stock(Stock(
+        code="003670",
+        name="포스코퓨처엠",
+        market_cap=MarketCap.from_trillion(20),
+        change_ratio=ChangeRatio(2.0)
+    ))
+    battery = Theme(name="2차전지(종합)")
+    battery.add_stock(Stock(
+        code="373220",
+        name="LG에너지솔루션",
+        market_cap=MarketCap.from_trillion(80),
+        change_ratio=ChangeRatio(-1.0)
+    ))
+
+    group_stats = ThemeStatisticsService.calculate_group_stats([lithium, battery], hierarchy)
+
+    assert set(group_stats) == {"2차전지", "에너지"}
+    assert group_stats["2차전지"].parent_group == "에너지"
+    assert group_stats["에너지"].parent_group is None
+    assert group_stats["에너지"].market_cap.in_trillion == pytest.approx(100.0)
+    # (20*2 + 80*-1) / 100 = -0.4%
+    assert group_stats["에너지"].weighted_change_ratio == pytest.approx(-0.4)
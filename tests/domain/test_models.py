@@ -2,7 +2,7 @@
 Domain Models 단위 테스트
 """
 import pytest
-from src.domain.models import Stock, Theme, ThemeGroup
+from src.domain.models import Stock, StockRegistry, Theme, ThemeGroup
 from src.domain.value_objects import MarketCap, ChangeRatio
 
 
@@ -152,6 +152,56 @@ class TestTheme:
         assert theme.weighted_change_ratio == pytest.approx(2.4, rel=0.01)
 
 
+    def test_stock_shared_across_themes(self):
+        """하나의 종목 인스턴스가 여러 테마에 소속"""
+        semiconductor = Theme(name="반도체")
+        ai = Theme(name="AI")
+        stock = Stock(
+            code="000660",
+            name="SK하이닉스",
+            market_cap=MarketCap.from_trillion(100),
+            change_ratio=ChangeRatio(1.0)
+        )
+        
+        semiconductor.add_stock(stock)
+        ai.add_stock(stock)
+        
+        assert stock.themes == [semiconductor, ai]
+        assert stock.theme is semiconductor
+        
+        # 시세 갱신은 두 테마에 모두 반영
+        stock.update_quote(MarketCap.from_trillion(120), ChangeRatio(3.0))
+        assert semiconductor.total_market_cap.in_trillion == 120.0
+        assert ai.weighted_change_ratio == pytest.approx(3.0)
+        
+        semiconductor.remove_stock(stock)
+        assert stock.themes == [ai]
+
+
+class TestStockRegistry:
+    """StockRegistry 플라이웨이트 테스트"""
+    
+    def test_get_or_create_returns_shared_instance(self):
+        """같은 종목 코드는 같은 인스턴스"""
+        registry = StockRegistry()
+        first = registry.get_or_create("005930", "삼성전자", MarketCap.from_trillion(400), ChangeRatio(1.0))
+        second = registry.get_or_create("005930", "삼성전자", MarketCap.from_trillion(400), ChangeRatio(1.0))
+        
+        assert first is second
+        assert len(registry) == 1
+        assert "005930" in registry
+    
+    def test_update_quote(self):
+        """등록된 종목만 시세 갱신"""
+        registry = StockRegistry()
+        stock = registry.get_or_create("005930", "삼성전자", MarketCap.from_trillion(400), ChangeRatio(1.0))
+        
+        assert registry.update_quote("005930", MarketCap.from_trillion(410), ChangeRatio(2.5))
+        assert stock.market_cap.in_trillion == 410.0
+        assert stock.change_ratio.value == 2.5
+        assert not registry.update_quote("000000", MarketCap.zero(), ChangeRatio.zero())
+
+
 class TestThemeGroup:
     """ThemeGroup 데이터 클래스 테스트"""
     
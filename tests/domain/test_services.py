@@ -1,10 +1,18 @@
 """
 Domain Services 단위 테스트
 """
+import numpy as np
 import pytest
 from src.domain.models import Stock, Theme
 from src.domain.value_objects import MarketCap, ChangeRatio
-from src.domain.services import ThemeStatisticsService
+from src.domain.services import (
+    ThemeStatisticsService,
+    MarketCapRankIndex,
+    METRIC_BREADTH,
+    METRIC_MOVERS,
+    _ranked_per_segment,
+    top_n_per_segment,
+)
 
 
 class TestThemeStatisticsService:
@@ -113,3 +121,144 @@ class TestThemeStatisticsService:
         
         # IT 그룹 시가총액 = 반도체(500조) + 2차전지(120조) = 620조
         assert group_stats["IT"].market_cap.in_trillion == pytest.approx(620.0, rel=0.01)
+    
+    def test_get_top_stocks_by_market_cap_batch(self, sample_themes):
+        """전체 테마의 상위 종목 일괄 추출"""
+        top_stocks = ThemeStatisticsService.get_top_stocks_by_market_cap_batch(
+            sample_themes,
+            top_n=1
+        )
+        
+        assert [s.name for s in top_stocks["반도체"]] == ["삼성전자"]
+        assert [s.name for s in top_stocks["2차전지"]] == ["LG화학"]
+        assert [s.name for s in top_stocks["바이오"]] == ["삼성바이오로직스"]
+    
+    def test_rank_index_reused_until_quotes_change(self, sample_themes):
+        """같은 시세 버전이면 캐시된 순위 재사용, 버전이 바뀌면 재계산"""
+        rank_index = MarketCapRankIndex(max_entries=2)
+        themes = sample_themes[1:2]
+        
+        first = rank_index.top_stocks(themes, top_n=2, version=1)
+        assert [s.name for s in first["2차전지"]] == ["LG화학", "삼성SDI"]
+        
+        themes[0].stocks[0].market_cap = MarketCap.from_trillion(90)
+        cached = rank_index.top_stocks(themes, top_n=2, version=1)
+        assert cached["2차전지"] is first["2차전지"]
+        
+        updated = rank_index.top_stocks(themes, top_n=2, version=2)
+        assert [s.name for s in updated["2차전지"]] == ["삼성SDI", "LG화학"]
+        # 같은 버전이라도 다른 테마 목록 객체면 재계산
+        assert rank_index.top_stocks(list(themes), top_n=2, version=2)["2차전지"] is not updated["2차전지"]
+        
+        rank_index.top_stocks(themes, top_n=1, version=3)
+        assert len(rank_index) == 2
+    
+    def test_rank_index_matches_per_theme_selection(self):
+        """구간별 일괄 선택이 테마별 부분 선택과 같은 결과 (동일 시가총액 포함)"""
+        rng = np.random.default_rng(0)
+        themes = []
+        for t in range(20):
+            theme = Theme(name=f"테마{t}")
+            for i in range(int(rng.integers(0, 15))):
+                cap = float(rng.integers(1, 6))  # 동일 값이 많도록
+                theme.add_stock(Stock(f"{t:02d}{i:04d}", f"종목{t}-{i}", MarketCap.from_trillion(cap), ChangeRatio(0.0)))
+            themes.append(theme)
+        
+        batch = MarketCapRankIndex().top_stocks(themes, top_n=5)
+        for theme in themes:
+            expected = ThemeStatisticsService.get_top_stocks_by_market_cap(theme, 5)
+            assert batch[theme.name] == expected
+    
+    def test_aggregate_metrics(self, sample_themes):
+        """테마/그룹 집계 지표 일괄 계산"""
+        sample_themes[0].parent_group = "IT"
+        sample_themes[1].parent_group = "IT"
+        
+        group_stats = ThemeStatisticsService.aggregate_metrics(sample_themes)
+        
+        semiconductor = sample_themes[0].metrics
+        assert semiconductor.stock_count == 2
+        # (400*2 + 100*3) / 500 = 2.2%
+        assert semiconductor.cap_weighted_change == pytest.approx(2.2)
+        assert semiconductor.equal_weighted_change == pytest.approx(2.5)
+        assert semiconductor.top_gainer.name == "SK하이닉스"
+        assert semiconductor.top_loser.name == "삼성전자"
+        
+        bio = sample_themes[2].metrics
+        assert (bio.advancers, bio.decliners, bio.unchanged) == (0, 1, 0)
+        
+        it = group_stats["IT"]
+        assert it.metrics.stock_count == 4
+        assert it.market_cap.in_trillion == pytest.approx(620.0)
+        assert it.metrics.advancers == 4
+        assert it.metrics.top_gainer.name == "SK하이닉스"
+        assert it.metrics.top_loser.name == "삼성SDI"
+        # 기존 그룹 통계와 동일한 가중 등락률
+        expected = ThemeStatisticsService.calculate_group_stats(sample_themes)["IT"]
+        assert it.weighted_change_ratio == pytest.approx(expected.weighted_change_ratio)
+    
+    def test_aggregate_metrics_counts_shared_stock_once_per_group(self, sample_themes):
+        """같은 그룹의 두 테마에 속한 종목은 그룹의 종목 수/상승·하락/거래대금에 한 번만 포함"""
+        semiconductor, battery = sample_themes[0], sample_themes[1]
+        samsung = semiconductor.stocks[0]
+        samsung.traded_value = 10.0
+        semiconductor.stocks[1].traded_value = 5.0
+        battery.stocks[0].change_ratio = ChangeRatio(-1.0)
+        battery.add_stock(samsung)
+        semiconductor.parent_group = battery.parent_group = "IT"
+        
+        it = ThemeStatisticsService.aggregate_metrics(sample_themes[:2])["IT"]
+        
+        assert battery.metrics.stock_count == 3
+        assert it.metrics.stock_count == 4
+        assert (it.metrics.advancers, it.metrics.decliners, it.metrics.unchanged) == (3, 1, 0)
+        assert it.metrics.traded_value == pytest.approx(15.0)
+        assert it.metrics.equal_weighted_change == pytest.approx((2.0 + 3.0 - 1.0 + 2.5) / 4)
+        # 시가총액은 하위 테마 합계 (branchvalues='total')
+        assert it.market_cap.in_trillion == pytest.approx(500 + 520)
+        assert it.metrics.top_gainer.name == "SK하이닉스"
+        assert it.metrics.top_loser.name == "삼성SDI"
+    
+    def test_aggregate_metrics_subset(self, sample_themes):
+        """요청한 지표만 계산"""
+        ThemeStatisticsService.aggregate_metrics(sample_themes, metrics=[METRIC_BREADTH])
+        
+        metrics = sample_themes[0].metrics
+        assert metrics.advancers == 2
+        assert metrics.cap_weighted_change is None
+        assert metrics.top_gainer is None
+        
+        with pytest.raises(ValueError, match="지원하지 않는 지표"):
+            ThemeStatisticsService.aggregate_metrics(sample_themes, metrics=[METRIC_MOVERS, "unknown"])
+
+
+def test_top_n_per_segment():
+    """세그먼트별 상위 N개 위치 (동일 값은 앞선 행 우선, 결과는 오름차순)"""
+    segments = np.array([0, 0, 0, 1, 1, 2])
+    values = np.array([1.0, 3.0, 2.0, 5.0, 5.0, 1.0])
+    
+    selected = top_n_per_segment(segments, values, np.array([2, 1, 0]))
+    
+    assert selected.tolist() == [1, 2, 3]
+    assert top_n_per_segment(segments[:0], values[:0], np.array([1])).tolist() == []
+
+
+def test_top_n_per_segment_matches_full_sort():
+    """부분 선택 결과가 전체 정렬 기준과 같음 (동일 값, 비연속 세그먼트, 크기가 다른 세그먼트 포함)"""
+    rng = np.random.default_rng(1)
+    for contiguous in (True, False):
+        segments = np.repeat(np.arange(30), rng.integers(0, 40, size=30))
+        if not contiguous:
+            segments = rng.permutation(segments)
+        values = rng.integers(0, 8, size=len(segments)).astype(float)
+        limits = rng.integers(0, 12, size=30)
+        
+        positions = np.arange(len(values))
+        order = np.lexsort((positions, -values, segments))
+        sorted_segments = segments[order]
+        rank = positions - np.searchsorted(sorted_segments, sorted_segments, side='left')
+        expected = order[rank < limits[sorted_segments]]
+        
+        assert top_n_per_segment(segments, values, limits).tolist() == np.sort(expected).tolist()
+        assert _ranked_per_segment(segments, values, limits).tolist() == expected.tolist()
+
@@ -0,0 +1 @@
+# tests/infrastructure 패키지 초기화 파일
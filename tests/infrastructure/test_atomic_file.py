@@ -0,0 +1,78 @@
+"""
+atomic_write 단위 테스트
+"""
+import os
+import stat
+import threading
+
+import pytest
+from infrastructure.atomic_file import atomic_write
+
+
+def _write_text(text):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return write
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_concurrent_threads_write_same_path(tmp_path):
+    """같은 경로에 동시에 써도 임시 파일이 충돌하지 않음"""
+    output = str(tmp_path / 'a.html')
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def worker(i):
+        def write(path):
+            _write_text(f"writer-{i}")(path)
+            barrier.wait()  # 모든 스레드가 임시 파일을 쓴 뒤 교체
+        try:
+            atomic_write(output, write)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert (tmp_path / 'a.html').read_text(encoding='utf-8') in {f"writer-{i}" for i in range(4)}
+    assert os.listdir(tmp_path) == ['a.html']
+
+
+def test_new_file_uses_umask_mode(tmp_path):
+    """새 파일은 mkstemp의 0600이 아닌 umask 기준 기본 권한"""
+    umask = os.umask(0)
+    os.umask(umask)
+    atomic_write(str(tmp_path / 'a.html'), _write_text('a'))
+
+    assert _mode(tmp_path / 'a.html') == 0o666 & ~umask
+
+
+def test_existing_file_keeps_mode(tmp_path):
+    """기존 파일을 교체하면 그 파일의 권한 유지"""
+    output = tmp_path / 'a.html'
+    output.write_text('old', encoding='utf-8')
+    os.chmod(output, 0o640)
+
+    atomic_write(str(output), _write_text('new'))
+
+    assert output.read_text(encoding='utf-8') == 'new'
+    assert _mode(output) == 0o640
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    """쓰기가 실패하면 임시 파일을 지우고 대상은 그대로"""
+    def write(path):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        atomic_write(str(tmp_path / 'a.html'), write)
+
+    assert os.listdir(tmp_path) == []
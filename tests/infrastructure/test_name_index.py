@@ -0,0 +1,93 @@
+"""
+StockNameIndex 단위 테스트
+"""
+import os
+import stat
+
+import pandas as pd
+import pytest
+from src.infrastructure.name_index import StockNameIndex, listing_fingerprint, normalize_name
+
+
+@pytest.fixture
+def listing():
+    """KRX 종목 목록"""
+    return pd.DataFrame({
+        'Code': ['005930', '005935', '035420'],
+        'Name': ['삼성전자', '삼성전자우', 'NAVER'],
+    })
+
+
+def test_normalize_name():
+    """공백/괄호/대소문자 차이 제거"""
+    assert normalize_name(' 삼성전자 우 ') == '삼성전자우'
+    assert normalize_name('삼성전자(우)') == '삼성전자우'
+    assert normalize_name('Naver') == normalize_name('NAVER')
+    assert normalize_name(None) is None
+    assert normalize_name(float('nan')) is None
+
+
+def test_resolve_variants_and_aliases(listing):
+    """정규화된 이름과 별칭으로 종목 코드 해석"""
+    index = StockNameIndex()
+    index.update(listing)
+    index.add_alias('네이버', '035420')
+
+    assert index.resolve('삼성전자 우') == '005935'
+    assert index.resolve('naver') == '035420'
+    assert index.resolve('네이버') == '035420'
+    assert index.resolve('없는종목') is None
+
+
+def test_incremental_update_keeps_old_name_as_alias(listing):
+    """종목명 변경 시 이전 이름을 별칭으로 유지, 상장 폐지 종목 제거"""
+    index = StockNameIndex()
+    index.update(listing, fingerprint=1)
+
+    renamed = pd.DataFrame({
+        'Code': ['005930', '035420'],
+        'Name': ['삼성전자', '네이버'],
+    })
+    assert index.update(renamed, fingerprint=2)
+    assert index.resolve('NAVER') == '035420'
+    assert index.resolve('네이버') == '035420'
+    assert index.resolve('삼성전자우') is None
+
+    # 같은 지문이면 변경 없음
+    assert not index.update(renamed, fingerprint=2)
+
+
+def test_save_and_load(listing, tmp_path):
+    """파일 저장 및 로드"""
+    path = tmp_path / 'cache' / 'index.json'
+    index = StockNameIndex(str(path))
+    index.update(listing, fingerprint=7)
+    index.add_alias('네이버', '035420')
+    index.save()
+
+    loaded = StockNameIndex.load(str(path))
+    assert len(loaded) == 3
+    assert loaded.listing_fingerprint == 7
+    assert loaded.resolve('네이버') == '035420'
+    assert loaded.resolve('삼성전자 우') == '005935'
+    assert os.listdir(path.parent) == ['index.json']
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+
+
+def test_listing_fingerprint_ignores_quotes_and_survives_restart(listing, tmp_path):
+    """지문은 Code/Name만 보고 (시세 무관) 저장 후 다시 불러온 인덱스에서도 일치"""
+    quoted = listing.assign(Marcap=[1.0, 2.0, 3.0])
+    assert listing_fingerprint(quoted) == listing_fingerprint(quoted.assign(Marcap=[4.0, 5.0, 6.0]))
+    assert listing_fingerprint(quoted) != listing_fingerprint(quoted.assign(Name=['a', 'b', 'c']))
+
+    path = tmp_path / 'index.json'
+    index = StockNameIndex(str(path))
+    index.update(quoted)
+    index.save()
+
+    loaded = StockNameIndex.load(str(path))
+    assert not loaded.update(quoted.assign(Marcap=[7.0, 8.0, 9.0]))
+    assert not loaded.dirty
+    assert loaded.listing_fingerprint == index.listing_fingerprint
@@ -0,0 +1,10 @@
+"""
+Presentation 레이어 테스트 설정
+
+Presentation 모듈은 src를 기준으로 import(`from presentation.view_models import ...`)하므로
+src 디렉토리를 경로에 추가합니다.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src')))
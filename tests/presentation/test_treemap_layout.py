@@ -0,0 +1,90 @@
+"""
+Squarified Treemap 레이아웃 및 정적 SVG 테스트
+"""
+import numpy as np
+import pytest
+from presentation.svg_renderer import colors_to_hex, render_svg, render_svg_page
+from presentation.treemap_layout import compute_layout
+from presentation.view_models import HeatmapViewModel, TreemapNode
+
+
+def _view_model(rows):
+    """(id, 라벨, 부모, 값, 색상) 목록으로 ViewModel 생성"""
+    return HeatmapViewModel(nodes=[
+        TreemapNode(node_id, label, parent, value, color, color, "<b>%{label}</b>")
+        for node_id, label, parent, value, color in rows
+    ])
+
+
+@pytest.fixture
+def view_model():
+    rows = [("0", "루트", "", 100.0, 0.0), ("1", "반도체", "0", 60.0, 1.0), ("2", "2차전지", "0", 40.0, -1.0)]
+    caps = [30.0, 20.0, 10.0]
+    rows += [(str(3 + i), f"반도체{i}", "1", cap, 1.0) for i, cap in enumerate(caps)]
+    rows += [(str(6 + i), f"전지{i}", "2", cap, -1.0) for i, cap in enumerate([25.0, 15.0])]
+    return _view_model(rows)
+
+
+def _overlap(layout, a, b):
+    return (min(layout.x1[a], layout.x1[b]) - max(layout.x0[a], layout.x0[b]) > 1e-9
+            and min(layout.y1[a], layout.y1[b]) - max(layout.y0[a], layout.y0[b]) > 1e-9)
+
+
+def test_areas_proportional_without_padding(view_model):
+    layout = compute_layout(view_model, 400, 300, header=0, padding=0)
+    areas = layout.widths * layout.heights
+
+    np.testing.assert_allclose(areas, view_model.values * (400 * 300 / 100.0))
+    assert layout.depth.tolist() == [0, 1, 1, 2, 2, 2, 2, 2]
+    assert layout.is_leaf.tolist() == [False, False, False, True, True, True, True, True]
+
+
+def test_children_inside_parent_and_disjoint(view_model):
+    layout = compute_layout(view_model, 400, 300)
+    parents = {3: 1, 4: 1, 5: 1, 6: 2, 7: 2, 1: 0, 2: 0}
+
+    for child, parent in parents.items():
+        assert layout.x0[child] >= layout.x0[parent] - 1e-9
+        assert layout.y0[child] >= layout.y0[parent] - 1e-9
+        assert layout.x1[child] <= layout.x1[parent] + 1e-9
+        assert layout.y1[child] <= layout.y1[parent] + 1e-9
+    siblings = [(3, 4), (3, 5), (4, 5), (6, 7), (1, 2)]
+    assert not any(_overlap(layout, a, b) for a, b in siblings)
+    # 테마 노드는 라벨용 머리줄만큼 자식 영역이 내려감
+    assert min(layout.y0[3:6]) >= layout.y0[1] + 18
+
+
+def test_equal_values_are_square():
+    rows = [("0", "루트", "", 16.0, 0.0)] + [(str(i), f"종목{i}", "0", 1.0, 0.0) for i in range(1, 17)]
+    layout = compute_layout(_view_model(rows), 400, 400, header=0, padding=0)
+
+    np.testing.assert_allclose(layout.widths[1:], 100.0)
+    np.testing.assert_allclose(layout.heights[1:], 100.0)
+
+
+def test_partial_children_leave_empty_space():
+    """자식 합계가 부모 값보다 작으면 남는 부분은 비워 둠 (zero 값 노드는 크기 0)"""
+    rows = [("0", "루트", "", 10.0, 0.0), ("1", "A", "0", 5.0, 0.0), ("2", "B", "0", 0.0, 0.0)]
+    rows.insert(1, ("3", "빈 그룹", "", 0.0, 0.0))
+    layout = compute_layout(_view_model(rows), 100, 100, header=0, padding=0)
+
+    assert layout.widths[2] * layout.heights[2] == pytest.approx(5000)
+    assert layout.widths[3] * layout.heights[3] == 0
+
+
+def test_colors_match_plotly_scale():
+    assert colors_to_hex(np.array([-5.0, -10.0, 0.0, 5.0, 2.5])) == [
+        "#0000ff", "#0000ff", "#444444", "#ff0000", "#a22222",
+    ]
+
+
+def test_render_svg(view_model):
+    view_model.labels[3] = "A&B <주>"
+    svg = render_svg(view_model, width=800, height=600)
+
+    assert svg.startswith('<svg')
+    assert svg.count('<rect') == 1 + 7  # 배경 + 루트를 제외한 노드
+    assert "A&amp;B &lt;주&gt;" in svg
+    page = render_svg_page(view_model)
+    assert '<script' not in page
+    assert page.count('<svg') == 1
@@ -0,0 +1,223 @@
+"""
+HeatmapVisualizer HTML 출력 테스트
+"""
+import json
+import os
+import stat
+
+import numpy as np
+import pytest
+from presentation.view_models import HeatmapTimeline, HeatmapViewModel, TreemapNode
+from presentation.visualizer import HeatmapVisualizer, plotlyjs_asset_name
+
+
+@pytest.fixture
+def view_model():
+    return HeatmapViewModel(nodes=[
+        TreemapNode("0", "루트", "", 3.0, 0.5, 0.5, "<b>%{label}</b>"),
+        TreemapNode("1", "반도체", "0", 3.0, 0.5, 0.5, "<b>%{label}</b>"),
+        TreemapNode("2", "삼성전자", "1", 3.0, 0.5, 0.5, "<b>%{label}</b>"),
+    ])
+
+
+def test_shared_plotlyjs_asset(view_model, tmp_path):
+    """asset_dir을 지정하면 plotly.js는 한 번만 저장하고 HTML은 상대 경로로 참조"""
+    asset_dir = tmp_path / 'assets'
+    visualizer = HeatmapVisualizer(asset_dir=str(asset_dir))
+
+    visualizer.create_treemap_from_viewmodel(view_model, str(tmp_path / 'a.html'), open_browser=False)
+    asset = asset_dir / plotlyjs_asset_name()
+    written_at = asset.stat().st_mtime_ns
+    os.makedirs(tmp_path / 'sub')
+    visualizer.create_treemap_from_viewmodel(view_model, str(tmp_path / 'sub' / 'b.html'), open_browser=False)
+
+    assert asset.stat().st_mtime_ns == written_at
+    assert asset.stat().st_size > 1_000_000
+    html = (tmp_path / 'sub' / 'b.html').read_text(encoding='utf-8')
+    assert f'src="../assets/{plotlyjs_asset_name()}"' in html
+    assert (tmp_path / 'a.html').stat().st_size < 100_000
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_outputs_keep_default_file_mode(view_model, tmp_path):
+    """HTML과 공유 asset은 임시 파일의 0600이 아닌 umask 기준 권한으로 저장"""
+    umask = os.umask(0)
+    os.umask(umask)
+    asset_dir = tmp_path / 'assets'
+    HeatmapVisualizer(asset_dir=str(asset_dir)).write_html(view_model, str(tmp_path / 'a.html'))
+
+    expected = 0o666 & ~umask
+    assert stat.S_IMODE(os.stat(tmp_path / 'a.html').st_mode) == expected
+    assert stat.S_IMODE(os.stat(asset_dir / plotlyjs_asset_name()).st_mode) == expected
+
+
+def test_embeds_plotlyjs_by_default(view_model, tmp_path):
+    HeatmapVisualizer().create_treemap_from_viewmodel(view_model, str(tmp_path / 'a.html'), open_browser=False)
+
+    assert (tmp_path / 'a.html').stat().st_size > 1_000_000
+
+
+def test_headless_render_has_no_side_effects(view_model, tmp_path, monkeypatch, capsys):
+    """render_html/write_html은 브라우저를 열거나 출력하지 않고, 실패하면 기존 파일을 그대로 둠"""
+    import presentation.visualizer as visualizer_module
+    monkeypatch.setattr(visualizer_module, '_open_in_browser', lambda path: pytest.fail("브라우저 실행"))
+    monkeypatch.chdir(tmp_path)
+    visualizer = HeatmapVisualizer(asset_dir=str(tmp_path / 'assets'))
+
+    html = visualizer.render_html(view_model, include_plotlyjs='cdn')
+    output = tmp_path / 'a.html'
+    assert visualizer.write_html(view_model, str(output)) == str(output)
+
+    assert isinstance(html, bytes) and b'"ids"' in html
+    assert sorted(os.listdir(tmp_path)) == ['a.html', 'assets']
+    assert capsys.readouterr().out == ''
+
+    before = output.read_bytes()
+    monkeypatch.setattr(visualizer, 'build_figure', lambda vm: type('Figure', (), {
+        'write_html': lambda self, path, **kwargs: (open(path, 'w').write('<ht'), 1 / 0)
+    })())
+    with pytest.raises(ZeroDivisionError):
+        visualizer.write_html(view_model, str(output))
+    assert output.read_bytes() == before
+    assert sorted(os.listdir(tmp_path)) == ['a.html', 'assets']
+
+
+def test_numeric_arrays_encoded_as_float32(view_model):
+    """숫자 배열은 float32 typed array로, float32로 표현할 수 없는 값이 있으면 float64로 기록"""
+    trace = json.loads(HeatmapVisualizer().build_figure(view_model).to_json())['data'][0]
+    assert trace['values']['dtype'] == 'f4'
+    assert trace['marker']['colors']['dtype'] == 'f4'
+    assert trace['customdata']['dtype'] == 'f4'
+
+    view_model.values[2] = 1e-50
+    trace = json.loads(HeatmapVisualizer().build_figure(view_model).to_json())['data'][0]
+    assert trace['values']['dtype'] == 'f8'
+
+    trace = json.loads(HeatmapVisualizer(float32=False).build_figure(view_model).to_json())['data'][0]
+    assert trace['marker']['colors']['dtype'] == 'f8'
+
+
+def test_timeline_figure_stores_structure_once(view_model):
+    """구조는 기본 트레이스에 한 번, 프레임에는 값/색상 배열만"""
+    timeline = HeatmapTimeline()
+    timeline.add("09:00", view_model)
+    view_model.colors[:] = -1.0
+    timeline.add("09:01", view_model)
+
+    fig = json.loads(HeatmapVisualizer().build_timeline_figure(timeline).to_json())
+
+    assert fig['data'][0]['labels'] == ["루트", "반도체", "삼성전자"]
+    assert [frame['name'] for frame in fig['frames']] == ["09:00", "09:01"]
+    assert set(fig['frames'][0]['data'][0]) == {'type', 'values', 'marker', 'customdata'}
+    assert fig['layout']['sliders'][0]['active'] == 1
+    assert timeline.frames[0].colors[0] == 0.5
+
+
+def test_timeline_rejects_structure_change(view_model):
+    timeline = HeatmapTimeline(max_frames=1)
+    timeline.add("09:00", view_model)
+    timeline.add("09:01", view_model)
+    other = HeatmapViewModel(nodes=view_model.nodes[:2])
+
+    assert len(timeline) == 1
+    assert not timeline.accepts(other)
+    with pytest.raises(ValueError):
+        timeline.add("09:02", other)
+    with pytest.raises(ValueError):
+        HeatmapVisualizer().build_timeline_figure(HeatmapTimeline())
+
+
+def test_timeline_html_does_not_autoplay(view_model, tmp_path):
+    timeline = HeatmapTimeline()
+    timeline.add("09:00", view_model)
+    HeatmapVisualizer(asset_dir=str(tmp_path)).create_treemap_timeline(
+        timeline, str(tmp_path / 'timeline.html'), open_browser=False
+    )
+
+    html = (tmp_path / 'timeline.html').read_text(encoding='utf-8')
+    assert 'addFrames' in html
+    assert 'Plotly.animate' not in html
+
+
+def test_create_static_treemap(view_model, tmp_path):
+    visualizer = HeatmapVisualizer()
+    visualizer.create_static_treemap(view_model, str(tmp_path / 'static.html'), open_browser=False)
+    visualizer.create_static_treemap(view_model, str(tmp_path / 'static.svg'), open_browser=False)
+
+    assert (tmp_path / 'static.html').read_text(encoding='utf-8').startswith('<!DOCTYPE html>')
+    assert (tmp_path / 'static.svg').read_text(encoding='utf-8').startswith('<svg')
+
+
+def _legacy_columns_reference(df_final, group_stats):
+    """이전 create_treemap의 행 단위 구현 (비교 기준)"""
+    from domain.theme_config import THEME_HIERARCHY
+
+    ids, labels, parents, values, colors = ["KRX_Themes"], ["대한민국 테마별 증시"], [""], [], []
+    total_mkt_cap = df_final['시가총액_조'].sum()
+    values.append(total_mkt_cap)
+    colors.append((df_final['ChagesRatio'] * df_final['시가총액_조']).sum() / total_mkt_cap if total_mkt_cap > 0 else 0)
+    for theme_name, group in df_final.groupby('테마'):
+        parent_group = THEME_HIERARCHY.get(theme_name)
+        theme_mkt_cap = group['시가총액_조'].sum()
+        theme_change_sum = (group['ChagesRatio'] * group['시가총액_조']).sum()
+        ids.append(f"Theme_{theme_name}")
+        labels.append(theme_name)
+        parents.append(f"Group_{parent_group}" if parent_group else "KRX_Themes")
+        values.append(theme_mkt_cap)
+        colors.append(theme_change_sum / theme_mkt_cap if theme_mkt_cap > 0 else 0)
+    for group_name, stats in group_stats.items():
+        ids.append(f"Group_{group_name}")
+        labels.append(group_name)
+        parents.append(f"Group_{stats.get('parent_group')}" if stats.get('parent_group') else "KRX_Themes")
+        values.append(stats['cap'])
+        colors.append(stats['change_sum'] / stats['cap'] if stats['cap'] > 0 else 0)
+    n_branches = len(ids)
+    for _, row in df_final.iterrows():
+        ids.append(f"{row['테마']}_{row['종목명']}")
+        labels.append(row['종목명'])
+        parents.append(f"Theme_{row['테마']}")
+        values.append(row['시가총액_조'])
+        colors.append(row['ChagesRatio'])
+    templates = ["<b>%{label}</b>"] * n_branches + ["<b>%{label}</b><br>%{value:.2f}조<br>%{customdata:.2f}%"] * (len(ids) - n_branches)
+    return ids, labels, parents, values, colors, templates
+
+
+def test_legacy_treemap_columns_match_row_loop():
+    """벡터화한 create_treemap 노드 열이 이전 행 단위 구현과 같음"""
+    import pandas as pd
+    from domain.theme_config import THEME_HIERARCHY
+    from presentation.visualizer import _legacy_treemap_columns
+
+    child, parent = next(iter(THEME_HIERARCHY.items()))
+    rng = np.random.default_rng(0)
+    themes = rng.choice([child, '반도체', '자동차', '빈테마'], size=200)
+    df = pd.DataFrame({
+        '테마': themes,
+        '종목명': [f"종목{i}" for i in range(200)],
+        '시가총액_조': np.where(themes == '빈테마', 0.0, rng.random(200) * 10),
+        'ChagesRatio': rng.normal(0, 3, 200),
+    })
+    df.loc[3, 'ChagesRatio'] = np.nan
+    group_stats = {
+        parent: {'cap': 5.0, 'change_sum': 1.5, 'parent_group': None},
+        '하위그룹': {'cap': 0.0, 'change_sum': 0.0, 'parent_group': parent},
+    }
+
+    actual = _legacy_treemap_columns(df, group_stats)
+    expected = _legacy_columns_reference(df, group_stats)
+
+    for column in (0, 1, 2, 5):
+        assert actual[column] == expected[column]
+    for column in (3, 4):
+        np.testing.assert_allclose(actual[column], expected[column], rtol=1e-12, equal_nan=True)
+
+
+def test_create_treemap_writes_without_browser(tmp_path, monkeypatch):
+    import pandas as pd
+    import presentation.visualizer as visualizer_module
+    monkeypatch.setattr(visualizer_module, '_open_in_browser', lambda path: pytest.fail("브라우저 실행"))
+    df = pd.DataFrame({'테마': ['반도체'], '종목명': ['삼성전자'], '시가총액_조': [400.0], 'ChagesRatio': [1.0]})
+
+    HeatmapVisualizer().create_treemap(df, {}, str(tmp_path / 'legacy.html'), open_browser=False)
+
+    assert '"KRX_Themes"' in (tmp_path / 'legacy.html').read_text(encoding='utf-8')